@@ -51,8 +51,13 @@ from .parser import Parser
 from .argument import Argument
 from .option import Option
 from .command import Command, Cli
+from .compiled import CompiledCommand
+from .lazy_command import LazyCommand
+from .errors import CliExit, CliError, ParseError, ValidationError, BuildError
 
 
 __all__ = [
-    "Parser", "Argument", "Option", "Command", "Cli",
+    "Parser", "Argument", "Option", "Command", "Cli", "CompiledCommand",
+    "LazyCommand", "CliExit", "CliError", "ParseError", "ValidationError",
+    "BuildError",
 ]
@@ -1,10 +1,13 @@
 """Definitions for class `Argument`."""
 
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Iterable, Iterator, Any
 import sys
 
+from .common import ParsingMixin
+from .response_file import read_newline, read_nul, open_file
 
-class Argument:
+
+class Argument(ParsingMixin):
     """
     CLI-argument class.
 
@@ -29,13 +32,39 @@ class Argument:
                 return True, None, number
               ```
 
+              A parser can also be a coroutine function; then, all
+              values of an invocation are parsed concurrently (see
+              `parse_async`).
+
               (default None)
+    workers -- if given, values are parsed by a pool of this many
+               threads (for I/O-bound parsers with many values; results
+               and errors are reported as if parsed serially)
+               (default None)
     position -- manually control `Argument` position in the context of a
                 `Command` (note that in a single `Command`, either all
                 or no `Arguments` should receive this keyword)
                 (default None, order in which `Argument`s are defined)
+    stream -- if `True`, values are provided as a generator that parses
+              values when they are consumed (requires unlimited
+              `nargs`); besides values from the input, the value '-'
+              reads values from stdin and a `Command` with a streaming
+              `Argument` receives the options '--files-from' (read
+              values from file) and '-0'/'--null' (NUL-delimited
+              instead of one value per line)
+              (default False)
     """
 
+    __slots__ = (
+        "__name",
+        "__helptext",
+        "__nargs",
+        "__position",
+        "__stream",
+    )
+
+    _TRACE_KEY = "argument"
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -47,6 +76,8 @@ class Argument:
             Callable[[str], tuple[bool, Optional[str], Optional[Any]]]
         ] = None,
         position: Optional[int] = None,
+        workers: Optional[int] = None,
+        stream: bool = False,
     ) -> None:
         self.__name = name
         self.__helptext = helptext
@@ -56,8 +87,19 @@ class Argument:
             self.__nargs = -1
         else:
             self.__nargs = nargs
-        self.__parser = parser
+        if workers is not None and workers < 1:
+            raise ValueError(
+                f"Bad number of workers for argument '{self}' (must be "
+                + "positive)."
+            )
+        super().__init__(parser, workers)
         self.__position = position
+        if stream and (self.__nargs >= 0 or self.is_async):
+            raise ValueError(
+                f"Bad streaming argument '{self}' (requires unlimited "
+                + "'nargs' and a regular parser)."
+            )
+        self.__stream = stream
 
     @property
     def name(self) -> str:
@@ -79,20 +121,46 @@ class Argument:
         """Returns `Argument` position."""
         return self.__position
 
-    def parse(self, data: Any):
-        """Returns response of `Argument`'s parser if available."""
-        if self.__parser:
-            ok, msg, data = self.__parser(data)
-            if not ok:
-                print(msg, file=sys.stderr)
-                sys.exit(1)
-        return data
+    @property
+    def stream(self) -> bool:
+        """Returns `Argument` stream."""
+        return self.__stream
+
+    def parse_stream(
+        self,
+        data: Iterable[str],
+        files: Iterable[str] = (),
+        null: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Yields responses of `Argument`'s parser (parsed on demand) for
+        all values in `data` (value '-' is replaced by the values read
+        from stdin) followed by the values read from `files`.
+
+        Keyword arguments:
+        data -- values
+        files -- paths of files that contain values
+                 (default ())
+        null -- if `True`, values in stdin and `files` are NUL-delimited;
+                otherwise one value per line
+                (default False)
+        """
+        reader = read_nul if null else read_newline
+        for value in data:
+            if value == "-":
+                yield from map(self.parse, reader(sys.stdin))
+            else:
+                yield self.parse(value)
+        for path in files:
+            with open_file(path, null, f"--files-from={path}") as file:
+                yield from map(self.parse, reader(file))
 
     def __repr__(self):
         return (
             f"Argument(name={self.name}, helptext={self.helptext}, "
-            + f"nargs={self.nargs}, parser={self.__parser}, "
-            + f"position={self.position})"
+            + f"nargs={self.nargs}, parser={self.parser}, "
+            + f"position={self.position}, workers={self.workers}, "
+            + f"stream={self.stream})"
         )
 
     def __str__(self):
@@ -0,0 +1,197 @@
+"""
+Definitions for batch-execution of a cli-callable.
+
+A batch consists of many invocations of the same cli-callable (as
+returned by `Command.build`) that are run in a single process. Every
+invocation is isolated regarding its exit status and output.
+"""
+
+from typing import (
+    Callable,
+    Optional,
+    Iterable,
+    Iterator,
+    TextIO,
+    NamedTuple,
+)
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import io
+import sys
+import json
+import shlex
+import threading
+import traceback
+
+
+class BatchResult(NamedTuple):
+    """Result of a single invocation in a batch."""
+
+    argv: list[str]
+    status: int
+    stdout: str
+    stderr: str
+    duration: float
+
+
+class _ThreadLocalStream:
+    """
+    Proxy for `stream` that writes into a buffer for threads that are
+    registered in `buffers` (by `threading.get_ident`). All other
+    threads (and all other attributes) are passed through to `stream`.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.buffers: dict[int, io.StringIO] = {}
+
+    def write(self, s: str) -> int:
+        buffer = self.buffers.get(threading.get_ident())
+        if buffer is None:
+            return self.stream.write(s)
+        return buffer.write(s)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        if threading.get_ident() not in self.buffers:
+            self.stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+
+def read_invocations(
+    source: TextIO, format_: str
+) -> Iterator[list[str] | ValueError]:
+    """
+    Yields invocations (lists of arguments) read from `source` in
+    `format_` "shell" (shell-quoted arguments per line; supports
+    comments) or "json" (JSON-array of strings per line). For a
+    malformed line, a `ValueError` (referring to the line number) is
+    yielded instead.
+    """
+    for number, line in enumerate(source, start=1):
+        try:
+            if format_ == "json":
+                if not line.strip():
+                    continue
+                argv = json.loads(line)
+                if not isinstance(argv, list):
+                    raise ValueError("expected JSON-array")
+                argv = list(map(str, argv))
+            else:
+                argv = shlex.split(line, comments=True)
+        except ValueError as exc_info:
+            yield ValueError(f"Bad invocation in line {number}: {exc_info}")
+            continue
+        if argv:
+            yield argv
+
+
+def _invoke(
+    cli: Callable[[Optional[Iterable[str]]], None],
+    argv: list[str] | ValueError,
+    stdout: _ThreadLocalStream,
+    stderr: _ThreadLocalStream,
+) -> BatchResult:
+    """
+    Returns result of invoking `cli` with `argv` (a failed result if
+    `argv` is an error from `read_invocations`).
+    """
+    if isinstance(argv, ValueError):
+        return BatchResult([], 1, "", f"{argv}\n", 0.0)
+    ident = threading.get_ident()
+    stdout.buffers[ident] = io.StringIO()
+    stderr.buffers[ident] = io.StringIO()
+    status = 0
+    start = perf_counter()
+    try:
+        cli(argv)
+    except SystemExit as exc_info:
+        if isinstance(exc_info.code, int):
+            status = exc_info.code
+        elif exc_info.code is not None:
+            print(exc_info.code, file=sys.stderr)
+            status = 1
+    # pylint: disable=broad-exception-caught
+    except Exception:
+        traceback.print_exc(file=sys.stderr)
+        status = 1
+    finally:
+        duration = perf_counter() - start
+        result = BatchResult(
+            argv,
+            status,
+            stdout.buffers.pop(ident).getvalue(),
+            stderr.buffers.pop(ident).getvalue(),
+            duration,
+        )
+    return result
+
+
+def run_batch(
+    cli: Callable[[Optional[Iterable[str]]], None],
+    source: Optional[str | TextIO | Iterable[list[str]]] = None,
+    *,
+    format_: str = "shell",
+    workers: int = 1,
+    report: Optional[TextIO] = None,
+) -> list[BatchResult]:
+    """
+    Returns results of running the invocations from `source` with `cli`
+    (in input order).
+
+    While the batch runs, `sys.stdout` and `sys.stderr` are replaced by
+    proxies that only capture what the worker threads write during an
+    invocation; output of other threads is passed through. Output that
+    bypasses `sys.stdout` and `sys.stderr` (e.g., of subprocesses or
+    threads started by an invocation) is not captured.
+
+    Keyword arguments:
+    cli -- cli-callable
+    source -- file path, text stream, or iterable of invocations
+              (default None; uses stdin)
+    format_ -- format of invocations in `source` ("shell" or "json";
+               see `read_invocations`)
+               (default "shell")
+    workers -- number of worker threads
+               (default 1)
+    report -- if given, a JSON-object is written to this stream for
+              every result
+              (default None)
+    """
+    if format_ not in ("shell", "json"):
+        raise ValueError(f"Unknown batch format '{format_}'.")
+
+    file = None
+    if source is None:
+        source = sys.stdin
+    if isinstance(source, str):
+        # pylint: disable=consider-using-with
+        file = source = open(source, "r", encoding="utf-8")
+    if hasattr(source, "readline"):
+        invocations = read_invocations(source, format_)
+    else:
+        invocations = map(list, source)
+
+    stdout = _ThreadLocalStream(sys.stdout)
+    stderr = _ThreadLocalStream(sys.stderr)
+    sys.stdout, sys.stderr = stdout, stderr
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for result in executor.map(
+                lambda argv: _invoke(cli, argv, stdout, stderr),
+                invocations,
+            ):
+                results.append(result)
+                if report is not None:
+                    report.write(json.dumps(result._asdict()) + "\n")
+    finally:
+        sys.stdout, sys.stderr = stdout.stream, stderr.stream
+        if file is not None:
+            file.close()
+    return results
@@ -0,0 +1,215 @@
+"""
+Definitions for the persistent build-cache.
+
+The cache stores rendered help (see `CompiledCommand.get_help`) as
+JSON; every command of a command-tree and line width has its own file
+(in a directory per command-tree, see `HelpCache`) that is only read
+when the respective help is requested. A cache-entry is only used if
+none of the source-files of the involved classes (including `befehl`
+itself) changed since it has been written and the declarations of the
+command still match (see `get_signature`).
+
+Validation is not cached: it is a single linear pass over the
+declarations of a command, i.e., not more expensive than comparing the
+declarations to a cached state.
+"""
+
+from typing import Optional, Iterable, Any
+from pathlib import Path
+import sys
+import os
+
+from .option import Option
+from .argument import Argument
+
+
+def get_cache_dir(cache: Optional[bool | str | Path]) -> Optional[Path]:
+    """
+    Returns cache-directory for `Command.build`'s `cache`-keyword or
+    `None` if disabled.
+
+    If `cache` is `None`, the environment variable `_BEFEHL_CACHE` is
+    used (empty value for default location).
+    """
+    if cache is None:
+        cache = os.environ.get("_BEFEHL_CACHE")
+        if cache is None:
+            return None
+        cache = cache or True
+    if cache is False:
+        return None
+    if cache is True:
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or Path.home()
+        elif sys.platform == "darwin":
+            base = Path.home() / "Library" / "Caches"
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or (
+                Path.home() / ".cache"
+            )
+        return Path(base) / "befehl"
+    return Path(cache)
+
+
+def _hash(*key: Any) -> str:
+    """Returns hash of JSON-serializable `key`."""
+    # imported on demand (keeps import of `befehl` fast)
+    # pylint: disable=import-outside-toplevel
+    import json
+    import hashlib
+
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+
+def get_source_files(classes: Iterable[type]) -> list[list[Any]]:
+    """
+    Returns fingerprint (path, modification time, size) of the
+    source-files in which the given `classes` (and `befehl`) are
+    defined.
+    """
+    modules = {c.__module__ for c in classes} | {
+        name for name in sys.modules if name.split(".")[0] == "befehl"
+    }
+    files = []
+    for path in sorted(
+        {getattr(sys.modules.get(m), "__file__", None) for m in modules}
+        - {None}
+    ):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append([path, stat.st_mtime_ns, stat.st_size])
+    return files
+
+
+def get_signature(declaration: Any) -> list[Any]:
+    """
+    Returns JSON-serializable signature of an option-, argument-, or
+    subcommand-declaration (type, names, `helptext`, `nargs`,
+    `position`, `stream`, and allowed values of the parser). Cached help
+    is only used if the signatures of all declarations of the command
+    are unchanged.
+    """
+    if isinstance(declaration, Option):
+        values = declaration.values
+        return [
+            type(declaration).__name__,
+            list(declaration.names),
+            declaration.helptext,
+            declaration.nargs,
+            None if values is None else list(values),
+        ]
+    if isinstance(declaration, Argument):
+        values = declaration.values
+        return [
+            type(declaration).__name__,
+            declaration.name,
+            declaration.helptext,
+            declaration.nargs,
+            declaration.position,
+            declaration.stream,
+            None if values is None else list(values),
+        ]
+    return [type(declaration).__name__, declaration.name, declaration.helptext]
+
+
+def load(cache_file: Path) -> Optional[Any]:
+    """
+    Returns data from `cache_file` or `None` if not available or
+    outdated.
+    """
+    # pylint: disable=import-outside-toplevel
+    import json
+
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        for path, mtime, size in data["files"]:
+            stat = os.stat(path)
+            if stat.st_mtime_ns != mtime or stat.st_size != size:
+                return None
+        return data["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def store(cache_file: Path, classes: Iterable[type], data: Any) -> None:
+    """
+    Writes JSON-serializable `data` to `cache_file` (if possible) along
+    with the fingerprints of the source-files of `classes`.
+    """
+    # pylint: disable=import-outside-toplevel
+    import json
+
+    tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(
+            json.dumps({"files": get_source_files(classes), "data": data}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, cache_file)
+    except OSError:
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class HelpCache:
+    """
+    Rendered help of a command-tree in the build-cache. The directory
+    of the command-tree (based on `key`) is determined on first use.
+
+    Keyword arguments:
+    cache_dir -- cache-directory (see `get_cache_dir`)
+    key -- JSON-serializable identifier of the command-tree
+    """
+
+    __slots__ = ("__cache_dir", "__key", "__tree_dir")
+
+    def __init__(self, cache_dir: Path, *key: Any) -> None:
+        self.__cache_dir = cache_dir
+        self.__key = key
+        self.__tree_dir: Optional[Path] = None
+
+    def get_file(self, location: str, width: int) -> Path:
+        """
+        Returns path to cache-file for the help of the command at
+        `location` for line `width`.
+        """
+        if self.__tree_dir is None:
+            self.__tree_dir = self.__cache_dir / _hash(*self.__key)
+        return self.__tree_dir / f"{_hash(location)}.{width}.json"
+
+    def load(
+        self, location: str, width: int, signature: list[Any]
+    ) -> Optional[str]:
+        """
+        Returns cached help of the command at `location` for line
+        `width` or `None` if not available or if the `signature` of the
+        command's declarations changed.
+        """
+        data = load(self.get_file(location, width))
+        if not isinstance(data, dict) or data.get("signature") != signature:
+            return None
+        return data.get("text")
+
+    def store(
+        self,
+        location: str,
+        width: int,
+        signature: list[Any],
+        classes: Iterable[type],
+        text: str,
+    ) -> None:
+        """
+        Writes help `text` of the command at `location` for line `width`
+        (and the `signature` of the command's declarations) to the
+        cache.
+        """
+        store(
+            self.get_file(location, width),
+            classes,
+            {"signature": signature, "text": text},
+        )
@@ -0,0 +1,155 @@
+"""
+Definitions for indexed sets of allowed values (see
+`Parser.parse_with_values` and `Parser.parse_with_values_file`).
+
+Values are looked up in a hash-based index (a `frozenset` or, for
+case-insensitive matching, a map of normalized to original values).
+Values from a file are either loaded into such an index on first use
+or looked up by binary search in the memory-mapped (sorted) file.
+"""
+
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+import threading
+
+from .common import quote_list
+
+if TYPE_CHECKING:
+    import mmap
+
+
+# maximum number of values listed in error messages
+MAX_LISTED_VALUES = 10
+
+
+def format_values(values: Sequence[str]) -> str:
+    """
+    Returns enumeration of quoted `values` (truncated after
+    `MAX_LISTED_VALUES` values).
+    """
+    if len(values) <= MAX_LISTED_VALUES:
+        return quote_list(values)
+    return (
+        quote_list(values[:MAX_LISTED_VALUES])
+        + f", ... ({len(values) - MAX_LISTED_VALUES} more)"
+    )
+
+
+def normalize(value: str) -> str:
+    """Returns normalized `value` for case-insensitive matching."""
+    return value.casefold()
+
+
+def build_index(
+    values: Sequence[str], case_sensitive: bool
+) -> frozenset[str] | dict[str, str]:
+    """
+    Returns index for `values`: a `frozenset` or (if not
+    `case_sensitive`) a map of normalized to (first) original values.
+    """
+    if case_sensitive:
+        return frozenset(values)
+    index: dict[str, str] = {}
+    for value in values:
+        index.setdefault(normalize(value), value)
+    return index
+
+
+def lookup(
+    index: frozenset[str] | dict[str, str], data: str
+) -> Optional[str]:
+    """
+    Returns allowed value that matches `data` in `index` (`None` if
+    there is none).
+    """
+    if isinstance(index, frozenset):
+        return data if data in index else None
+    return index.get(normalize(data))
+
+
+def read_values(path: str) -> list[str]:
+    """
+    Returns non-empty lines of the UTF-8-encoded file at `path` (split
+    at '\\n' with trailing '\\r' removed, like `SortedFile`).
+    """
+    with open(
+        path, "r", encoding="utf-8", errors="surrogateescape", newline=""
+    ) as file:
+        return [
+            value
+            for value in (
+                line.rstrip("\r") for line in file.read().split("\n")
+            )
+            if value
+        ]
+
+
+class SortedFile:
+    """
+    Memory-mapped file of newline-delimited values that are sorted (by
+    code point, e.g., `LC_ALL=C sort`; for case-insensitive matching by
+    their normalized form, see `normalize`). Lookups take
+    `O(log(n))` comparisons without reading the entire file.
+
+    Keyword arguments:
+    path -- path of the file
+    case_sensitive -- whether values are matched case-sensitively
+                      (default True)
+    """
+
+    __slots__ = ("__path", "__key", "__lock", "__map")
+
+    def __init__(self, path: str, case_sensitive: bool = True) -> None:
+        self.__path = path
+        self.__key: Callable[[str], str] = (
+            str if case_sensitive else normalize
+        )
+        self.__lock = threading.Lock()
+        self.__map: Optional["mmap.mmap | bytes"] = None
+
+    def __load(self) -> "mmap.mmap | bytes":
+        """Returns (and on first call opens) memory-mapped file."""
+        # pylint: disable=import-outside-toplevel, redefined-outer-name
+        import mmap
+
+        with self.__lock:
+            if self.__map is None:
+                with open(self.__path, "rb") as file:
+                    try:
+                        self.__map = mmap.mmap(
+                            file.fileno(), 0, access=mmap.ACCESS_READ
+                        )
+                    except ValueError:
+                        # empty file cannot be mapped
+                        self.__map = b""
+            return self.__map
+
+    def get(self, data: str) -> Optional[str]:
+        """
+        Returns value in file that matches `data` (`None` if there is
+        none).
+        """
+        buffer = self.__map if self.__map is not None else self.__load()
+        if not data or "\n" in data:
+            return None
+        key = self.__key(data)
+        low, high = 0, len(buffer)
+        while low < high:
+            # line that contains the middle
+            middle = (low + high) // 2
+            start = buffer.rfind(b"\n", 0, middle) + 1
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                end = len(buffer)
+            value = (
+                buffer[start:end]
+                .rstrip(b"\r")
+                .decode("utf-8", errors="surrogateescape")
+            )
+            current = self.__key(value)
+            if current == key:
+                return value
+            if current < key:
+                low = end + 1
+            else:
+                high = start
+        return None
@@ -0,0 +1,512 @@
+"""
+Definitions for ahead-of-time code generation (see `generate`).
+
+The generated module contains the validated structure of a command-tree
+as literals and a specialized parsing function for every command.
+Importing it only imports the `Command`-classes and instantiates the
+root `Command`; nothing is validated or built. Parsing behaves like
+`CompiledCommand` (same results and errors). Since the `Command`-classes
+depend on `befehl` anyway, the generated module also uses its tokenizer
+and exceptions (i.e., it avoids the build-step, not the import of
+`befehl`).
+"""
+
+from typing import TYPE_CHECKING, Callable, Optional, Iterable, Any
+
+from .common import quote_list, is_coroutine_function
+from .option import Option
+from .argument import Argument
+from .command import Command, _HELP_OPTION, _AUTOCOMPLETE_OPTION
+from .lazy_command import LazyCommand
+from .compiled import compile_dispatch
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+_HEADER = '''"""
+Standalone parser for the command {name!r} (`{module}:{qualname}`).
+
+Generated by `befehl.codegen`; do not edit. Regenerate after changing
+the command-tree.
+"""
+
+# pylint: skip-file
+import sys
+from collections.abc import Awaitable
+
+from befehl.common import quote_list
+from befehl.compiled import tokenize, get_help_width, run_coroutine
+from befehl.command import _HELP_OPTION, _AUTOCOMPLETE_OPTION
+from befehl.errors import CliExit, ParseError, ValidationError
+from {module} import {top} as _ROOT_CLASS
+{loop_factory}
+
+_HELP = {help_!r}
+_COMPLETION = {completion!r}
+_C0 = _ROOT_CLASS{path}({name!r}, helptext={helptext!r})
+'''
+
+_FOOTER = '''
+
+def _resolve(raw):
+    node = 0
+    index = 0
+    while index < len(raw):
+        child = _NODES[node][3].get(raw[index])
+        if child is None:
+            break
+        node = child
+        index += 1
+    return node, index
+
+
+def _compile(node):
+    """
+    Returns `CompiledCommand` for `node` (only used for help and
+    autocomplete).
+    """
+    compiled = _C0.build(help_=_HELP, completion=_COMPLETION, cache=False)
+    return compiled.resolve(_NODES[node][5])[0]
+
+
+def _help(node):
+    width = get_help_width()
+    text = _HELP_TEXTS.get(node, {{}}).get(width)
+    if text is None:
+        text = _compile(node).get_help(width)
+    return text
+
+
+def _parse(raw):
+    if not isinstance(raw, (list, tuple)):
+        raw = list(raw)
+    node, index = _resolve(raw)
+    try:
+        return node, _NODES[node][2](raw[index:] if index > 0 else raw)
+    except CliExit as exc_info:
+        if exc_info.command is None:
+            exc_info.command = _NODES[node][1]
+        raise
+
+
+async def _execute_async(command, location, args):
+    result = command.validate(args)
+    ok, msg = await result if isinstance(result, Awaitable) else result
+    if not ok:
+        raise ValidationError(msg, command=location)
+    result = command.run(args)
+    return await result if isinstance(result, Awaitable) else result
+
+
+def parse(raw):
+    """
+    Returns the `Command` selected by input `raw` and its parsed input
+    (see `CompiledCommand.parse`).
+    """
+    node, args = _parse(raw)
+    return _NODES[node][0], args
+
+
+def invoke(raw=None):
+    """
+    Runs the command-tree for input `raw` (default `sys.argv[1:]`) and
+    returns the result of the selected `Command`'s `run` (see
+    `CompiledCommand.invoke`).
+    """
+    if raw is None:
+        raw = sys.argv[1:]
+    node, args = _parse(raw)
+    command, location, _, _, is_async, _ = _NODES[node]
+    if is_async:
+        return run_coroutine(
+            _execute_async(command, location, args), _LOOP_FACTORY
+        )
+    ok, msg = command.validate(args)
+    if not ok:
+        raise ValidationError(msg, command=location)
+    return command.run(args)
+
+
+def main(raw=None):
+    """Entry-point (see `CompiledCommand.__call__`)."""
+    try:
+        invoke(raw)
+    except CliExit as exc_info:
+        if exc_info.message is not None:
+            print(
+                exc_info.message,
+                file=sys.stdout if exc_info.exit_code == 0 else sys.stderr,
+            )
+        sys.exit(exc_info.exit_code)
+
+
+_HELP_TEXTS = {help_texts!r}
+_NODES = (
+{nodes}
+)
+'''
+
+
+def _get_references(
+    command: Command, expression: str
+) -> dict[int, str]:
+    """
+    Returns map of object ids to expressions for all attributes of the
+    class of `command` (available as `expression`).
+    """
+    references = {
+        id(_HELP_OPTION): "_HELP_OPTION",
+        id(_AUTOCOMPLETE_OPTION): "_AUTOCOMPLETE_OPTION",
+    }
+    for key, value in reversed(type(command).__dict__.items()):
+        references[id(value)] = f"type({expression}).__dict__[{key!r}]"
+    return references
+
+
+def _generate_node(
+    index: int,
+    command: Command,
+    location: str,
+    options: dict[str, Option],
+    arguments: list[Argument],
+    help_: bool,
+    completion: bool,
+) -> list[str]:
+    """Returns source lines for the tables and parser of a command."""
+    references = _get_references(command, f"_C{index}")
+    prefix = f"_C{index}"
+    lines = ["", "", f"# {location}"]
+
+    # declarations
+    names: dict[int, str] = {}
+    for i, argument in enumerate(arguments):
+        if argument.is_async or argument.stream:
+            raise ValueError(
+                f"Unsupported argument '{argument}' in command "
+                + f"'{location}' (coroutine parsers and streaming are not "
+                + "supported by code generation)."
+            )
+        names[id(argument)] = f"{prefix}_A{i}"
+        lines.append(f"{prefix}_A{i} = {references[id(argument)]}")
+
+    for i, option in enumerate(dict.fromkeys(options.values())):
+        if option.is_async:
+            raise ValueError(
+                f"Unsupported option {option} in command '{location}' "
+                + "(coroutine parsers are not supported by code "
+                + "generation)."
+            )
+        if option in (_HELP_OPTION, _AUTOCOMPLETE_OPTION):
+            names[id(option)] = references[id(option)]
+            continue
+        names[id(option)] = f"{prefix}_O{i}"
+        lines.append(f"{prefix}_O{i} = {references[id(option)]}")
+
+    def entry(value: Optional[tuple[Option, int]]) -> str:
+        if value is None:
+            return "None"
+        return f"({names[id(value[0])]}, {value[1]})"
+
+    dispatch, groups = compile_dispatch(options)
+    lines.append(f"{prefix}_DISPATCH = {{")
+    lines += [f"    {k!r}: {entry(v)}," for k, v in dispatch.items()]
+    lines.append("}")
+    lines.append(f"{prefix}_GROUPS = {{")
+    lines += [f"    {k!r}: {entry(v)}," for k, v in groups.items()]
+    lines.append("}")
+    collected = [
+        option
+        for option in dict.fromkeys(options.values())
+        if option.workers is not None or option.is_array
+    ]
+    if collected:
+        lines.append(
+            f"{prefix}_COLLECTED = {{"
+            + ", ".join(names[id(o)] for o in collected)
+            + "}"
+        )
+    strict = [
+        option
+        for option in dict.fromkeys(options.values())
+        if option.nargs >= 0 and option.strict
+    ]
+    if strict:
+        lines.append(f"{prefix}_STRICT = {{")
+        lines += [
+            f"    {names[id(o)]}: ({o.nargs}, {quote_list(o.names)!r}),"
+            for o in strict
+        ]
+        lines.append("}")
+
+    # parser
+    lines += [
+        "",
+        "",
+        f"def _parse_{index}(raw):",
+        "    result, values, positional, bad_order, given = tokenize(",
+        f"        raw, {prefix}_DISPATCH, {prefix}_GROUPS",
+        "    )",
+    ]
+    if help_:
+        lines += [
+            "    if _HELP_OPTION in given:",
+            f"        raise CliExit(_help({index}))",
+        ]
+    if completion:
+        lines += [
+            "    if _AUTOCOMPLETE_OPTION in given:",
+            "        raise CliExit(_compile(0)._render_autocomplete())",
+        ]
+    if options and collected:
+        lines += [
+            "    collected = {}",
+            "    positions = {}",
+            "    error = None",
+            "    for position, (option, value) in enumerate(values):",
+            f"        if option in {prefix}_COLLECTED:",
+            "            collected.setdefault(option, []).append(value)",
+            "            positions.setdefault(option, []).append(position)",
+            "        else:",
+            "            try:",
+            "                result[option].append(option.parse(value))",
+            "            except ParseError as exc_info:",
+            "                error = (position, exc_info)",
+            "                break",
+            "    for option, option_values in collected.items():",
+            "        try:",
+            "            result[option] = option.parse_many(option_values)",
+            "        except ParseError as exc_info:",
+            "            position = positions[option][exc_info.index]",
+            "            if error is None or position < error[0]:",
+            "                error = (position, exc_info)",
+            "    if error is not None:",
+            "        raise error[1]",
+        ]
+    elif options:
+        lines += [
+            "    for option, value in values:",
+            "        result[option].append(option.parse(value))",
+        ]
+    if strict:
+        lines += [
+            "    for option, option_values in result.items():",
+            f"        expected = {prefix}_STRICT.get(option)",
+            "        if expected is not None and len(option_values) != "
+            + "expected[0]:",
+            "            raise ParseError(",
+            '                f"Option {expected[1]} got an unexpected number '
+            + 'of arguments "',
+            '                + f"(expected {expected[0]} but got '
+            + '{len(option_values)})",',
+            "                target=option,",
+            "            )",
+        ]
+    if options:
+        lines += [
+            "    if bad_order is not None:",
+            "        raise ParseError(",
+            '            f"Bad order, got option "',
+            '            + f"{quote_list(bad_order.names)} in "',
+            '            + "argument-section (use -- separator)",',
+            "            target=bad_order,",
+            "        )",
+        ]
+    lines.append("    index = 0")
+    for argument in arguments:
+        name = names[id(argument)]
+        if argument.nargs < 0:
+            lines += [
+                f"    result[{name}] = {name}.parse_many(positional[index:])",
+                "    index = len(positional)",
+            ]
+            continue
+        message = (
+            f"Argument '{argument.name}' got too few values (expected "
+            + f"{argument.nargs} but got "
+        )
+        if argument.nargs == 1:
+            lines += [
+                "    if index >= len(positional):",
+                f"        raise ParseError({message + '0)'!r}, "
+                + f"target={name})",
+                f"    result[{name}] = [{name}.parse(positional[index])]",
+                "    index += 1",
+            ]
+            continue
+        lines += [
+            "    parsed = [",
+            f"        {name}.parse(value)",
+            f"        for value in positional[index:index + {argument.nargs}]",
+            "    ]",
+            f"    if len(parsed) < {argument.nargs}:",
+            "        raise ParseError(",
+            f"            {message!r}",
+            '            + f"{len(parsed)})",',
+            f"            target={name},",
+            "        )",
+            f"    result[{name}] = parsed",
+            f"    index += {argument.nargs}",
+        ]
+    lines += [
+        "    if index < len(positional):",
+        "        raise ParseError(",
+        f"            {'Command ' + repr(command.name) + ' got '!r}",
+        '            + f"{len(positional) - index} extra argument(s)",',
+        "            value=positional[index],",
+        "        )",
+        "    return result",
+    ]
+    return lines
+
+
+def _get_import(obj: Any, description: str) -> tuple[str, str, str]:
+    """
+    Returns module, top-level name, and remaining attribute path (like
+    ".A.B") for importing `obj` by its qualified name. Raises
+    `ValueError` if `obj` is not importable.
+    """
+    qualname = getattr(obj, "__qualname__", "<locals>")
+    if "<locals>" in qualname or getattr(obj, "__module__", None) is None:
+        raise ValueError(
+            f"Bad {description} ('{qualname}' is not importable)."
+        )
+    parts = qualname.split(".")
+    return obj.__module__, parts[0], "".join(f".{part}" for part in parts[1:])
+
+
+def generate(
+    command: Command,
+    *,
+    help_: bool = True,
+    completion: bool = False,
+    help_widths: Optional[Iterable[int]] = None,
+    loop_factory: Optional[Callable[[], "asyncio.AbstractEventLoop"]] = None,
+) -> str:
+    """
+    Returns source of a standalone Python module for the command-tree
+    of `command`. Raises `ValueError` if the command-tree is invalid or
+    uses features that are not supported by code generation
+    (`LazyCommand`s, coroutine parsers, and streaming `Argument`s).
+
+    The module provides the functions `parse`, `invoke`, and `main`
+    (equivalents of `CompiledCommand.parse`, `CompiledCommand.invoke`,
+    and calling a `CompiledCommand`). It imports the `Command`-classes
+    (which, therefore, must be importable by their qualified names)
+    and instantiates `command`'s class with its name and helptext.
+    Help and autocomplete fall back to building the command-tree with
+    `befehl` unless help has been pre-rendered for the current line
+    width. Tracing (`befehl.trace`) is not supported.
+
+    Keyword arguments:
+    command -- root `Command` of the command-tree
+    help_ -- whether to generate a help-option
+             (default True)
+    completion -- whether to generate an option for the
+                  bash-autocomplete source-file
+                  (default False)
+    help_widths -- line widths for which help is pre-rendered and
+                   embedded into the module
+                   (default None)
+    loop_factory -- callable that returns a new event loop for
+                    asynchronous commands (see `Command.build`); must
+                    be importable by its qualified name
+                    (default None; uses `asyncio.new_event_loop`)
+    """
+    help_widths = tuple(help_widths or ())
+    compiled = None
+    if help_ and help_widths:
+        compiled = command.build(
+            help_=help_, completion=completion, cache=False
+        )
+
+    # pylint: disable=protected-access
+    lines = []
+    nodes: list[tuple[str, tuple[str, ...], dict[str, int], bool]] = []
+    help_texts: dict[int, dict[int, str]] = {}
+    stack: list[tuple[int, Command, tuple[str, ...], bool]] = [
+        (0, command, (), completion)
+    ]
+    while stack:
+        index, node, path, node_completion = stack.pop(0)
+        location = " ".join((command.name.strip(),) + path)
+        if isinstance(node, LazyCommand):
+            raise ValueError(
+                f"Unsupported command '{location}' (LazyCommands are not "
+                + "supported by code generation)."
+            )
+        subcommands = {}
+        references = _get_references(node, f"_C{index}")
+        for name, subcommand in node._validate_subcommands(location).items():
+            subcommands[name] = len(nodes) + len(stack) + 1
+            lines.append(
+                f"_C{subcommands[name]} = {references[id(subcommand)]}"
+            )
+            stack.append(
+                (subcommands[name], subcommand, path + (name,), False)
+            )
+        lines += _generate_node(
+            index,
+            node,
+            location,
+            node._validate_options(help_, node_completion, location),
+            node._validate_arguments(location),
+            help_,
+            node_completion,
+        )
+        nodes.append(
+            (
+                location,
+                path,
+                subcommands,
+                any(map(is_coroutine_function, (node.validate, node.run))),
+            )
+        )
+        if compiled is not None:
+            target = compiled.resolve(path)[0]
+            help_texts[index] = {
+                width: target.get_help(width) for width in help_widths
+            }
+
+    module, top, attributes = _get_import(
+        type(command), f"command '{command.name}'"
+    )
+    if loop_factory is None:
+        loop_factory_import = "_LOOP_FACTORY = None\n"
+    else:
+        factory_module, factory_top, factory_attributes = _get_import(
+            loop_factory, "loop_factory"
+        )
+        loop_factory_import = (
+            f"from {factory_module} import {factory_top} as _LOOP_FACTORY\n"
+        )
+        if factory_attributes:
+            loop_factory_import += (
+                f"_LOOP_FACTORY = _LOOP_FACTORY{factory_attributes}\n"
+            )
+    return (
+        _HEADER.format(
+            name=command.name,
+            module=module,
+            qualname=type(command).__qualname__,
+            top=top,
+            path=attributes,
+            loop_factory=loop_factory_import,
+            helptext=command.helptext,
+            help_=help_,
+            completion=completion,
+        )
+        + "\n".join(lines)
+        + "\n"
+        + _FOOTER.format(
+            help_texts=help_texts,
+            nodes="\n".join(
+                f"    (_C{i}, {location!r}, _parse_{i}, {subcommands!r}, "
+                + f"{is_async!r}, {path!r}),"
+                for i, (location, path, subcommands, is_async) in enumerate(
+                    nodes
+                )
+            ),
+        )
+    )
+
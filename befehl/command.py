@@ -1,14 +1,56 @@
 """Definitions for class `Command`."""
 
-from typing import Callable, Optional, Iterable, Any
+from typing import TYPE_CHECKING, Callable, Optional, Iterable, Any
 from abc import abstractmethod
 import sys
 import os
-from itertools import zip_longest
+from pathlib import Path
 
-from .common import quote_list
 from .option import Option
 from .argument import Argument
+from .compiled import CompiledCommand
+from .response_file import READERS
+from .errors import BuildError
+from . import cache as build_cache
+from . import trace
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+# generated options (shared by all commands)
+_HELP_OPTION = Option(
+    ("-h", "--help"),
+    helptext="Output this message and exit.",
+    nargs=0,
+)
+_AUTOCOMPLETE_OPTION = Option(
+    ("--generate-autocomplete"),
+    helptext="Output source-file for bash autocomplete",
+    nargs=0,
+)
+_FILES_FROM_OPTION = Option(
+    "--files-from",
+    helptext="Read additional argument values from this file (one per "
+    + "line).",
+    nargs=1,
+)
+_NULL_OPTION = Option(
+    ("-0", "--null"),
+    helptext="Values read from files or stdin are NUL-delimited.",
+    nargs=0,
+)
+
+
+def _fail(message: str, errors: Optional[list[str]]) -> bool:
+    """
+    Raises `ValueError` with `message` or, if `errors` is given,
+    appends `message` to `errors`. Returns `False`.
+    """
+    if errors is None:
+        raise ValueError(message)
+    errors.append(message)
+    return False
 
 
 class Command:
@@ -45,24 +87,7 @@ class Command:
                 (defeault None)
     """
 
-    _BASH_COMPLETION_TEMPLATE = """{function_name}-completion()
-{{
-    local cur command files
-
-    cur=${{COMP_WORDS[COMP_CWORD]}}
-    command="${{COMP_WORDS[*]}}"
-    files=$(compgen -f -- "$cur")
-
-    case "$command" in
-{completion_cases}
-    esac
-}}
-
-complete -o nosort -F {function_name}-completion {cli}
-"""
-    _BASH_COMPLETION_CASE_TEMPLATE = """        "{subcommand} "*)
-            COMPREPLY=($(compgen -W "{words}" -- ${{cur}}) $files)
-            ;;"""
+    __slots__ = ("__name", "__helptext")
 
     def __init__(
         self,
@@ -72,21 +97,6 @@ complete -o nosort -F {function_name}-completion {cli}
     ) -> None:
         self.__name = name
         self.__helptext = helptext
-        self.__help_option = Option(
-            ("-h", "--help"),
-            helptext="Output this message and exit.",
-            nargs=0,
-        )
-        self.__autocomplete_option = Option(
-            ("--generate-autocomplete"),
-            helptext="Output source-file for bash autocomplete",
-            nargs=0,
-        )
-        self.__options_map: dict[str, Option] = {}
-        self.__arguments_list: list[Argument] = []
-        self.__subcommands: dict[
-            str, tuple[Command, Callable[[Optional[Iterable[str]]], None]]
-        ] = {}
 
     @property
     def name(self) -> str:
@@ -105,9 +115,16 @@ complete -o nosort -F {function_name}-completion {cli}
         return self.name
 
     def _validate_options(
-        self, help_: bool, completion: bool, command_name: str
-    ) -> None:
-        """Performs options-validation."""
+        self,
+        help_: bool,
+        completion: bool,
+        command_name: str,
+        errors: Optional[list[str]] = None,
+    ) -> dict[str, Option]:
+        """
+        Performs options-validation and returns map of option names. If
+        `errors` is given, violations are appended instead of raised.
+        """
         # collect options
         options: list[Option] = list(
             filter(
@@ -117,77 +134,75 @@ complete -o nosort -F {function_name}-completion {cli}
         )
 
         if help_:
-            options.append(self.__help_option)
+            options.append(_HELP_OPTION)
 
         if completion:
-            options.append(self.__autocomplete_option)
+            options.append(_AUTOCOMPLETE_OPTION)
 
-        if len(options) == 0:
-            return
+        if self._has_stream():
+            options.append(_FILES_FROM_OPTION)
+            options.append(_NULL_OPTION)
 
-        option_names = []
-
-        # uniqueness + collect names
+        # check uniqueness and format while building map
+        result: dict[str, Option] = {}
         for option in options:
             for name in option.names:
-                if name in option_names:
-                    raise ValueError(
+                name = name.strip()
+                if name in result:
+                    message = (
                         f"Ambiguous name '{name}' in option {option} of "
-                        f"command '{command_name}'.",
+                        + f"command '{command_name}'."
                     )
-                option_names.append(name.strip())
-
-        # check proper format
-        # * whitespace
-        for name in option_names:
-            if len(name.split()) > 1:
-                raise ValueError(
-                    f"Bad option {repr(name)} in command '{command_name}' "
-                    + "(must not contain whitespace).",
-                )
-        # * startswith
-        for name in option_names:
-            if not name.startswith("-"):
-                raise ValueError(
-                    f"Bad option '{name}' in command '{command_name}' (must "
-                    + "start with '-').",
-                )
-        # * -- not allowed
-        for name in option_names:
-            if name == "--":
-                raise ValueError(
-                    f"Bad option '{name}' in command '{command_name}' (must "
-                    + "not equal '--').",
-                )
-        # * = not allowed
-        for name in option_names:
-            if "=" in name:
-                raise ValueError(
-                    f"Bad option '{name}' in command '{command_name}' (must "
-                    + "not contain '=').",
-                )
-        # * length (more than single hyphen)
-        for name in option_names:
-            if len(name) == 1:
-                raise ValueError(
-                    f"Bad option '{name}' in command '{command_name}' (missing"
-                    + " character after '-').",
-                )
-        # * short/long
-        for name in option_names:
-            if name[1] != "-" and len(name) > 2:
-                raise ValueError(
-                    f"Bad option '{name}' in command '{command_name}' (short "
-                    + "option must be a single character).",
-                )
+                elif len(name.split()) > 1:
+                    message = (
+                        f"Bad option {repr(name)} in command "
+                        + f"'{command_name}' (must not contain whitespace)."
+                    )
+                elif not name.startswith("-"):
+                    message = (
+                        f"Bad option '{name}' in command '{command_name}' "
+                        + "(must start with '-')."
+                    )
+                elif name == "--":
+                    message = (
+                        f"Bad option '{name}' in command '{command_name}' "
+                        + "(must not equal '--')."
+                    )
+                elif "=" in name:
+                    message = (
+                        f"Bad option '{name}' in command '{command_name}' "
+                        + "(must not contain '=')."
+                    )
+                elif len(name) == 1:
+                    message = (
+                        f"Bad option '{name}' in command '{command_name}' "
+                        + "(missing character after '-')."
+                    )
+                elif name[1] != "-" and len(name) > 2:
+                    message = (
+                        f"Bad option '{name}' in command '{command_name}' "
+                        + "(short option must be a single character)."
+                    )
+                else:
+                    result[name] = option
+                    continue
+                _fail(message, errors)
+        return result
 
-        # build map
-        for option in options:
-            for name in option.names:
-                self.__options_map[name.strip()] = option
+    def _has_stream(self) -> bool:
+        """Returns `True` if this `Command` has a streaming `Argument`."""
+        return any(
+            isinstance(o, Argument) and o.stream
+            for o in self.__class__.__dict__.values()
+        )
 
-    def _validate_arguments(self, command_name: str) -> None:
-        """Performs arguments-validation."""
+    def _validate_arguments(
+        self, command_name: str, errors: Optional[list[str]] = None
+    ) -> list[Argument]:
+        """
+        Performs arguments-validation and returns ordered arguments. If
+        `errors` is given, violations are appended instead of raised.
+        """
         # collect arguments
         arguments: list[Argument] = list(
             filter(
@@ -196,21 +211,22 @@ complete -o nosort -F {function_name}-completion {cli}
             )
         )
         if len(arguments) == 0:
-            return
+            return []
 
         # check
-        # * nargs<0 cannot be combined with any other
+        ok = True
         if len(arguments) > 1:
+            # * nargs<0 cannot be combined with any other
             bad_arg = next((arg for arg in arguments if arg.nargs < 0), None)
             if bad_arg is not None:
-                raise ValueError(
+                ok = _fail(
                     f"Bad argument '{bad_arg}' in command '{command_name}' "
                     + "(unlimited 'nargs' must not be combined with other "
-                    + "arguments)."
+                    + "arguments).",
+                    errors,
                 )
 
-        # * none or all arguments have position
-        if len(arguments) > 1:
+            # * none or all arguments have position
             bad_arg = next(
                 (
                     arg
@@ -221,455 +237,92 @@ complete -o nosort -F {function_name}-completion {cli}
                 None,
             )
             if bad_arg is not None:
-                raise ValueError(
+                ok = _fail(
                     f"Bad arguments in command '{command_name}' (either "
-                    + "all arguments or none must get 'position'-keyword)."
+                    + "all arguments or none must get 'position'-keyword).",
+                    errors,
                 )
 
         # * duplicate positions
         if arguments[0].position is not None:
-            positions = []
+            positions = set()
             for argument in arguments:
                 if argument.position in positions:
-                    raise ValueError(
-                        f"Bad arguments in command '{command_name}' (conflict "
-                        + f"for position '{argument.position}')."
+                    ok = _fail(
+                        f"Bad arguments in command '{command_name}' "
+                        + f"(conflict for position '{argument.position}').",
+                        errors,
                     )
-                positions.append(argument.position)
+                positions.add(argument.position)
 
-        # build map
-        self.__arguments_list.extend(
-            arguments
-            if arguments[0].position is None
-            else sorted(arguments, key=lambda a: a.position)
-        )
+        # build list
+        if not ok or arguments[0].position is None:
+            return arguments
+        return sorted(arguments, key=lambda a: a.position)
 
     def _validate_subcommands(
-        self,
-        help_: bool,
-        command_name: str,
-    ) -> None:
-        """Performs subcommand-validation."""
+        self, command_name: str, errors: Optional[list[str]] = None
+    ) -> dict[str, "Command"]:
+        """
+        Performs subcommand-validation and returns map of subcommand
+        names. If `errors` is given, violations are appended instead of
+        raised.
+
+        Subcommands themselves are built on first use (see
+        `CompiledCommand`).
+        """
         commands: list["Command"] = list(
             filter(
                 lambda o: isinstance(o, Command),
                 self.__class__.__dict__.values(),
             )
         )
-        if len(commands) == 0:
-            return
 
-        # check
-        # * duplicate names
-        command_names = []
+        # check uniqueness and format while building map
+        result: dict[str, "Command"] = {}
         for command in commands:
-            if command.name in command_names:
-                raise ValueError(
+            name = command.name.strip()
+            if name in result:
+                message = (
                     f"Ambiguous subcommand '{command}' in command "
                     + f"'{command_name}'."
                 )
-            command_names.append(command.name.strip())
-        # * whitespace
-        for name in command_names:
-            if len(name.split()) > 1:
-                raise ValueError(
-                    f"Bad subcommand {repr(name)} in command '{command_name}' "
-                    + "(must not contain whitespace).",
+            elif len(name.split()) > 1:
+                message = (
+                    f"Bad subcommand {repr(name)} in command "
+                    + f"'{command_name}' (must not contain whitespace)."
                 )
-        # * leading character
-        for name in command_names:
-            if name.startswith("-"):
-                raise ValueError(
+            elif name.startswith("-"):
+                message = (
                     f"Bad subcommand '{name}' in command '{command_name}' "
-                    + "(must not start with '-').",
-                )
-
-        # build map
-        for command in commands:
-            self.__subcommands[command.name.strip()] = (
-                command,
-                command.build(help_=help_, completion=False, loc=command_name),
-            )
-
-    def _parse_preprocess_options(
-        self, raw: Iterable[str]
-    ) -> list[Option | str]:
-        """
-        Returns pre-processed raw-input.
-
-        Pre-processing options consists of
-        * validating requirements
-          * not allowed characters
-          * unknown options
-          * ..
-        * resolve input with '='-syntax or grouped short-options
-        * replaces option-names with Option-instances
-          * respects '--'-separator for options and arguments
-        """
-        preprocessed = []
-        post_options = False
-        for arg in raw:
-            if arg == "--":
-                post_options = True
-                preprocessed.append(arg)
-                continue
-
-            # resolve options with '=' if needed
-            if not post_options and "=" in arg:
-                op, value = arg.split("=", maxsplit=1)
-                if op in self.__options_map:
-                    preprocessed.extend([self.__options_map[op], value])
-                    continue
-
-            # resolve grouped short options
-            if (
-                not post_options
-                and len(arg) > 2
-                and arg[0] == "-"
-                and arg[1] != "-"
-            ):
-                if "=" in arg:
-                    print(
-                        "Syntax '<option-group>=<value>' not allowed",
-                        file=sys.stderr,
-                    )
-                    sys.exit(1)
-                split = list(map(lambda s: f"-{s}", arg[1:]))
-                for op in split:
-                    if op not in self.__options_map:
-                        print(f"Unknown option '{op}'", file=sys.stderr)
-                        sys.exit(1)
-                    if (
-                        self.__options_map[op].nargs > 0
-                        and self.__options_map[op].strict
-                    ):
-                        print(
-                            f"Missing arguments for option '{op}'",
-                            file=sys.stderr,
-                        )
-                        sys.exit(1)
-                    preprocessed.append(self.__options_map[op])
-                continue
-
-            # unknown options
-            if (
-                not post_options
-                and arg.startswith("-")
-                and arg not in self.__options_map
-            ):
-                print(
-                    f"Unknown option '{arg}'",
-                    file=sys.stderr,
+                    + "(must not start with '-')."
                 )
-                sys.exit(1)
-
-            # regular option
-            if not post_options and arg in self.__options_map:
-                preprocessed.append(self.__options_map[arg])
-                continue
-
-            # regular argument
-            preprocessed.append(arg)
-
-        return preprocessed
-
-    def _parse_postprocess_options(
-        self, result: dict[Option | Argument, list[Any]]
-    ) -> None:
-        """
-        Post-processing options consists of
-        * validating violation of strict-options
-        """
-
-        # handle bad number of args for options
-        for option, values in result.items():
-            # validate strict options
-            if (
-                option.nargs >= 0
-                and option.strict
-                and len(values) != option.nargs
-            ):
-                print(
-                    f"Option {quote_list(option.names)} got an unexpected "
-                    + f"number of arguments (expected {option.nargs} but "
-                    + f"got {len(values)})",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
-
-    def _parse_preprocess_arguments(
-        self, unprocessed: Iterable[Option | str]
-    ) -> None:
-        """
-        Pre-processing arguments consists of
-        * validating unexpected remaining Options
-        """
-
-        # handle bad order of options
-        for arg in unprocessed:
-            # validate strict options
-            if isinstance(arg, Option):
-                print(
-                    f"Bad order, got option {quote_list(arg.names)} in "
-                    + "argument-section (use -- separator)",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
-
-    def _parse_postprocess_arguments(
-        self, unprocessed: Iterable[Option | str]
-    ) -> None:
-        """
-        Post-processing arguments consists of
-        * validating extra arguments
-        """
-        if len(unprocessed) > 0:
-            print(
-                f"Command '{self.name}' got {len(unprocessed)} extra "
-                + "argument(s)",
-                file=sys.stderr,
-            )
-            sys.exit(1)
-
-    def _parse(self, raw: Iterable[str]) -> dict[Option | Argument, list[Any]]:
-        """Parse given raw input."""
-
-        preprocessed = self._parse_preprocess_options(raw)
-
-        if self.__help_option in preprocessed:
-            self._print_help()
-
-        if self.__autocomplete_option in preprocessed:
-            self._print_autocomplete()
-
-        # collect arguments by option
-        result = {}
-        unprocessed = list(reversed(preprocessed))
-        while len(unprocessed) > 0:
-            arg = unprocessed[-1]
-
-            # check if option
-            if isinstance(arg, Option):
-                unprocessed.pop()
-                option = arg
-                # initialize collection
-                if option not in result:
-                    result[option] = []
-            else:
-                # options exhausted
-                break
-
-            # collect values for that option
-            while len(unprocessed) > 0 and (
-                option.nargs < 0 or len(result[option]) < option.nargs
-            ):
-                value = unprocessed[-1]
-                if isinstance(value, Option) or value == "--":
-                    # next option
-                    break
-                result[option].append(option.parse(value))
-                unprocessed.pop()
-
-        self._parse_postprocess_options(result)
-
-        self._parse_preprocess_arguments(unprocessed)
-
-        # remove separator if needed
-        if len(unprocessed) > 0 and unprocessed[-1] == "--":
-            unprocessed.pop()
-
-        # process arguments
-        for argument in self.__arguments_list:
-
-            result[argument] = []
-            if argument.nargs < 0:
-                result[argument].extend(map(argument.parse, unprocessed))
-                unprocessed.clear()
             else:
-                for _ in range(argument.nargs):
-                    if len(unprocessed) == 0:
-                        print(
-                            f"Argument '{argument.name}' got too few values "
-                            + f"(expected {argument.nargs} but got "
-                            + f"{len(result[argument])})",
-                            file=sys.stderr,
-                        )
-                        sys.exit(1)
-                    result[argument].append(argument.parse(unprocessed.pop()))
-
-        self._parse_postprocess_arguments(unprocessed)
-
+                result[name] = command
+                continue
+            _fail(message, errors)
         return result
 
-    def _print_help(self):
-        """Prints help to stdout then exit."""
-
-        def break_into_indented_lines(
-            text: Optional[str],
-            indent: int,
-            relative_indent: int,
-            width: int,
-        ) -> list[str]:
-            """Returns broken down text."""
-            if text is None:
-                return []
-            result = []
-            remainder = text
-            line = ""
-            while True:
-                if remainder.strip() == "":
-                    if line != "":
-                        result.append(line)
-                    break
-
-                # initialize line
-                if line.strip() == "":
-                    line = " " * (indent + relative_indent * (len(result) > 0))
-
-                # get next word
-                try:
-                    word, remainder = remainder.split(maxsplit=1)
-                except ValueError:
-                    word = remainder.strip()
-                    remainder = ""
-
-                # determine mode of operation
-                if len(line) + len(word) + 1 > width:
-                    if len(line.strip()) > 0:
-                        # try in next line
-                        remainder = word + " " + remainder
-                    else:
-                        remainder = (
-                            word[width - 1 - len(line) :] + " " + remainder
-                        )
-                        line += (
-                            " " * (len(line.strip()) > 0)
-                            + word[: width - 1 - len(line)]
-                        )
-                    result.append(line)
-                    line = ""
-                    continue
-
-                line += " " * (len(line.strip()) > 0) + word
-
-            return result
-
-        try:
-            w, _ = os.get_terminal_size()
-        except OSError:
-            w = 100
-        w = max(w, 41) - 3
-        lines = break_into_indented_lines(self.helptext, 0, 0, w)
-        indent = 2
-        space = 1
-
-        if len(lines) > 0:
-            lines += [""]
-
-        lines += break_into_indented_lines(
-            "Usage: [command] [subcommand] [options] [--] [args]", 0, indent, w
-        )
-
-        for category, records in [
-            (
-                "Subcommands:",
-                [
-                    (command[0].name, command[0])
-                    for command in self.__subcommands.values()
-                ],
-            ),
-            (
-                "Options:",
-                [
-                    (", ".join(sorted(option.names, key=len)), option)
-                    for option in set(self.__options_map.values())
-                ],
-            ),
-            (
-                "Arguments:",
-                [
-                    (
-                        argument.name
-                        + (
-                            ""
-                            if argument.nargs == 1
-                            else f" [1..{'n' if argument.nargs < 0 else argument.nargs}]"
-                        ),
-                        argument,
-                    )
-                    for argument in self.__arguments_list
-                ],
-            ),
-        ]:
-            if len(records) > 0:
-                lines += ["", category]
-                for record_name, record in sorted(records, key=lambda o: o[0]):
-                    w_left = min(round(w / 2), 35) - indent
-                    w_right = w - min(round(w / 2), 35) - space
-                    record_left = break_into_indented_lines(
-                        record_name,
-                        indent,
-                        indent,
-                        w_left,
-                    )
-                    record_right = break_into_indented_lines(
-                        record.helptext or "- no description provided -",
-                        indent,
-                        indent,
-                        w_right,
-                    )
-                    for left, right in zip_longest(
-                        record_left, record_right, fillvalue=""
-                    ):
-                        lines += [
-                            left + " " * (space + w_left - len(left)) + right
-                        ]
-
-        print("\n".join(lines))
-        sys.exit(0)
-
-    def _get_completion_words(self) -> str:
-        """
-        Returns a list of strings to be used as completion-words for
-        self.
-        """
-        return " ".join(
-            list(self.__subcommands.keys())
-            + [
-                " ".join(option.names)
-                for option in set(self.__options_map.values())
-                if option != self.__autocomplete_option
-            ]
-        )
-
-    def get_completion_cases(self, subcommand: str) -> str:
+    def _collect_errors(
+        self,
+        help_: bool,
+        completion: bool,
+        command_name: str,
+        errors: list[str],
+    ) -> None:
         """
-        Returns formatted template for completion cases for this and
-        all subcommands.
+        Validates this `Command` and all subcommands and appends all
+        violations to `errors`.
         """
-        cases = [
-            command.get_completion_cases(
-                subcommand + " " + command.name.strip()
-            )
-            for command, _ in self.__subcommands.values()
-        ]
-        cases.append(
-            self._BASH_COMPLETION_CASE_TEMPLATE.format(
-                subcommand=subcommand, words=self._get_completion_words()
-            )
-        )
-        return "\n".join(cases)
-
-    def _print_autocomplete(self):
-        """Prints autocomplete and exists."""
-        print(
-            self._BASH_COMPLETION_TEMPLATE.format(
-                function_name="_" + self.name.strip().upper(),
-                completion_cases=self.get_completion_cases(self.name.strip()),
-                cli=self.name.strip(),
+        self._validate_options(help_, completion, command_name, errors)
+        self._validate_arguments(command_name, errors)
+        for name, command in self._validate_subcommands(
+            command_name, errors
+        ).items():
+            # pylint: disable=protected-access
+            command._collect_errors(
+                help_, False, f"{command_name} {name}", errors
             )
-        )
-        sys.exit(0)
 
     def build(
         self,
@@ -677,8 +330,72 @@ complete -o nosort -F {function_name}-completion {cli}
         help_: bool = True,
         completion: Optional[bool] = None,
         loc: Optional[str] = None,
-    ) -> Callable[[Optional[Iterable[str]]], None]:
-        """Returns cli-callable."""
+        strict: Optional[bool] = None,
+        cache: Optional[bool | str | Path | build_cache.HelpCache] = None,
+        loop_factory: Optional[
+            Callable[[], "asyncio.AbstractEventLoop"]
+        ] = None,
+        response_files: Optional[str] = None,
+        abbreviations: bool = False,
+        help_widths: Optional[Iterable[int]] = None,
+        collect_errors: bool = False,
+    ) -> CompiledCommand:
+        """
+        Returns cli-callable (a `CompiledCommand`). Raises `ValueError`
+        if the command-tree is invalid.
+
+        Keyword arguments:
+        help_ -- whether to generate a help-option
+                 (default True)
+        completion -- whether to generate an option for the
+                      bash-autocomplete source-file
+                      (default None; enabled if environment sets
+                      `_BEFEHL_COMPLETION`)
+        loc -- location of this `Command` in the command-tree
+               (default None; used internally for subcommands)
+        strict -- if `True`, validate and build the entire command-tree
+                  immediately; otherwise subcommands are validated and
+                  built when first invoked
+                  (default None; enabled if environment sets
+                  `_BEFEHL_STRICT`)
+        cache -- whether to use the persistent build-cache for rendered
+                 help; either a boolean (`True` for the default location
+                 in the user's cache-directory) or a cache-directory
+                 (for subcommands, i.e., if `loc` is given, the
+                 `befehl.cache.HelpCache` of the command-tree or `None`)
+                 (default None; enabled if environment sets
+                 `_BEFEHL_CACHE`, optionally with a cache-directory)
+        loop_factory -- callable that returns a new event loop; every
+                        invocation that involves coroutines (`async`
+                        `run`, `validate`, or parsers) runs in a single
+                        event loop created by this factory (e.g.,
+                        `uvloop.new_event_loop`)
+                        (default None; uses `asyncio.new_event_loop`)
+        response_files -- if given, input tokens `@path` are replaced by
+                          the contents of the file at `path` (read
+                          incrementally; may include other files); the
+                          format of files is either "shell"
+                          (shell-like quoting), "newline" (one token
+                          per line), or "nul" (NUL-delimited)
+                          (default None; disabled)
+        abbreviations -- whether long options can be given by a unique
+                         prefix (e.g., '--verb' for '--verbose');
+                         applies to the entire command-tree
+                         (default False)
+        help_widths -- line widths for which the help of the entire
+                       command-tree is rendered during build (see
+                       `CompiledCommand.get_help`); rendered help is
+                       also stored in the build-cache (and only read
+                       from there when requested)
+                       (default None; help is rendered on first use
+                       per width)
+        collect_errors -- if `True`, validate the entire command-tree
+                          (including `LazyCommand`s) before building
+                          and raise a `BuildError` that reports all
+                          violations instead of a `ValueError` for the
+                          first one
+                          (default False)
+        """
         # prepare
         if loc is None:
             command_name = self.name.strip()
@@ -688,35 +405,111 @@ complete -o nosort -F {function_name}-completion {cli}
         if completion is None:
             completion = "_BEFEHL_COMPLETION" in os.environ
 
-        # validate and build components
-        self._validate_options(help_, completion, command_name)
-        self._validate_arguments(command_name)
-        self._validate_subcommands(help_, command_name)
+        if strict is None:
+            strict = "_BEFEHL_STRICT" in os.environ
 
-        # define command logic
-        def command(raw: Optional[Iterable[str]] = None) -> None:
-            # load raw input
-            if raw is None:
-                raw = sys.argv[1:]
+        if response_files is not None and response_files not in READERS:
+            raise ValueError(
+                f"Unknown response file format '{response_files}' (expected "
+                + f"one of {', '.join(map(repr, READERS))})."
+            )
+
+        if collect_errors:
+            errors = []
+            self._collect_errors(help_, completion, command_name, errors)
+            if errors:
+                raise BuildError(errors)
 
-            # determine subcommand
-            if len(raw) > 0 and raw[0] in self.__subcommands:
-                self.__subcommands[raw[0]][1](raw[1:])
-                return
+        # build-cache of the command-tree
+        if loc is None:
+            cache_dir = build_cache.get_cache_dir(cache)
+            cache = (
+                None
+                if cache_dir is None
+                else build_cache.HelpCache(
+                    cache_dir,
+                    self.__class__.__module__,
+                    self.__class__.__qualname__,
+                    getattr(
+                        sys.modules[self.__class__.__module__],
+                        "__file__",
+                        None,
+                    ),
+                    self.name,
+                    help_,
+                    completion,
+                )
+            )
+        elif not isinstance(cache, build_cache.HelpCache):
+            cache = None
+
+        return trace.call(
+            "build",
+            self._build,
+            help_,
+            completion,
+            command_name,
+            strict,
+            cache,
+            loop_factory,
+            response_files,
+            abbreviations,
+            help_widths,
+            command=command_name,
+        )
 
-            # parse
-            args = self._parse(raw)
+    # pylint: disable=too-many-arguments
+    def _build(
+        self,
+        help_: bool,
+        completion: bool,
+        command_name: str,
+        strict: bool,
+        cache: Optional[build_cache.HelpCache],
+        loop_factory: Optional[Callable[[], "asyncio.AbstractEventLoop"]],
+        response_files: Optional[str],
+        abbreviations: bool,
+        help_widths: Optional[Iterable[int]],
+    ) -> CompiledCommand:
+        """Returns `CompiledCommand` (see `build`)."""
+        compiled = CompiledCommand(
+            self,
+            command_name,
+            self._validate_options(help_, completion, command_name),
+            self._validate_arguments(command_name),
+            self._validate_subcommands(command_name),
+            help_option=_HELP_OPTION if help_ else None,
+            autocomplete_option=(
+                _AUTOCOMPLETE_OPTION if completion else None
+            ),
+            stream_options=(
+                (_FILES_FROM_OPTION, _NULL_OPTION)
+                if self._has_stream()
+                else None
+            ),
+            build_kwargs={
+                "help_": help_,
+                "completion": False,
+                "loc": command_name,
+                "strict": strict,
+                "cache": cache,
+                "loop_factory": loop_factory,
+                "abbreviations": abbreviations,
+            },
+            loop_factory=loop_factory,
+            response_files=response_files,
+            abbreviations=abbreviations,
+            help_cache=cache,
+        )
 
-            # validate
-            ok, msg = self.validate(args)
-            if not ok:
-                print(msg, file=sys.stderr)
-                sys.exit(1)
+        if help_ and help_widths is not None:
+            compiled.prerender_help(help_widths)
 
-            # run
-            self.run(args)
+        if strict:
+            # pylint: disable=protected-access
+            compiled._compile_subcommands()
 
-        return command
+        return compiled
 
     def validate(
         # pylint: disable=unused-argument
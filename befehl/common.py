@@ -1,6 +1,12 @@
 """Common definitions."""
 
-from typing import Optional, Iterable
+from typing import Callable, Optional, Iterable, Sequence, Any
+from functools import partial
+from itertools import chain
+from types import FunctionType, MethodType, BuiltinFunctionType
+
+from .errors import ParseError
+from . import trace
 
 
 def quote_list(data: Iterable[str], quote: Optional[str] = None) -> str:
@@ -8,3 +14,234 @@ def quote_list(data: Iterable[str], quote: Optional[str] = None) -> str:
     return ", ".join(
         map(lambda d: f"""{quote or "'"}{d}{quote or "'"}""", data)
     )
+
+
+def is_coroutine_function(function: Any) -> bool:
+    """
+    Returns `True` if `function` (or its `__call__`-method) is a
+    coroutine function (see `inspect.iscoroutinefunction`).
+    """
+    if function is None:
+        return False
+    # imported on demand (keeps import of `befehl` fast)
+    # pylint: disable=import-outside-toplevel
+    from inspect import iscoroutinefunction
+
+    return iscoroutinefunction(function) or (
+        not isinstance(
+            function,
+            (FunctionType, MethodType, BuiltinFunctionType, partial),
+        )
+        and iscoroutinefunction(getattr(function, "__call__", None))
+    )
+
+
+def map_threaded(
+    function: Callable[[Any], Any], values: Sequence[Any], workers: int
+) -> list[Any]:
+    """
+    Returns `function` applied to `values` (in order) using a pool of
+    `workers` threads. If `function` raises for any value, the exception
+    for the first of those values (in order) is raised.
+    """
+    if workers < 2 or len(values) < 2:
+        return list(map(function, values))
+    # imported on demand (keeps import of `befehl` fast)
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(values))) as pool:
+        futures = [pool.submit(function, value) for value in values]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+class ParsingMixin:
+    """
+    Parsing of values for `Option` and `Argument` (see their keyword
+    arguments `parser` and `workers`).
+
+    Keyword arguments:
+    parser -- parser-function for individual values
+    workers -- size of thread pool for parsing many values
+    """
+
+    __slots__ = ("__parser", "__async", "__workers")
+
+    # name of keyword identifying the target in trace-events
+    _TRACE_KEY = "target"
+
+    def __init__(
+        self,
+        parser: Optional[
+            Callable[[str], tuple[bool, Optional[str], Optional[Any]]]
+        ],
+        workers: Optional[int],
+    ) -> None:
+        self.__parser = parser
+        self.__async = is_coroutine_function(parser)
+        self.__workers = workers
+
+    @property
+    def parser(
+        self,
+    ) -> Optional[Callable[[str], tuple[bool, Optional[str], Optional[Any]]]]:
+        """Returns parser-function."""
+        return self.__parser
+
+    @property
+    def is_async(self) -> bool:
+        """Returns `True` if the parser is a coroutine function."""
+        return self.__async
+
+    @property
+    def is_array(self) -> bool:
+        """
+        Returns `True` if the parser converts many values into an array
+        (see `Parser.parse_as_array`).
+        """
+        return hasattr(self.__parser, "array")
+
+    @property
+    def workers(self) -> Optional[int]:
+        """Returns number of workers."""
+        return self.__workers
+
+    @property
+    def values(self) -> Optional[tuple[str, ...]]:
+        """
+        Returns allowed values of the parser if available (see
+        `Parser.parse_with_values`).
+        """
+        return getattr(self.__parser, "values", None)
+
+    def __details(self, index: Optional[int]) -> dict[str, Any]:
+        """Returns details of trace-events for a parser-call."""
+        if index is None:
+            return {self._TRACE_KEY: str(self)}
+        return {self._TRACE_KEY: str(self), "index": index}
+
+    def __respond(
+        self, data: Any, index: Optional[int] = None
+    ) -> tuple[bool, Optional[str], Any]:
+        """
+        Returns response of the parser for `data` (the value at `index`).
+        """
+        if trace.HOOKS:
+            return trace.call(
+                "parser", self.__parser, data, **self.__details(index)
+            )
+        return self.__parser(data)
+
+    def __respond_bulk(
+        self, data: Sequence[Any], index: int = 0
+    ) -> list[tuple]:
+        """
+        Returns responses of the parser's bulk-version for `data` (the
+        values starting at `index`).
+        """
+        if trace.HOOKS:
+            return trace.call(
+                "parser", self.__parser.bulk, data, **self.__details(index)
+            )
+        return self.__parser.bulk(data)
+
+    def parse(self, data: Any, index: Optional[int] = None) -> Any:
+        """
+        Returns response of the parser if available. Raises `ParseError`
+        if the parser rejects `data`.
+
+        Keyword arguments:
+        data -- value
+        index -- position of `data` among the values of the target (only
+                 used for trace-events)
+                 (default None)
+        """
+        if self.__parser:
+            ok, msg, parsed = self.__respond(data, index)
+            if not ok:
+                raise ParseError(msg, target=self, value=data)
+            return parsed
+        return data
+
+    def __check(
+        self, data: Sequence[Any], responses: Iterable[tuple]
+    ) -> list[Any]:
+        """
+        Returns parsed values from parser-`responses` for `data`. Raises
+        `ParseError` (with `index`) for the first rejected value.
+        """
+        result = []
+        for index, (value, (ok, msg, parsed)) in enumerate(
+            zip(data, responses)
+        ):
+            if not ok:
+                raise ParseError(msg, target=self, value=value, index=index)
+            result.append(parsed)
+        return result
+
+    def parse_many(self, data: Sequence[Any]) -> list[Any]:
+        """
+        Returns responses of the parser for all values in `data`. Uses
+        the parser's array-version (attribute `array`; returns an array
+        instead of a list) or bulk-version (attribute `bulk`) if
+        available and a thread pool if `workers` is set (then, the
+        bulk-version is called once per worker with a contiguous chunk
+        of `data`). Every value is parsed at most once; a `ParseError`
+        refers to the first rejected value and carries its position in
+        `data` as `index`.
+        """
+        if self.__parser is None:
+            return list(data)
+        to_array = getattr(self.__parser, "array", None)
+        if to_array is not None:
+            try:
+                return trace.call(
+                    "parser", to_array, data, **self.__details(0)
+                )
+            except (ValueError, OverflowError):
+                # find first rejected value
+                self.__check(
+                    data, map(self.__respond, data, range(len(data)))
+                )
+                raise
+        if hasattr(self.__parser, "bulk") and len(data) > 1:
+            if self.__workers is None:
+                responses = self.__respond_bulk(data)
+            else:
+                # contiguous chunks (keeps, e.g., paths of a directory
+                # together), one per worker
+                size = -(-len(data) // self.__workers)
+                responses = chain.from_iterable(
+                    map_threaded(
+                        lambda i: self.__respond_bulk(data[i : i + size], i),
+                        range(0, len(data), size),
+                        self.__workers,
+                    )
+                )
+        elif self.__workers is None:
+            responses = map(self.__respond, data, range(len(data)))
+        else:
+            responses = map_threaded(
+                lambda i: self.__respond(data[i], i),
+                range(len(data)),
+                self.__workers,
+            )
+        return self.__check(data, responses)
+
+    async def parse_async(self, data: Any, index: Optional[int] = None) -> Any:
+        """
+        Coroutine-version of `parse` that supports coroutine-parsers.
+        """
+        if self.__parser:
+            ok, msg, parsed = await trace.acall(
+                "parser", self.__parser, data, **self.__details(index)
+            )
+            if not ok:
+                raise ParseError(msg, target=self, value=data)
+            return parsed
+        return data
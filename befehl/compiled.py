@@ -0,0 +1,1142 @@
+"""Definitions for class `CompiledCommand`."""
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Optional,
+    Iterable,
+    Sequence,
+    TextIO,
+    Any,
+)
+from itertools import chain, zip_longest
+import os
+import re
+import sys
+import threading
+
+from .common import quote_list, is_coroutine_function
+from .option import Option
+from .argument import Argument
+from .errors import CliExit, ParseError, ValidationError
+from .response_file import expand
+from .prefix_trie import PrefixTrie
+from . import trace
+from . import cache as build_cache
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from .batch import BatchResult
+    from .command import Command
+
+
+_COMPLETION_WORD = re.compile(r"[\w.,:+=@%/-]+")
+
+
+def get_help_width() -> int:
+    """Returns line width for help based on terminal size."""
+    try:
+        w, _ = os.get_terminal_size()
+    except OSError:
+        w = 100
+    return max(w, 41) - 3
+
+
+def wrap_text(
+    text: Optional[str], indent: int, relative_indent: int, width: int
+) -> list[str]:
+    """
+    Returns `text` broken down into lines shorter than `width` (in a
+    single pass over its words). The first line is indented by `indent`
+    and all following lines by `indent + relative_indent`. Words that
+    do not fit into a line by themselves are split.
+    """
+    if text is None:
+        return []
+    result = []
+    prefix = " " * indent
+    line: list[str] = []
+    length = 0  # length of current line without prefix
+    for word in text.split():
+        while True:
+            if line:
+                if len(prefix) + length + len(word) + 1 <= width:
+                    line.append(word)
+                    length += len(word) + 1
+                    break
+                # continue in next line
+                result.append(prefix + " ".join(line))
+            elif len(prefix) + len(word) + 1 <= width:
+                line.append(word)
+                length = len(word)
+                break
+            else:
+                # split word
+                split = max(width - 1 - len(prefix), 1)
+                result.append(prefix + word[:split])
+                word = word[split:]
+            prefix = " " * (indent + relative_indent)
+            line = []
+            length = 0
+            if not word:
+                break
+    if line:
+        result.append(prefix + " ".join(line))
+    return result
+
+
+def format_completion_words(words: Iterable[str]) -> str:
+    """
+    Returns `words` formatted as word list for bash's `compgen -W`.
+    Words that would require quoting in bash are omitted.
+    """
+    return " ".join(filter(_COMPLETION_WORD.fullmatch, words))
+
+
+def compile_dispatch(
+    options: dict[str, Option]
+) -> tuple[
+    dict[str, tuple[Option, int]], dict[str, Optional[tuple[Option, int]]]
+]:
+    """
+    Returns dispatch tables for map of option names `options` (see
+    `tokenize`):
+    * exact tokens to option and arity (negative for unlimited) and
+    * characters of short options for grouped syntax (`None` if option
+      cannot be grouped).
+    """
+    dispatch: dict[str, tuple[Option, int]] = {}
+    groups: dict[str, Optional[tuple[Option, int]]] = {}
+    for name, option in options.items():
+        entry = (option, -1 if option.nargs < 0 else option.nargs)
+        dispatch[name] = entry
+        if len(name) == 2:
+            groups[name[1]] = (
+                None if option.nargs > 0 and option.strict else entry
+            )
+    return dispatch, groups
+
+
+def _resolve_prefix(
+    prefixes: PrefixTrie[tuple[Option, int]], token: str
+) -> Optional[tuple[Option, int]]:
+    """
+    Returns dispatch-entry for the abbreviated long option in `token`
+    (`None` if there is no match). Raises `ParseError` if the
+    abbreviation is ambiguous.
+    """
+    name = token.partition("=")[0]
+    if len(name) < 3:
+        return None
+    entry = prefixes.get(name)
+    if entry is None:
+        candidates = prefixes.candidates(name)
+        if candidates:
+            raise ParseError(
+                f"Ambiguous option '{name}' (could be "
+                + f"{quote_list(candidates)})",
+                value=token,
+            )
+    return entry
+
+
+def tokenize(
+    raw: Iterable[str],
+    dispatch: dict[str, tuple[Option, int]],
+    groups: dict[str, Optional[tuple[Option, int]]],
+    prefixes: Optional[PrefixTrie[tuple[Option, int]]] = None,
+) -> tuple[
+    dict[Option, list[Any]],
+    list[tuple[Option, str]],
+    list[str],
+    Optional[Option],
+    dict[Option, int],
+]:
+    """
+    Resolves raw input in a single pass over the dispatch tables (see
+    `CompiledCommand`): `dispatch` maps exact tokens to option and arity
+    (negative for unlimited), `groups` maps characters of short options
+    to the same (`None` if option cannot be grouped), and `prefixes`
+    resolves abbreviated long options.
+
+    Returns a tuple of
+    * map of `Option`s (in order of first occurrence) to an (empty)
+      list of values,
+    * pairs of `Option` and raw value (in input order),
+    * positional values (in input order),
+    * last `Option` that was given in the argument-section, and
+    * map of all `Option`s that were given to their number of
+      occurrences.
+
+    Errors regarding the syntax of options (unknown options, bad
+    option groups) are raised immediately.
+    """
+    result: dict[Option, list[Any]] = {}
+    values: list[tuple[Option, str]] = []
+    positional: list[str] = []
+    bad_order: Optional[Option] = None
+    given: dict[Option, int] = {}
+
+    taken: dict[Option, int] = {}
+    current: Optional[Option] = None
+    remaining = 0
+    in_options = True
+    post_separator = False
+
+    for token in raw:
+        if post_separator:
+            positional.append(token)
+            continue
+
+        if token == "--":
+            post_separator = True
+            if in_options:
+                in_options = False
+            else:
+                positional.append(token)
+            continue
+
+        # resolve token into options (+ value for '='-syntax)
+        entry = dispatch.get(token)
+        value = None
+        if entry is None and "=" in token:
+            name, _, value = token.partition("=")
+            entry = dispatch.get(name)
+            if entry is None:
+                value = None
+        if entry is None and prefixes is not None and token[:2] == "--":
+            entry = _resolve_prefix(prefixes, token)
+            if entry is not None and "=" in token:
+                value = token.partition("=")[2]
+        if entry is not None:
+            entries = (entry,)
+        elif len(token) > 2 and token[0] == "-" and token[1] != "-":
+            if "=" in token:
+                raise ParseError(
+                    "Syntax '<option-group>=<value>' not allowed",
+                    value=token,
+                )
+            entries = []
+            for char in token[1:]:
+                if char not in groups:
+                    raise ParseError(
+                        f"Unknown option '-{char}'", value=token
+                    )
+                if groups[char] is None:
+                    raise ParseError(
+                        f"Missing arguments for option '-{char}'",
+                        target=dispatch[f"-{char}"][0],
+                        value=token,
+                    )
+                entries.append(groups[char])
+        elif token.startswith("-") and token != "-":
+            # a lone '-' is a value (e.g., for stdin)
+            raise ParseError(f"Unknown option '{token}'", value=token)
+        else:
+            entries = ()
+            value = token
+
+        for option, nargs in entries:
+            given[option] = given.get(option, 0) + 1
+            if not in_options:
+                bad_order = option
+                continue
+            if option not in result:
+                result[option] = []
+                taken[option] = 0
+            current = option
+            remaining = -1 if nargs < 0 else nargs - taken[option]
+
+        if value is None:
+            continue
+
+        # assign value to current option or start argument-section
+        if in_options and current is not None and remaining != 0:
+            values.append((current, value))
+            taken[current] += 1
+            if remaining > 0:
+                remaining -= 1
+        else:
+            in_options = False
+            positional.append(value)
+
+    return result, values, positional, bad_order, given
+
+
+def run_coroutine(
+    coroutine: Any,
+    loop_factory: Optional[Callable[[], "asyncio.AbstractEventLoop"]] = None,
+) -> Any:
+    """
+    Returns result of `coroutine` after running it in a new event loop
+    (created by `loop_factory` or `asyncio.new_event_loop`).
+    """
+    # imported on demand (only required by asynchronous commands)
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    loop = (loop_factory or asyncio.new_event_loop)()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        try:
+            # cancel remaining tasks (like `asyncio.run`)
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True)
+                )
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+class CompiledCommand:
+    """
+    Validated and compiled command-tree as returned by `Command.build`.
+
+    A `CompiledCommand` does not change after construction (except for
+    subcommands being compiled on first use, which is synchronized) and
+    can, therefore, be used by multiple threads at once. Calling it
+    serves as entry-point: errors are printed and the process exits. For
+    embedding a cli into another application, `invoke` and `parse`
+    raise `CliExit`-exceptions (see `befehl.errors`) instead.
+        ```
+        cli = MyCli("my-cli").build()
+        try:
+            cli.invoke(["--option", "value"])
+        except ParseError as exc_info:
+            # handle bad input
+            # ...
+        ```
+
+    Keyword arguments:
+    command -- `Command` that defines business logic and validation
+    location -- location of `command` in the command-tree
+    options -- map of option names to validated `Option`s
+    arguments -- validated `Argument`s (in positional order)
+    subcommands -- map of names to validated subcommands
+    help_option -- `Option` that triggers the help
+                   (default None)
+    autocomplete_option -- `Option` that triggers the autocomplete
+                           (default None)
+    stream_options -- `Option`s for the file-source and NUL-delimiting
+                      of a streaming `Argument`
+                      (default None)
+    build_kwargs -- keyword arguments for building subcommands
+                    (default None)
+    loop_factory -- callable that returns a new event loop (used for
+                    invocations that involve coroutines)
+                    (default None; uses `asyncio.new_event_loop`)
+    response_files -- mode for expanding response-files (see
+                      `befehl.response_file.READERS`)
+                      (default None; disabled)
+    abbreviations -- whether long options can be abbreviated by a
+                     unique prefix
+                     (default False)
+    help_cache -- build-cache for rendered help (see
+                  `befehl.cache.HelpCache`)
+                  (default None)
+    """
+
+    __slots__ = (
+        "__command",
+        "__location",
+        "__options",
+        "__dispatch",
+        "__groups",
+        "__prefixes",
+        "__arguments",
+        "__subcommands",
+        "__compiled",
+        "__build_kwargs",
+        "__loop_factory",
+        "__async",
+        "__response_files",
+        "__help_cache",
+        "__lock",
+        "__help_option",
+        "__autocomplete_option",
+        "__stream_options",
+        "__help",
+        "__help_records",
+        "__help_signature",
+    )
+
+    _BASH_COMPLETION_TEMPLATE = """declare -gA {table}_WORDS=(
+{words}
+)
+declare -gA {table}_VALUES=(
+{values}
+)
+
+{function_name}-completion()
+{{
+    local cur prev path next i
+
+    cur=${{COMP_WORDS[COMP_CWORD]}}
+    prev=${{COMP_WORDS[COMP_CWORD-1]}}
+
+    # resolve (sub-)command from leading words
+    path={cli}
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        next="$path ${{COMP_WORDS[i]}}"
+        [[ -n ${{{table}_WORDS[$next]+x}} ]] || break
+        path=$next
+    done
+
+    # values of previous option
+    if [[ -n ${{{table}_VALUES[$path $prev]+x}} ]]; then
+        COMPREPLY=($(compgen -W "${{{table}_VALUES[$path $prev]}}" -- "$cur"))
+        return
+    fi
+
+    COMPREPLY=(
+        $(compgen -W "${{{table}_WORDS[$path]}}" -- "$cur")
+        $(compgen -f -- "$cur")
+    )
+}}
+
+complete -o nosort -F {function_name}-completion {cli}
+"""
+    _BASH_COMPLETION_ENTRY_TEMPLATE = "    [{key}]={words}"
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        command: "Command",
+        location: str,
+        options: dict[str, Option],
+        arguments: Iterable[Argument],
+        subcommands: dict[str, "Command"],
+        *,
+        help_option: Optional[Option] = None,
+        autocomplete_option: Optional[Option] = None,
+        stream_options: Optional[tuple[Option, Option]] = None,
+        build_kwargs: Optional[dict[str, Any]] = None,
+        loop_factory: Optional[
+            Callable[[], "asyncio.AbstractEventLoop"]
+        ] = None,
+        response_files: Optional[str] = None,
+        abbreviations: bool = False,
+        help_cache: Optional[build_cache.HelpCache] = None,
+    ) -> None:
+        self.__command = command
+        self.__location = location
+        self.__options = dict(options)
+        self.__arguments = tuple(arguments)
+        self.__subcommands = dict(subcommands)
+        self.__compiled: dict[str, Any] = {}
+        self.__build_kwargs = build_kwargs or {}
+        self.__loop_factory = loop_factory
+        self.__async = any(
+            map(is_coroutine_function, (command.validate, command.run))
+        )
+        self.__response_files = response_files
+        self.__help_cache = help_cache
+        self.__lock = threading.Lock()
+        self.__help_option = help_option
+        self.__autocomplete_option = autocomplete_option
+        self.__stream_options = stream_options
+        self.__help: dict[int, str] = {}
+        self.__help_records: Optional[list] = None
+        self.__help_signature: Optional[list] = None
+
+        # compile dispatch tables
+        self.__dispatch, self.__groups = compile_dispatch(self.__options)
+        # * prefix-tree of long options for abbreviations
+        self.__prefixes: Optional[PrefixTrie[tuple[Option, int]]] = None
+        if abbreviations:
+            self.__prefixes = PrefixTrie(
+                (name, entry)
+                for name, entry in self.__dispatch.items()
+                if name.startswith("--")
+            )
+
+    @property
+    def command(self) -> "Command":
+        """Returns the compiled `Command`."""
+        return self.__command
+
+    @property
+    def location(self) -> str:
+        """Returns location of the `Command` in the command-tree."""
+        return self.__location
+
+    def __repr__(self):
+        return (
+            f"CompiledCommand(command={self.__command!r}, "
+            + f"location={self.__location})"
+        )
+
+    def _get_subcommand(self, name: str) -> Any:
+        """Returns compiled subcommand `name` (built on first use)."""
+        compiled = self.__compiled.get(name)
+        if compiled is None:
+            with self.__lock:
+                compiled = self.__compiled.get(name)
+                if compiled is None:
+                    compiled = self.__subcommands[name].build(
+                        **self.__build_kwargs
+                    )
+                    self.__compiled[name] = compiled
+        return compiled
+
+    def _compile_subcommands(self) -> None:
+        """Builds all subcommands."""
+        for name in self.__subcommands:
+            self._get_subcommand(name)
+
+    def resolve(
+        self, raw: Sequence[str], index: int = 0
+    ) -> tuple["CompiledCommand", int]:
+        """
+        Returns the compiled (sub-)command that is selected by `raw`
+        (starting at `index`) and the index of its first input token.
+        """
+        if index < len(raw) and raw[index] in self.__subcommands:
+            return self._get_subcommand(raw[index]).resolve(raw, index + 1)
+        return self, index
+
+    def _parse_tokens(
+        self, raw: Iterable[str]
+    ) -> tuple[
+        dict[Option, list[Any]],
+        list[tuple[Option, str]],
+        list[str],
+        Optional[Option],
+        dict[Option, int],
+    ]:
+        """Resolves raw input (see `tokenize`)."""
+        return tokenize(raw, self.__dispatch, self.__groups, self.__prefixes)
+
+    def _parse_postprocess_options(
+        self, result: dict[Option | Argument, list[Any]]
+    ) -> None:
+        """
+        Post-processing options consists of
+        * validating violation of strict-options
+        """
+
+        # handle bad number of args for options
+        for option, values in result.items():
+            # validate strict options
+            if (
+                option.nargs >= 0
+                and option.strict
+                and len(values) != option.nargs
+            ):
+                raise ParseError(
+                    f"Option {quote_list(option.names)} got an unexpected "
+                    + f"number of arguments (expected {option.nargs} but "
+                    + f"got {len(values)})",
+                    target=option,
+                )
+
+    def parse(self, raw: Iterable[str]) -> dict[Option | Argument, list[Any]]:
+        """
+        Returns parsed input `raw` for this command (subcommands are not
+        resolved, see `resolve`). Raises `CliExit` if the help or
+        autocomplete is requested and `ParseError` for bad input.
+        """
+        pending = []
+        result = self._parse_deferred(raw, pending)
+        if pending:
+            self._run_async(self._parse_pending(pending))
+        return result
+
+    def _parse_deferred(
+        self,
+        raw: Iterable[str],
+        pending: list[tuple[list[Any], int, Option | Argument, str]],
+    ) -> dict[Option | Argument, list[Any]]:
+        """
+        Returns parsed input `raw`. Values for coroutine-parsers are
+        left as placeholders and added to `pending` (see
+        `_parse_pending`).
+        """
+        try:
+            return trace.call(
+                "parse", self._parse, raw, pending, command=self.__location
+            )
+        except CliExit as exc_info:
+            if exc_info.command is None:
+                exc_info.command = self.__location
+            raise
+
+    async def _parse_pending(
+        self, pending: list[tuple[list[Any], int, Option | Argument, str]]
+    ) -> None:
+        """
+        Runs coroutine-parsers for `pending` values concurrently and
+        replaces placeholders. The first error (in input order) is
+        raised.
+        """
+        # pylint: disable=import-outside-toplevel
+        import asyncio
+
+        results = await asyncio.gather(
+            *(
+                target.parse_async(value, index)
+                for _, index, target, value in pending
+            ),
+            return_exceptions=True,
+        )
+        for (values, index, _, _), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, CliExit) and result.command is None:
+                    result.command = self.__location
+                raise result
+            values[index] = result
+
+    def _parse(
+        self,
+        raw: Iterable[str],
+        pending: list[tuple[list[Any], int, Option | Argument, str]],
+    ) -> dict[Option | Argument, list[Any]]:
+        """Parse given raw input."""
+
+        result, values, positional, bad_order, given = trace.call(
+            "parse-tokens", self._parse_tokens, raw, command=self.__location
+        )
+
+        if self.__help_option in given:
+            raise CliExit(self.get_help())
+
+        if self.__autocomplete_option in given:
+            raise CliExit(self._render_autocomplete())
+
+        if (
+            self.__stream_options is not None
+            and given.get(self.__stream_options[0], 0) > 1
+        ):
+            raise ParseError(
+                f"Option {quote_list(self.__stream_options[0].names)} can "
+                + "only be given once",
+                target=self.__stream_options[0],
+            )
+
+        trace.call(
+            "parse-options",
+            self._parse_options,
+            result,
+            values,
+            pending,
+            command=self.__location,
+        )
+        trace.call(
+            "parse-arguments",
+            self._parse_arguments,
+            result,
+            positional,
+            bad_order,
+            pending,
+            command=self.__location,
+        )
+
+        return result
+
+    def _parse_options(
+        self,
+        result: dict[Option | Argument, list[Any]],
+        values: Iterable[tuple[Option, str]],
+        pending: list[tuple[list[Any], int, Option | Argument, str]],
+    ) -> None:
+        """
+        Parses option `values` into `result` and validates number of
+        values. The first rejected value (in input order) is raised;
+        values for coroutine-parsers are added to `pending`.
+        """
+        collected: dict[Option, list[str]] = {}
+        positions: dict[Option, list[int]] = {}
+        error: Optional[tuple[int, ParseError]] = None
+        for position, (option, value) in enumerate(values):
+            if option.is_async:
+                pending.append(
+                    (result[option], len(result[option]), option, value)
+                )
+                result[option].append(None)
+            elif option.workers is not None or option.is_array:
+                collected.setdefault(option, []).append(value)
+                positions.setdefault(option, []).append(position)
+            else:
+                try:
+                    result[option].append(
+                        option.parse(value, len(result[option]))
+                    )
+                except ParseError as exc_info:
+                    error = (position, exc_info)
+                    break
+        # pooled values are parsed last (only those preceding a rejected
+        # value); keep the error for the first rejected value
+        for option, option_values in collected.items():
+            try:
+                result[option] = option.parse_many(option_values)
+            except ParseError as exc_info:
+                position = positions[option][exc_info.index]
+                if error is None or position < error[0]:
+                    error = (position, exc_info)
+        if error is not None:
+            raise error[1]
+
+        self._parse_postprocess_options(result)
+
+    def _parse_arguments(
+        self,
+        result: dict[Option | Argument, list[Any]],
+        positional: list[str],
+        bad_order: Optional[Option],
+        pending: list[tuple[list[Any], int, Option | Argument, str]],
+    ) -> None:
+        """
+        Parses `positional` values into `result` (after validating that
+        there is no `bad_order`-`Option` in the argument-section).
+        """
+        # handle bad order of options
+        if bad_order is not None:
+            raise ParseError(
+                f"Bad order, got option {quote_list(bad_order.names)} in "
+                + "argument-section (use -- separator)",
+                target=bad_order,
+            )
+
+        # process arguments
+        index = 0
+        for argument in self.__arguments:
+            if argument.nargs < 0:
+                if argument.stream:
+                    files_from, null = self.__stream_options
+                    result[argument] = argument.parse_stream(
+                        positional[index:],
+                        result.get(files_from, ()),
+                        null in result,
+                    )
+                elif argument.is_async:
+                    result[argument] = [None] * (len(positional) - index)
+                    pending.extend(
+                        (result[argument], i, argument, value)
+                        for i, value in enumerate(positional[index:])
+                    )
+                else:
+                    result[argument] = argument.parse_many(positional[index:])
+                index = len(positional)
+                continue
+            result[argument] = []
+            for _ in range(argument.nargs):
+                if index >= len(positional):
+                    raise ParseError(
+                        f"Argument '{argument.name}' got too few values "
+                        + f"(expected {argument.nargs} but got "
+                        + f"{len(result[argument])})",
+                        target=argument,
+                    )
+                if argument.is_async:
+                    pending.append(
+                        (
+                            result[argument],
+                            len(result[argument]),
+                            argument,
+                            positional[index],
+                        )
+                    )
+                    result[argument].append(None)
+                else:
+                    result[argument].append(
+                        argument.parse(
+                            positional[index], len(result[argument])
+                        )
+                    )
+                index += 1
+
+        # handle extra arguments
+        if index < len(positional):
+            raise ParseError(
+                f"Command '{self.__command.name}' got "
+                + f"{len(positional) - index} extra argument(s)",
+                value=positional[index],
+            )
+
+    def invoke(self, raw: Optional[Iterable[str]] = None) -> Any:
+        """
+        Runs the command-tree for input `raw` and returns the result of
+        the selected `Command`'s `run`. Raises `CliExit` instead of
+        exiting (see `befehl.errors`).
+
+        Keyword arguments:
+        raw -- input arguments
+               (default None; uses `sys.argv[1:]`)
+        """
+        compiled, raw = self._resolve_input(raw)
+        # pylint: disable=protected-access
+        return compiled._execute(raw)
+
+    async def ainvoke(self, raw: Optional[Iterable[str]] = None) -> Any:
+        """
+        Coroutine-version of `invoke` that uses the running event loop
+        (e.g., when embedding a cli into an asynchronous application).
+        """
+        compiled, raw = self._resolve_input(raw)
+        # pylint: disable=protected-access
+        pending = []
+        args = compiled._parse_deferred(raw, pending)
+        return await compiled._execute_async(args, pending)
+
+    def _resolve_input(
+        self, raw: Optional[Iterable[str]]
+    ) -> tuple["CompiledCommand", Iterable[str]]:
+        """
+        Returns the (sub-)command selected by input `raw` (default
+        `sys.argv[1:]`) and its remaining input. If enabled, response-
+        files are expanded while the input is consumed.
+        """
+        if raw is None:
+            raw = sys.argv[1:]
+
+        if self.__response_files is not None:
+            # select subcommand token by token
+            tokens = expand(raw, self.__response_files)
+            compiled = self
+            for token in tokens:
+                subcommand, index = compiled.resolve((token,))
+                if index == 0:
+                    return compiled, chain((token,), tokens)
+                compiled = subcommand
+            return compiled, ()
+
+        if not isinstance(raw, (list, tuple)):
+            raw = list(raw)
+        compiled, index = self.resolve(raw)
+        return compiled, raw[index:] if index > 0 else raw
+
+    def _run_async(self, coroutine: Any) -> Any:
+        """
+        Returns result of `coroutine` after running it in a new event
+        loop.
+        """
+        return run_coroutine(coroutine, self.__loop_factory)
+
+    def _execute(self, raw: Iterable[str]) -> Any:
+        """Parses, validates, and runs for input `raw`."""
+        pending = []
+        args = self._parse_deferred(raw, pending)
+
+        # use a single event loop for all coroutines of an invocation
+        if pending or self.__async:
+            return self._run_async(self._execute_async(args, pending))
+
+        ok, msg = trace.call(
+            "validate", self.__command.validate, args, command=self.__location
+        )
+        if not ok:
+            raise ValidationError(msg, command=self.__location)
+
+        return trace.call(
+            "run", self.__command.run, args, command=self.__location
+        )
+
+    async def _execute_async(
+        self,
+        args: dict[Option | Argument, list[Any]],
+        pending: list[tuple[list[Any], int, Option | Argument, str]],
+    ) -> Any:
+        """Completes parsing, validates, and runs asynchronously."""
+        if pending:
+            await self._parse_pending(pending)
+
+        ok, msg = await trace.acall(
+            "validate", self.__command.validate, args, command=self.__location
+        )
+        if not ok:
+            raise ValidationError(msg, command=self.__location)
+
+        return await trace.acall(
+            "run", self.__command.run, args, command=self.__location
+        )
+
+    def __call__(self, raw: Optional[Iterable[str]] = None) -> None:
+        """
+        Entry-point: runs the command-tree for input `raw` (default
+        `sys.argv[1:]`). Messages of `CliExit`-exceptions are printed
+        before exiting with their exit code.
+        """
+        try:
+            self.invoke(raw)
+        except CliExit as exc_info:
+            if exc_info.message is not None:
+                print(
+                    exc_info.message,
+                    file=sys.stdout if exc_info.exit_code == 0 else sys.stderr,
+                )
+            sys.exit(exc_info.exit_code)
+
+    def batch(
+        self,
+        source: Optional[str | TextIO | Iterable[list[str]]] = None,
+        *,
+        format_: str = "shell",
+        workers: int = 1,
+        report: Optional[TextIO] = None,
+    ) -> list["BatchResult"]:
+        """
+        Returns results of running the invocations from `source` (see
+        `befehl.batch.run_batch`).
+        """
+        # pylint: disable=import-outside-toplevel
+        from .batch import run_batch
+
+        return run_batch(
+            self, source, format_=format_, workers=workers, report=report
+        )
+
+    def get_help(self, width: Optional[int] = None) -> str:
+        """
+        Returns help for line `width` (default based on terminal size).
+        Help is rendered once per width (or read from the build-cache).
+        """
+        if width is None:
+            width = get_help_width()
+        text = self.__help.get(width)
+        if text is not None:
+            return text
+        if self.__help_cache is None:
+            text = self.__help[width] = self._render_help(width)
+            return text
+        signature = self._get_help_signature()
+        text = self.__help_cache.load(self.__location, width, signature)
+        if text is None:
+            text = self._render_help(width)
+            self.__help_cache.store(
+                self.__location,
+                width,
+                signature,
+                chain(
+                    type(self.__command).__mro__,
+                    *(
+                        type(declaration).__mro__
+                        for declaration in chain(
+                            self.__options.values(), self.__arguments
+                        )
+                    ),
+                ),
+                text,
+            )
+        self.__help[width] = text
+        return text
+
+    def prerender_help(self, widths: Iterable[int]) -> int:
+        """
+        Renders help of this and all subcommands for all line `widths`
+        (see `get_help`) and returns the number of newly rendered texts.
+        All subcommands are built in the process.
+        """
+        widths = tuple(widths)
+        count = 0
+        for width in widths:
+            if width not in self.__help:
+                self.get_help(width)
+                count += 1
+        for name in self.__subcommands:
+            subcommand = self._get_subcommand(name)
+            if isinstance(subcommand, CompiledCommand):
+                count += subcommand.prerender_help(widths)
+        return count
+
+    def _get_help_signature(self) -> list[Any]:
+        """
+        Returns signature of the declarations that make up the help
+        (see `befehl.cache.get_signature`; computed once).
+        """
+        if self.__help_signature is None:
+            self.__help_signature = [
+                build_cache.get_signature(declaration)
+                for declaration in chain(
+                    (self.__command,),
+                    dict.fromkeys(self.__options.values()),
+                    self.__arguments,
+                    self.__subcommands.values(),
+                )
+            ]
+        return self.__help_signature
+
+    def _get_help_records(
+        self,
+    ) -> list[tuple[str, list[tuple[str, Optional[str]]]]]:
+        """
+        Returns categories of records for the help (sorted pairs of
+        name and helptext; computed once).
+        """
+        if self.__help_records is not None:
+            return self.__help_records
+        records = []
+        for category, items in [
+            (
+                "Subcommands:",
+                [
+                    (command.name, command.helptext)
+                    for command in self.__subcommands.values()
+                ],
+            ),
+            (
+                "Options:",
+                [
+                    (", ".join(sorted(option.names, key=len)), option.helptext)
+                    for option in dict.fromkeys(self.__options.values())
+                ],
+            ),
+            (
+                "Arguments:",
+                [
+                    (
+                        argument.name
+                        + (
+                            ""
+                            if argument.nargs == 1
+                            else " [1.."
+                            + (
+                                "n"
+                                if argument.nargs < 0
+                                else str(argument.nargs)
+                            )
+                            + "]"
+                        ),
+                        argument.helptext,
+                    )
+                    for argument in self.__arguments
+                ],
+            ),
+        ]:
+            if len(items) > 0:
+                records.append(
+                    (category, sorted(items, key=lambda o: o[0]))
+                )
+        self.__help_records = records
+        return records
+
+    def _render_help(self, w: int) -> str:
+        """Returns help for line width `w`."""
+        lines = wrap_text(self.__command.helptext, 0, 0, w)
+        indent = 2
+        space = 1
+
+        if len(lines) > 0:
+            lines += [""]
+
+        lines += wrap_text(
+            "Usage: [command] [subcommand] [options] [--] [args]", 0, indent, w
+        )
+
+        w_left = min(round(w / 2), 35) - indent
+        w_right = w - min(round(w / 2), 35) - space
+        for category, records in self._get_help_records():
+            lines += ["", category]
+            for record_name, helptext in records:
+                for left, right in zip_longest(
+                    wrap_text(record_name, indent, indent, w_left),
+                    wrap_text(
+                        helptext or "- no description provided -",
+                        indent,
+                        indent,
+                        w_right,
+                    ),
+                    fillvalue="",
+                ):
+                    lines.append(
+                        left + " " * (space + w_left - len(left)) + right
+                    )
+
+        return "\n".join(lines)
+
+    def _get_completion_words(self) -> str:
+        """
+        Returns a list of strings to be used as completion-words for
+        self.
+        """
+        return " ".join(
+            list(self.__subcommands.keys())
+            + [
+                " ".join(option.names)
+                for option in set(self.__options.values())
+                if option != self.__autocomplete_option
+            ]
+            + [
+                format_completion_words(argument.values)
+                for argument in self.__arguments
+                if argument.values
+            ]
+        )
+
+    def _get_completion_values(self) -> dict[str, str]:
+        """
+        Returns map of option names to completion-words for values of
+        `Option`s with known values (see `Option.values`).
+        """
+        return {
+            name: format_completion_words(option.values)
+            for option in dict.fromkeys(self.__options.values())
+            if option.nargs != 0 and option.values
+            for name in option.names
+        }
+
+    def get_completion_table(
+        self,
+        path: str,
+        words: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, str]] = None,
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        Returns tables for bash-autocomplete of this and all subcommands
+        (`path` is the location in the command-tree):
+        * map of command paths to completion-words and
+        * map of command paths and option names (separated by a space)
+          to completion-words for values of that option.
+
+        Entries are added to `words` and `values` if given.
+        """
+        if words is None:
+            words = {}
+        if values is None:
+            values = {}
+        words[path] = self._get_completion_words()
+        for name, value_words in self._get_completion_values().items():
+            values[f"{path} {name}"] = value_words
+        for name, command in self.__subcommands.items():
+            self._get_subcommand(name).get_completion_table(
+                path + " " + command.name.strip(), words, values
+            )
+        return words, values
+
+    def _render_autocomplete(self) -> str:
+        """
+        Returns bash-autocomplete source-file.
+
+        The command-tree is stored in associative arrays (requires bash
+        4.2 or later) that are indexed by command path. Hence, a single
+        completion request takes a number of lookups proportional to
+        the depth of the (sub-)command rather than the size of the
+        command-tree.
+        """
+        # pylint: disable=import-outside-toplevel
+        import shlex
+
+        name = self.__command.name.strip()
+        words, values = self.get_completion_table(name)
+        return self._BASH_COMPLETION_TEMPLATE.format(
+            function_name="_" + name.upper(),
+            table="_" + re.sub(r"\W", "_", name.upper()),
+            words="\n".join(
+                self._BASH_COMPLETION_ENTRY_TEMPLATE.format(
+                    key=shlex.quote(key), words=shlex.quote(value)
+                )
+                for key, value in words.items()
+            ),
+            values="\n".join(
+                self._BASH_COMPLETION_ENTRY_TEMPLATE.format(
+                    key=shlex.quote(key), words=shlex.quote(value)
+                )
+                for key, value in values.items()
+            ),
+            cli=shlex.quote(name),
+        )
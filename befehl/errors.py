@@ -0,0 +1,108 @@
+"""
+Definitions for exceptions raised while building or invoking a compiled
+command.
+
+Only the entry-point (calling a `CompiledCommand`) converts the latter
+into output and an exit code. Everything below that boundary raises.
+"""
+
+from typing import Optional, Any
+
+
+class CliExit(Exception):
+    """
+    Request to end an invocation (e.g., after generating help).
+
+    Keyword arguments:
+    message -- message for the user; written to stdout if `exit_code`
+               is zero and stderr otherwise
+               (default None)
+    exit_code -- exit code of the invocation
+                 (default 0)
+    command -- location of the command in the command-tree
+               (default None)
+    """
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        *,
+        exit_code: int = 0,
+        command: Optional[str] = None,
+    ) -> None:
+        super().__init__(message)
+        self.message = message
+        self.exit_code = exit_code
+        self.command = command
+
+
+class CliError(CliExit):
+    """
+    Base class for errors of an invocation (exit code defaults to 1).
+    """
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        *,
+        exit_code: int = 1,
+        command: Optional[str] = None,
+    ) -> None:
+        super().__init__(message, exit_code=exit_code, command=command)
+
+
+class ParseError(CliError):
+    """
+    Error while parsing input.
+
+    Keyword arguments:
+    message -- error message
+    target -- `Option` or `Argument` that the error refers to
+              (default None)
+    value -- raw value that has been rejected
+             (default None)
+    index -- position of `value` among the values passed to
+             `parse_many` of `target` (if raised by `parse_many`)
+             (default None)
+    exit_code -- exit code of the invocation
+                 (default 1)
+    command -- location of the command in the command-tree
+               (default None)
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        *,
+        target: Optional[Any] = None,
+        value: Optional[str] = None,
+        index: Optional[int] = None,
+        exit_code: int = 1,
+        command: Optional[str] = None,
+    ) -> None:
+        super().__init__(message, exit_code=exit_code, command=command)
+        self.target = target
+        self.value = value
+        self.index = index
+
+
+class ValidationError(CliError):
+    """Rejection of parsed input by `Command.validate`."""
+
+
+class BuildError(ValueError):
+    """
+    Report of all problems in a command-tree (see keyword
+    `collect_errors` of `Command.build`).
+
+    Keyword arguments:
+    errors -- messages of all violations
+    """
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__(
+            f"Found {len(errors)} problem(s) in command-tree:\n"
+            + "\n".join(f"* {error}" for error in errors)
+        )
+        self.errors = errors
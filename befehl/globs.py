@@ -0,0 +1,156 @@
+"""
+Definitions for precompiled glob patterns (see
+`Parser.parse_with_glob`).
+
+Patterns are translated once into a single regular expression that is
+matched against the (normalized) string of a path. Like
+`pathlib.PurePath.match`, relative patterns are matched from the right
+and absolute patterns against the entire path. A component `**`
+matches any number (including zero) of components while any other
+component of a pattern only matches a single non-empty component.
+"""
+
+from typing import Callable, Iterable
+from pathlib import PurePath
+import os
+import re
+
+
+_CASE_SENSITIVE = os.path.normcase("A") == "A"
+
+
+def normalize(data: str) -> str:
+    """
+    Returns `data` normalized like the string of a `pathlib.PurePath`
+    (with '/' as separator).
+    """
+    if (
+        os.sep != "/"
+        or "//" in data
+        or "/." in data
+        or data[:1] in ("", ".")
+        or data[-1] == "/"
+    ):
+        # may be changed by normalization (empty or '.'-components,
+        # repeated or trailing separators)
+        return PurePath(data).as_posix()
+    return data
+
+
+def _translate_set(chars: str) -> str:
+    """
+    Returns regular expression for the characters `chars` of a set
+    `[...]` (like `fnmatch.translate`, but negated sets do not match
+    '/').
+    """
+    negated = chars[:1] == "!"
+    if negated:
+        chars = chars[1:]
+    if "-" not in chars:
+        chars = chars.replace("\\", "\\\\")
+    else:
+        # split at hyphens that form ranges
+        chunks = []
+        start = 0
+        index = chars.find("-", 1)
+        while index >= 0:
+            chunks.append(chars[start:index])
+            start = index + 1
+            index = chars.find("-", index + 3)
+        if start < len(chars):
+            chunks.append(chars[start:])
+        else:
+            chunks[-1] += "-"
+        # remove empty ranges (invalid in regular expressions)
+        for index in range(len(chunks) - 1, 0, -1):
+            if chunks[index - 1][-1] > chunks[index][0]:
+                chunks[index - 1] = chunks[index - 1][:-1] + chunks[index][1:]
+                del chunks[index]
+        chars = "-".join(
+            chunk.replace("\\", "\\\\").replace("-", "\\-")
+            for chunk in chunks
+        )
+    # escape nested sets and set operations ('&&', '~~', '||')
+    chars = re.sub(r"([][&~|^])", r"\\\1", chars)
+    if negated:
+        return f"[^/{chars}]"
+    if not chars:
+        # empty range never matches
+        return "(?!)"
+    return f"[{chars}]"
+
+
+def _translate_component(component: str) -> str:
+    """Returns regular expression for a single pattern-component."""
+    result = []
+    index = 0
+    while index < len(component):
+        char = component[index]
+        index += 1
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "[":
+            end = index
+            if end < len(component) and component[end] == "!":
+                end += 1
+            if end < len(component) and component[end] == "]":
+                end += 1
+            end = component.find("]", end)
+            if end < 0:
+                result.append(re.escape(char))
+                continue
+            result.append(_translate_set(component[index:end]))
+            index = end + 1
+        else:
+            result.append(re.escape(char))
+    return "".join(result)
+
+
+def translate(pattern: str) -> str:
+    """
+    Returns regular expression for glob `pattern` (fullmatched against
+    a normalized path with a trailing '/', see `compile_patterns`).
+    Raises `ValueError` for an empty pattern.
+    """
+    path = PurePath(pattern)
+    if not pattern or not path.parts:
+        raise ValueError("Bad glob pattern (must not be empty).")
+    parts = list(path.parts)
+    if path.anchor:
+        prefix = re.escape(parts.pop(0).replace("\\", "/"))
+    else:
+        prefix = "(?:.*/)?"
+    # components of a path are never empty (the lookahead prevents,
+    # e.g., '/*' from matching '/')
+    return prefix + "".join(
+        (
+            "(?:[^/]+/)*"
+            if part == "**"
+            else "(?=[^/])" + _translate_component(part) + "/"
+        )
+        for part in parts
+    )
+
+
+def compile_patterns(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Returns function that returns `True` if a path (as string)
+    satisfies any of the glob `patterns`. Raises `ValueError` for bad
+    patterns.
+    """
+    expression = "|".join(f"(?:{translate(pattern)})" for pattern in patterns)
+    try:
+        match = re.compile(
+            expression, re.DOTALL | (0 if _CASE_SENSITIVE else re.IGNORECASE)
+        ).fullmatch
+    except re.error as exc_info:
+        raise ValueError(f"Bad glob pattern ({exc_info}).") from exc_info
+
+    def _(data: str) -> bool:
+        path = normalize(data)
+        # empty path does not match (like `pathlib.PurePath.match`)
+        return path != "." and match(path + "/") is not None
+
+    return _
@@ -0,0 +1,225 @@
+"""Definitions for class `LazyCommand`."""
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Optional,
+    Iterable,
+    Sequence,
+    Any,
+)
+from importlib import import_module
+from pathlib import Path
+import os
+import threading
+
+from .command import Command
+from .compiled import CompiledCommand
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class LazyCommand(Command):
+    """
+    Placeholder for a subcommand that is imported only when it is
+    invoked.
+
+    Instead of an instance of a `Command`-class, only the subcommand's
+    metadata and a reference to its class are declared. The referenced
+    module is imported (and the subcommand instantiated) once the
+    subcommand is selected in the input. The auto-generated help and
+    autocomplete of the parent command only use the declared metadata.
+        ```
+        class MyCli(Cli):
+            cmd = LazyCommand(
+                "subcommand",
+                "my_package.subcommand:MySubCommand",
+                helptext="some subcommand",
+            )
+        ```
+
+    Keyword arguments:
+    name -- command name
+    target -- reference to the `Command`-class in the format
+              "package.module:ClassName"
+    helptext -- command description for auto-generated help-option
+                (defeault None)
+    """
+
+    __slots__ = ("__target", "__command", "__lock")
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        *,
+        helptext: Optional[str] = None,
+    ) -> None:
+        super().__init__(name, helptext=helptext)
+        module, _, class_name = target.partition(":")
+        if not module or not class_name:
+            raise ValueError(
+                f"Bad target '{target}' for command '{name}' (expected "
+                + "format 'package.module:ClassName')."
+            )
+        self.__target = target
+        self.__command: Optional[Command] = None
+        self.__lock = threading.Lock()
+
+    @property
+    def target(self) -> str:
+        """Returns `LazyCommand` target."""
+        return self.__target
+
+    def __repr__(self):
+        return (
+            f"LazyCommand(name={self.name}, target={self.target}, "
+            + f"helptext={self.helptext})"
+        )
+
+    def load(self) -> Command:
+        """
+        Imports the target and returns an instance of the referenced
+        `Command`-class (created on first call).
+        """
+        with self.__lock:
+            if self.__command is None:
+                module, _, class_name = self.__target.partition(":")
+                cls = getattr(import_module(module), class_name, None)
+                if not isinstance(cls, type) or not issubclass(cls, Command):
+                    raise ValueError(
+                        f"Bad target '{self.__target}' for command "
+                        + f"'{self.name}' (not a Command-class)."
+                    )
+                self.__command = cls(self.name, helptext=self.helptext)
+        return self.__command
+
+    def _collect_errors(
+        self,
+        help_: bool,
+        completion: bool,
+        command_name: str,
+        errors: list[str],
+    ) -> None:
+        """See `Command._collect_errors` (imports the target)."""
+        try:
+            command = self.load()
+        except ImportError as exc_info:
+            errors.append(
+                f"Unable to import target '{self.__target}' for command "
+                + f"'{self.name}' ({exc_info})."
+            )
+            return
+        except ValueError as exc_info:
+            errors.append(str(exc_info))
+            return
+        # pylint: disable=protected-access
+        command._collect_errors(help_, completion, command_name, errors)
+
+    # pylint: disable=unused-argument
+    def build(
+        self,
+        *,
+        help_: bool = True,
+        completion: Optional[bool] = None,
+        loc: Optional[str] = None,
+        strict: Optional[bool] = None,
+        cache: Optional[bool | str | Path] = None,
+        loop_factory: Optional[
+            Callable[[], "asyncio.AbstractEventLoop"]
+        ] = None,
+        response_files: Optional[str] = None,
+        abbreviations: bool = False,
+        help_widths: Optional[Iterable[int]] = None,
+        collect_errors: bool = False,
+    ) -> "CompiledCommand | LazyCompiledCommand":
+        """
+        Returns cli-callable that imports and builds the target on first
+        use (immediately if `strict`). See `Command.build` for details.
+        """
+        if strict is None:
+            strict = "_BEFEHL_STRICT" in os.environ
+        kwargs = {
+            "help_": help_,
+            "completion": completion,
+            "loc": loc,
+            "strict": strict,
+            "loop_factory": loop_factory,
+            "response_files": response_files,
+            "abbreviations": abbreviations,
+            "help_widths": help_widths,
+            "collect_errors": collect_errors,
+        }
+
+        if strict:
+            return self.load().build(**kwargs)
+
+        return LazyCompiledCommand(self, kwargs)
+
+
+class LazyCompiledCommand:
+    """
+    Stand-in for the `CompiledCommand` of a `LazyCommand` that has not
+    been imported yet. The target is imported and built when the
+    subcommand is first resolved.
+
+    Keyword arguments:
+    command -- `LazyCommand`
+    build_kwargs -- keyword arguments for building the target
+    """
+
+    __slots__ = ("__command", "__build_kwargs", "__compiled", "__lock")
+
+    def __init__(
+        self, command: LazyCommand, build_kwargs: dict[str, Any]
+    ) -> None:
+        self.__command = command
+        self.__build_kwargs = build_kwargs
+        self.__compiled: Optional[CompiledCommand] = None
+        self.__lock = threading.Lock()
+
+    @property
+    def command(self) -> LazyCommand:
+        """Returns the `LazyCommand`."""
+        return self.__command
+
+    def load(self) -> CompiledCommand:
+        """Returns `CompiledCommand` of the target (built on first call)."""
+        if self.__compiled is None:
+            with self.__lock:
+                if self.__compiled is None:
+                    self.__compiled = self.__command.load().build(
+                        **self.__build_kwargs
+                    )
+        return self.__compiled
+
+    def resolve(
+        self, raw: Sequence[str], index: int = 0
+    ) -> tuple[CompiledCommand, int]:
+        """See `CompiledCommand.resolve`."""
+        return self.load().resolve(raw, index)
+
+    def invoke(self, raw: Optional[Iterable[str]] = None) -> Any:
+        """See `CompiledCommand.invoke`."""
+        return self.load().invoke(raw)
+
+    def __call__(self, raw: Optional[Iterable[str]] = None) -> None:
+        self.load()(raw)
+
+    def get_completion_table(
+        self,
+        path: str,
+        words: Optional[dict[str, str]] = None,
+        values: Optional[dict[str, str]] = None,
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """See `CompiledCommand.get_completion_table`."""
+        if self.__compiled is None:
+            # only metadata available without importing the target
+            if words is None:
+                words = {}
+            if values is None:
+                values = {}
+            words[path] = ""
+            return words, values
+        return self.__compiled.get_completion_table(path, words, values)
@@ -1,12 +1,11 @@
 """Definitions for class `Option`."""
 
 from typing import Iterable, Optional, Callable, Any
-import sys
 
-from .common import quote_list
+from .common import quote_list, ParsingMixin
 
 
-class Option:
+class Option(ParsingMixin):
     """
     CLI-option class.
 
@@ -34,9 +33,26 @@ class Option:
                 return True, None, number
               ```
 
+              A parser can also be a coroutine function; then, all
+              values of an invocation are parsed concurrently (see
+              `parse_async`).
+
               (default None)
+    workers -- if given, values are parsed by a pool of this many
+               threads (for I/O-bound parsers with many values; results
+               and errors are reported as if parsed serially)
+               (default None)
     """
 
+    __slots__ = (
+        "__names",
+        "__helptext",
+        "__nargs",
+        "__strict",
+    )
+
+    _TRACE_KEY = "option"
+
     def __init__(
         self,
         names: str | Iterable[str],
@@ -47,14 +63,20 @@ class Option:
         parser: Optional[
             Callable[[str], tuple[bool, Optional[str], Optional[Any]]]
         ] = None,
+        workers: Optional[int] = None,
     ) -> None:
         if len(names) == 0:
             raise ValueError("An Option requires at least one name.")
-        self.__names = (names,) if isinstance(names, str) else names
+        self.__names = (names,) if isinstance(names, str) else tuple(names)
         self.__helptext = helptext
         self.__nargs = nargs
         self.__strict = strict
-        self.__parser = parser
+        if workers is not None and workers < 1:
+            raise ValueError(
+                f"Bad number of workers for option {self} (must be "
+                + "positive)."
+            )
+        super().__init__(parser, workers)
 
     @property
     def names(self) -> Optional[Iterable[str]]:
@@ -76,20 +98,11 @@ class Option:
         """Returns `Option` strict."""
         return self.__strict
 
-    def parse(self, data: Any) -> Any:
-        """Returns response of `Option`'s parser if available."""
-        if self.__parser:
-            ok, msg, data = self.__parser(data)
-            if not ok:
-                print(msg, file=sys.stderr)
-                sys.exit(1)
-        return data
-
     def __repr__(self):
         return (
             f"Option(names={self.names}, helptext={self.helptext}, "
             + f"nargs={self.nargs}, strict={self.strict}, "
-            + f"parser={self.__parser})"
+            + f"parser={self.parser}, workers={self.workers})"
         )
 
     def __str__(self):
@@ -1,11 +1,51 @@
 """Definitions for collection-class `Parser`."""
 
-from typing import Optional, Callable, Any, Iterable
+from typing import Optional, Callable, Any, Iterable, Sequence, NamedTuple
 from abc import ABC
+from collections import OrderedDict
+from functools import partial
 from pathlib import Path
+from time import monotonic
+from array import array, typecodes
 import re
+import threading
 
-from .common import quote_list
+from .common import quote_list, is_coroutine_function
+from .paths import StatPath, check_path, check_paths
+from .globs import compile_patterns
+from .choices import (
+    SortedFile,
+    build_index,
+    format_values,
+    lookup,
+    read_values,
+)
+
+
+_ARRAY_CHUNK_SIZE = 1 << 12
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a parser returned by `Parser.cached`."""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+def _with_bulk(bulk: Callable[[Sequence[str]], list[tuple]]) -> Callable:
+    """
+    Returns decorator that attaches `bulk` (parser for a sequence of
+    values returning a list of responses) to a parser as attribute
+    `bulk` (see `Option.parse_many` and `Argument.parse_many`).
+    """
+
+    def decorator(parser: Callable) -> Callable:
+        parser.bulk = bulk
+        return parser
+
+    return decorator
 
 
 class Parser(ABC):
@@ -46,6 +86,110 @@ class Parser(ABC):
             return True, None, data
         return _
 
+    @staticmethod
+    def cached(
+        parser: Callable[[str], tuple[bool, Optional[str], Optional[Any]]],
+        maxsize: Optional[int] = 128,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Returns parser that memoizes the results of `parser` (including
+        rejections) in a least-recently-used cache. The returned parser
+        provides the methods `cache_info` (returns `CacheInfo`) and
+        `cache_clear`.
+
+        The attributes `values`, `bulk` (only values that are not cached
+        are passed to the bulk-version of `parser`), and `array` (not
+        cached) of `parser` are kept.
+
+        Keyword arguments:
+        parser -- parser to be cached (can also be a coroutine
+                  function)
+        maxsize -- maximum number of cached values; `None` for an
+                   unbounded cache
+                   (default 128)
+        ttl -- time (in seconds) after which cached results expire;
+               `None` for no expiration
+               (default None)
+        """
+        cache: OrderedDict[str, tuple[Optional[float], tuple]] = (
+            OrderedDict()
+        )
+        lock = threading.Lock()
+        stats = [0, 0]
+
+        def get_cached(data):
+            with lock:
+                entry = cache.get(data)
+                if entry is not None and (
+                    entry[0] is None or entry[0] > monotonic()
+                ):
+                    cache.move_to_end(data)
+                    stats[0] += 1
+                    return entry[1]
+                stats[1] += 1
+                return None
+
+        def put_cached(data, result):
+            with lock:
+                cache[data] = (
+                    None if ttl is None else monotonic() + ttl,
+                    result,
+                )
+                cache.move_to_end(data)
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        if is_coroutine_function(parser):
+
+            async def _(data):
+                result = get_cached(data)
+                if result is None:
+                    result = put_cached(data, tuple(await parser(data)))
+                return result
+
+        else:
+
+            def _(data):
+                result = get_cached(data)
+                if result is None:
+                    result = put_cached(data, tuple(parser(data)))
+                return result
+
+        def cache_info() -> CacheInfo:
+            with lock:
+                return CacheInfo(stats[0], stats[1], maxsize, len(cache))
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+                stats[:] = [0, 0]
+
+        if hasattr(parser, "bulk"):
+
+            def bulk(data: Sequence[str]) -> list[tuple]:
+                results = [get_cached(value) for value in data]
+                missing = [
+                    i for i, result in enumerate(results) if result is None
+                ]
+                if missing:
+                    for i, result in zip(
+                        missing, parser.bulk([data[i] for i in missing])
+                    ):
+                        results[i] = put_cached(data[i], tuple(result))
+                return results
+
+            _.bulk = bulk
+
+        _.cache_info = cache_info
+        _.cache_clear = cache_clear
+        if hasattr(parser, "values"):
+            _.values = parser.values
+        if hasattr(parser, "array"):
+            _.array = parser.array
+        return _
+
     @staticmethod
     def parse_as_bool(data) -> tuple[bool, Optional[str], Optional[bool]]:
         """
@@ -89,79 +233,241 @@ class Parser(ABC):
         return True, None, number
 
     @staticmethod
-    def parse_as_path(data) -> tuple[bool, Optional[str], Optional[Path]]:
+    def parse_as_array(
+        typecode: str = "d", numpy: bool = False
+    ) -> Callable[[str], tuple[bool, Optional[str], Optional[int | float]]]:
+        """
+        Returns callable that can be used to parse numeric values into
+        a compact array. It returns ok if `data` is a number that can be
+        stored with the given `typecode`.
+
+        Many values (e.g., of an `Argument` with unlimited `nargs`) are
+        converted by the array-version (attribute `array`) in a single
+        pass into an `array.array` (or a `numpy.ndarray`) instead of a
+        list of Python objects (see `Option.parse_many` and
+        `Argument.parse_many`).
+
+        Keyword arguments:
+        typecode -- numeric type-code of `array.array` (e.g., "d" for
+                    double or "q" for signed 64 bit integer)
+                    (default "d")
+        numpy -- whether to return a `numpy.ndarray` (with the
+                 equivalent `dtype`) instead of an `array.array`
+                 (default False)
+        """
+        if typecode not in typecodes or typecode in "uw":
+            raise ValueError(
+                f"Bad typecode '{typecode}' (expected one of "
+                + f"{quote_list(c for c in typecodes if c not in 'uw')})."
+            )
+        if typecode in "fd":
+            convert, kind = float, "a float"
+        else:
+            convert, kind = int, "an integer"
+        if numpy:
+            # pylint: disable=import-outside-toplevel
+            import numpy as np
+
+            dtype = np.dtype(typecode)
+
+            def to_array(data: Sequence[str]) -> Any:
+                return np.fromiter(
+                    map(convert, data), dtype=dtype, count=len(data)
+                )
+
+        else:
+
+            def to_array(data: Sequence[str]) -> Any:
+                result = array(typecode)
+                # convert in chunks (bounded number of temporary objects)
+                for i in range(0, len(data), _ARRAY_CHUNK_SIZE):
+                    result.fromlist(
+                        list(map(convert, data[i : i + _ARRAY_CHUNK_SIZE]))
+                    )
+                return result
+
+        def _(data) -> tuple[bool, Optional[str], Optional[int | float]]:
+            try:
+                number = array(typecode, (convert(data),))[0]
+            except ValueError:
+                return False, f"input '{data}' is not {kind}", None
+            except OverflowError:
+                return (
+                    False,
+                    f"input '{data}' is out of range for typecode "
+                    + f"'{typecode}'",
+                    None,
+                )
+            return True, None, number
+
+        _.array = to_array
+        return _
+
+    @staticmethod
+    @_with_bulk(check_paths)
+    def parse_as_path(
+        data,
+    ) -> tuple[bool, Optional[str], Optional[StatPath]]:
         """
         Parses `data` as path. Returns ok if input exists in filesystem.
+
+        The returned `StatPath` carries the `os.stat_result` of the
+        (single) check. For many values, the bulk-version (attribute
+        `bulk`) checks values per parent directory.
         """
-        path = Path(data)
-        if not path.exists():
-            return False, f"path '{data}' does not exist", None
-        return True, None, path
+        return check_path(data)
 
     @staticmethod
-    def parse_as_file(data) -> tuple[bool, Optional[str], Optional[Path]]:
+    @_with_bulk(partial(check_paths, kind="file"))
+    def parse_as_file(
+        data,
+    ) -> tuple[bool, Optional[str], Optional[StatPath]]:
         """
-        Parses `data` as file. Returns ok if input is a file.
+        Parses `data` as file. Returns ok if input is a file (see also
+        `parse_as_path`).
         """
-        ok, msg, data = Parser.parse_as_path(data)
-        if not ok:
-            return ok, msg, data
-        if not data.is_file():
-            return False, f"path '{data}' is not a file", None
-        return True, None, data
+        return check_path(data, "file")
 
     @staticmethod
-    def parse_as_dir(data) -> tuple[bool, Optional[str], Optional[Path]]:
+    @_with_bulk(partial(check_paths, kind="dir"))
+    def parse_as_dir(
+        data,
+    ) -> tuple[bool, Optional[str], Optional[StatPath]]:
         """
-        Parses `data` as directory. Returns ok if input is a directory.
+        Parses `data` as directory. Returns ok if input is a directory
+        (see also `parse_as_path`).
         """
-        ok, msg, data = Parser.parse_as_path(data)
-        if not ok:
-            return ok, msg, data
-        if not data.is_dir():
-            return False, f"path '{data}' is not a directory", None
-        return True, None, data
+        return check_path(data, "dir")
 
     @staticmethod
     def parse_with_values(
-        values: Iterable[str],
+        values: Iterable[str], case_sensitive: bool = True
     ) -> Callable[[str], tuple[bool, Optional[str], Optional[str]]]:
         """
         Returns callable that can be used to parse strings as set of
-        values. It returns ok if `data` is among the given `values`.
+        values. It returns ok if `data` is among the given `values`
+        (looked up in a hash-based index).
+
+        The allowed values are available as attribute `values` of the
+        returned callable (e.g., used for bash-autocomplete).
+
+        Keyword arguments:
+        values -- allowed values
+        case_sensitive -- if `False`, values are matched
+                          case-insensitively and the matching allowed
+                          value is returned
+                          (default True)
         """
+        values = tuple(values)
+        index = build_index(values, case_sensitive)
 
-        def _(data) -> tuple[bool, Optional[str], Optional[Path]]:
-            if data not in values:
+        def _(data) -> tuple[bool, Optional[str], Optional[str]]:
+            value = lookup(index, data)
+            if value is None:
                 return (
                     False,
                     f"input '{data}' is not among the allowed values: "
-                    + quote_list(values),
+                    + format_values(values),
                     None,
                 )
-            return True, None, data
+            return True, None, value
+
+        _.values = values
+        return _
+
+    @staticmethod
+    def parse_with_values_file(
+        path: str | Path, mmap: bool = False, case_sensitive: bool = True
+    ) -> Callable[[str], tuple[bool, Optional[str], Optional[str]]]:
+        """
+        Returns callable that can be used to parse strings as set of
+        values from a UTF-8-encoded file with one value per line. It
+        returns ok if `data` is among these values. The file is only
+        read on first use.
+
+        Keyword arguments:
+        path -- path of the file
+        mmap -- if `True`, values are looked up by binary search in the
+                memory-mapped file instead of being loaded into memory;
+                requires the file to be sorted by code point (e.g.,
+                with `LC_ALL=C sort`) or, if not `case_sensitive`, by
+                `str.casefold` of its lines
+                (default False)
+        case_sensitive -- if `False`, values are matched
+                          case-insensitively and the matching allowed
+                          value is returned
+                          (default True)
+        """
+        path = str(path)
+        message = f"is not among the allowed values in file '{path}'"
+        if mmap:
+            get = SortedFile(path, case_sensitive).get
+        else:
+            index = []
+            lock = threading.Lock()
+
+            def get(data: str) -> Optional[str]:
+                if not index:
+                    with lock:
+                        if not index:
+                            index.append(
+                                build_index(
+                                    read_values(path), case_sensitive
+                                )
+                            )
+                return lookup(index[0], data)
+
+        def _(data) -> tuple[bool, Optional[str], Optional[str]]:
+            value = get(data)
+            if value is None:
+                return False, f"input '{data}' {message}", None
+            return True, None, value
 
         return _
 
     @staticmethod
     def parse_with_glob(
-        pattern: str,
+        *patterns: str,
     ) -> Callable[[str], tuple[bool, Optional[str], Optional[Path]]]:
         """
         Returns callable that can be used to parse strings into paths.
-        It returns ok if `data` satisfies the given glob `pattern`.
+        It returns ok if `data` satisfies any of the given glob
+        `patterns`.
+
+        Patterns are compiled once (see `befehl.globs`); like with
+        `pathlib.PurePath.match`, relative patterns are matched from
+        the right, and the component `**` matches any number of
+        components. For many values, the bulk-version (attribute
+        `bulk`) only creates `Path`s for accepted values.
         """
+        if not patterns:
+            raise ValueError("Missing glob pattern.")
+        match = compile_patterns(patterns)
+        if len(patterns) == 1:
+            message = f"does not satisfy glob pattern '{patterns[0]}'"
+        else:
+            message = (
+                "does not satisfy any of the glob patterns "
+                + quote_list(patterns)
+            )
 
-        def _(data) -> tuple[bool, Optional[str], Optional[Path]]:
-            path = Path(data)
-            if not path.match(pattern):
-                return (
-                    False,
-                    f"input '{data}' does not satisfy glob pattern "
-                    + f"'{pattern}'",
-                    None,
+        def bulk(
+            data: Sequence[str],
+        ) -> list[tuple[bool, Optional[str], Optional[Path]]]:
+            return [
+                (
+                    (True, None, Path(value))
+                    if match(value)
+                    else (False, f"input '{value}' {message}", None)
                 )
-            return True, None, path
+                for value in data
+            ]
+
+        @_with_bulk(bulk)
+        def _(data) -> tuple[bool, Optional[str], Optional[Path]]:
+            if not match(data):
+                return False, f"input '{data}' {message}", None
+            return True, None, Path(data)
 
         return _
 
@@ -0,0 +1,158 @@
+"""
+Definitions for stat-once path handling (see `Parser.parse_as_path`).
+
+Single values are checked with exactly one `os.stat`. Many values can be
+checked in bulk, where values are grouped by their parent directory and
+directories with many values are listed once with `os.scandir`. Listing
+a directory stops after a number of entries proportional to the number
+of its values (remaining values are checked individually), such that a
+few values in a huge directory do not require listing all of it.
+"""
+
+from typing import Optional, Sequence
+from pathlib import Path
+import os
+import stat
+import errno
+
+
+class StatPath(type(Path())):
+    """
+    `pathlib.Path` that carries the `os.stat_result` obtained while
+    parsing (see property `stat_result`). Note that this result is not
+    updated if the file changes afterwards.
+    """
+
+    _stat_result: Optional[os.stat_result] = None
+    _dir_entry: Optional[os.DirEntry] = None
+
+    @property
+    def stat_result(self) -> Optional[os.stat_result]:
+        """
+        Returns `os.stat_result` (following symlinks) from parsing (if
+        available).
+        """
+        if self._stat_result is None and self._dir_entry is not None:
+            try:
+                self._stat_result = self._dir_entry.stat()
+            except OSError:
+                pass
+        return self._stat_result
+
+
+# errors that indicate a path does not exist (see `pathlib`)
+_MISSING = (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP)
+_KINDS = {
+    None: (lambda _: True, ""),
+    "file": (stat.S_ISREG, "file"),
+    "dir": (stat.S_ISDIR, "directory"),
+}
+# minimum number of values in a directory for listing it
+_MIN_BULK = 8
+# maximum number of listed directory entries per value
+_SCAN_FACTOR = 4
+
+
+def check_path(
+    data: str, kind: Optional[str] = None
+) -> tuple[bool, Optional[str], Optional[StatPath]]:
+    """
+    Returns parser-response for `data` as path (with `kind` either
+    `None`, "file", or "dir") based on a single `os.stat`.
+    """
+    path = StatPath(data)
+    try:
+        result = os.stat(path)
+    except ValueError:
+        return False, f"path '{data}' does not exist", None
+    except OSError as exc_info:
+        if exc_info.errno in _MISSING:
+            return False, f"path '{data}' does not exist", None
+        return False, f"path '{data}' is not accessible", None
+    test, name = _KINDS[kind]
+    if not test(result.st_mode):
+        return False, f"path '{data}' is not a {name}", None
+    path._stat_result = result
+    return True, None, path
+
+
+def _check_entry(
+    data: str, path: StatPath, entry: os.DirEntry, kind: Optional[str]
+) -> tuple[bool, Optional[str], Optional[StatPath]]:
+    """
+    Returns parser-response for `data` based on its `os.DirEntry`
+    (file type is usually known without additional system call).
+    """
+    try:
+        if kind is None:
+            if entry.is_symlink():
+                # only exists if target exists
+                entry.stat()
+            ok = True
+        elif kind == "file":
+            ok = entry.is_file()
+        else:
+            ok = entry.is_dir()
+    except OSError:
+        return check_path(data, kind)
+    if not ok:
+        if entry.is_symlink():
+            # distinguish broken symlinks
+            return check_path(data, kind)
+        return False, f"path '{data}' is not a {_KINDS[kind][1]}", None
+    path._dir_entry = entry
+    return True, None, path
+
+
+def check_paths(
+    data: Sequence[str], kind: Optional[str] = None
+) -> list[tuple[bool, Optional[str], Optional[StatPath]]]:
+    """
+    Returns parser-responses for all values in `data` (see
+    `check_path`). Values are grouped by parent directory and every
+    directory with at least `_MIN_BULK` values is listed once with
+    `os.scandir` (at most `_SCAN_FACTOR` entries per value; values that
+    cannot be resolved this way are checked individually).
+    """
+    results: list[Optional[tuple]] = [None] * len(data)
+    paths: list[Optional[StatPath]] = [None] * len(data)
+
+    # group by parent directory
+    groups: dict[str, dict[str, list[int]]] = {}
+    for index, value in enumerate(data):
+        path = StatPath(value)
+        head, tail = os.path.split(str(path))
+        if tail in ("", ".", "..") or "\0" in tail:
+            results[index] = check_path(value, kind)
+            continue
+        paths[index] = path
+        groups.setdefault(head, {}).setdefault(tail, []).append(index)
+
+    for head, names in groups.items():
+        if len(names) < _MIN_BULK:
+            continue
+        remaining = len(names)
+        budget = _SCAN_FACTOR * len(names)
+        try:
+            with os.scandir(head or ".") as entries:
+                for entry in entries:
+                    indices = names.get(entry.name)
+                    if indices is not None:
+                        for index in indices:
+                            results[index] = _check_entry(
+                                data[index], paths[index], entry, kind
+                            )
+                        remaining -= 1
+                        if remaining == 0:
+                            break
+                    budget -= 1
+                    if budget == 0:
+                        break
+        except (OSError, ValueError):
+            pass
+
+    # check remaining values individually
+    for index, value in enumerate(data):
+        if results[index] is None:
+            results[index] = check_path(value, kind)
+    return results
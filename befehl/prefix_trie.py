@@ -0,0 +1,71 @@
+"""Definitions for class `PrefixTrie`."""
+
+from typing import Generic, Iterable, Optional, TypeVar
+
+
+T = TypeVar("T")
+_AMBIGUOUS = object()
+
+
+class PrefixTrie(Generic[T]):
+    """
+    Prefix tree for resolving unique prefixes of keys (e.g., abbreviated
+    option names). Every node records the value that is shared by all
+    keys below it, so that a lookup takes `O(len(prefix))` independent
+    of the number of keys.
+
+    Keyword arguments:
+    items -- pairs of key and value; keys with equal values (e.g.,
+             aliases of the same `Option`) do not make a prefix ambiguous
+    """
+
+    __slots__ = ("__root",)
+
+    def __init__(self, items: Iterable[tuple[str, T]]) -> None:
+        # nodes map characters to child nodes; the key `None` holds the
+        # shared value of the subtree and the key "" a complete key
+        self.__root: dict = {}
+        for key, value in items:
+            node = self.__root
+            for char in key:
+                node = node.setdefault(char, {})
+                shared = node.setdefault(None, value)
+                if shared is not _AMBIGUOUS and shared != value:
+                    node[None] = _AMBIGUOUS
+            node[""] = key
+
+    def __find(self, prefix: str) -> Optional[dict]:
+        """Returns node for `prefix` (`None` if no key matches)."""
+        node = self.__root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def get(self, prefix: str) -> Optional[T]:
+        """
+        Returns value of the keys that start with `prefix` (`None` if
+        there is no such key or the prefix is ambiguous).
+        """
+        node = self.__find(prefix)
+        if node is None or not prefix:
+            return None
+        value = node[None]
+        return None if value is _AMBIGUOUS else value
+
+    def candidates(self, prefix: str) -> list[str]:
+        """Returns sorted list of all keys that start with `prefix`."""
+        node = self.__find(prefix)
+        if node is None:
+            return []
+        keys = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == "":
+                    keys.append(child)
+                elif char is not None:
+                    stack.append(child)
+        return sorted(keys)
@@ -0,0 +1,109 @@
+"""
+Definitions for response-file expansion.
+
+If enabled (see `Command.build`), input tokens of the form `@path` are
+replaced by the tokens read from the file at `path`. Files are read
+incrementally and may themselves contain `@path`-tokens.
+
+The readers are also used for values of streaming `Argument`s.
+"""
+
+from typing import Callable, Iterable, Iterator, TextIO
+import os
+import sys
+
+from .errors import ParseError
+
+
+_CHUNK_SIZE = 1 << 16
+
+
+def read_shell(file: TextIO) -> Iterator[str]:
+    """
+    Yields shell-like tokens (whitespace-separated; supports quotes,
+    escapes, and comments) from `file` (read incrementally).
+    """
+    # pylint: disable=import-outside-toplevel
+    import shlex
+
+    lexer = shlex.shlex(file, posix=True, punctuation_chars=False)
+    lexer.whitespace_split = True
+    lexer.commenters = "#"
+    yield from lexer
+
+
+def read_newline(file: TextIO) -> Iterator[str]:
+    """Yields non-empty lines from `file` (one token per line)."""
+    for line in file:
+        line = line.rstrip("\n")
+        if line:
+            yield line
+
+
+def read_nul(file: TextIO) -> Iterator[str]:
+    """Yields NUL-delimited tokens from `file`."""
+    remainder = ""
+    while chunk := file.read(_CHUNK_SIZE):
+        *tokens, remainder = (remainder + chunk).split("\0")
+        yield from tokens
+    if remainder:
+        yield remainder
+
+
+def open_file(path: str, null: bool, token: str) -> TextIO:
+    """
+    Returns text stream for the file at `path` (decoded like command
+    line arguments; without newline-translation if `null`). Raises
+    `ParseError` (referring to `token`) if `path` cannot be opened.
+    """
+    try:
+        # pylint: disable=consider-using-with
+        return open(
+            path,
+            "r",
+            encoding=sys.getfilesystemencoding(),
+            errors="surrogateescape",
+            newline="" if null else None,
+        )
+    except OSError as exc_info:
+        raise ParseError(
+            f"Unable to read file '{path}' ({exc_info.strerror})",
+            value=token,
+        ) from exc_info
+
+
+READERS: dict[str, Callable[[TextIO], Iterator[str]]] = {
+    "shell": read_shell,
+    "newline": read_newline,
+    "nul": read_nul,
+}
+
+
+def expand(
+    raw: Iterable[str], mode: str, _stack: tuple[str, ...] = ()
+) -> Iterator[str]:
+    """
+    Yields tokens of `raw` with `@path`-tokens replaced by the contents
+    of the referenced response-file (read in `mode`, see `READERS`).
+    Raises `ParseError` for unreadable or recursive response-files.
+    """
+    reader = READERS[mode]
+    for token in raw:
+        if len(token) < 2 or token[0] != "@":
+            yield token
+            continue
+
+        path = token[1:]
+        real_path = os.path.realpath(path)
+        if real_path in _stack:
+            raise ParseError(
+                f"Recursive inclusion of response file '{path}'",
+                value=token,
+            )
+        with open_file(path, mode == "nul", token) as file:
+            try:
+                yield from expand(reader(file), mode, _stack + (real_path,))
+            except ValueError as exc_info:
+                raise ParseError(
+                    f"Bad response file '{path}' ({exc_info})", value=token
+                ) from exc_info
@@ -0,0 +1,174 @@
+"""
+Definitions for the fork-server.
+
+The fork-server keeps a built cli-callable (and pre-imported modules)
+resident in memory and listens on a Unix domain socket. For every
+request (see `befehl_client`), a child-process is forked which
+* adopts the client's stdin, stdout, and stderr,
+* adopts the client's arguments, working directory, and environment,
+* invokes the cli-callable, and
+* reports the exit code back to the client.
+"""
+
+from typing import Callable, Optional, Iterable
+from importlib import import_module
+from pathlib import Path
+import sys
+import os
+import json
+import stat
+import signal
+import socket
+import struct
+import traceback
+
+
+def _recv_exactly(connection: socket.socket, size: int) -> bytes:
+    """Returns exactly `size` bytes read from `connection`."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed unexpectedly.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _invoke(
+    cli: Callable[[Optional[Iterable[str]]], None], raw: list[str]
+) -> int:
+    """Returns exit code after invoking `cli` with `raw`."""
+    try:
+        cli(raw)
+    except SystemExit as exc_info:
+        if exc_info.code is None:
+            return 0
+        if isinstance(exc_info.code, int):
+            return exc_info.code
+        print(exc_info.code, file=sys.stderr)
+        return 1
+    # pylint: disable=broad-exception-caught
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _reopen_stdio() -> None:
+    """Replaces `sys.std*` with new streams for file descriptors 0-2."""
+    for fd, name, mode in (
+        (0, "stdin", "r"),
+        (1, "stdout", "w"),
+        (2, "stderr", "w"),
+    ):
+        current = getattr(sys, name)
+        setattr(
+            sys,
+            name,
+            open(  # pylint: disable=consider-using-with
+                fd,
+                mode,
+                encoding=getattr(current, "encoding", None),
+                errors=getattr(current, "errors", None),
+                closefd=False,
+            ),
+        )
+
+
+def _handle(
+    cli: Callable[[Optional[Iterable[str]]], None],
+    connection: socket.socket,
+) -> None:
+    """Handles request on `connection` in forked child and exits."""
+    code = 1
+    try:
+        header, fds, _, _ = socket.recv_fds(connection, 8, 3)
+        if len(header) != 8 or len(fds) != 3:
+            os._exit(1)
+        request = json.loads(
+            _recv_exactly(connection, struct.unpack("!Q", header)[0])
+        )
+        connection.sendall(struct.pack("!i", os.getpid()))
+
+        # adopt client's context
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        _reopen_stdio()
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = request["argv"]
+
+        code = _invoke(cli, sys.argv[1:])
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        try:
+            connection.sendall(struct.pack("!i", code))
+        except OSError:
+            pass
+        os._exit(code & 0xFF)
+
+
+def serve(
+    cli: Callable[[Optional[Iterable[str]]], None],
+    path: str | Path,
+    *,
+    preload: Optional[Iterable[str]] = None,
+    backlog: int = 128,
+) -> None:
+    """
+    Runs fork-server for `cli` (a cli-callable as returned by
+    `Command.build`) on the Unix domain socket at `path` until
+    interrupted.
+
+    Keyword arguments:
+    cli -- cli-callable
+    path -- path of the Unix domain socket (only accessible by the
+            current user)
+    preload -- names of modules to be imported before serving
+               (default None)
+    backlog -- maximum number of pending connections
+               (default 128)
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Fork-server is not supported on this platform.")
+
+    for module in preload or []:
+        import_module(module)
+
+    path = Path(path)
+    if path.exists() and stat.S_ISSOCK(path.stat().st_mode):
+        path.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+    server.listen(backlog)
+
+    # children are reaped automatically
+    sigchld = signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    try:
+        while True:
+            connection, _ = server.accept()
+            for stream in (sys.stdout, sys.stderr):
+                stream.flush()
+            if os.fork() == 0:
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                _handle(cli, connection)
+            connection.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGCHLD, sigchld)
+        server.close()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,140 @@
+"""
+Definitions for phase-timing hooks.
+
+Hooks are callables that can be registered to receive start- and
+end-events for the phases of building and invoking a `Command` like
+    ```
+    def hook(event, phase, timestamp, details):
+        # event: either "start" or "end"
+        # phase: one of "build", "parse", "parse-tokens",
+        #        "parse-options", "parse-arguments", "parser",
+        #        "validate", or "run"
+        # timestamp: result of `time.perf_counter_ns()`
+        # details: dictionary with information on the context (e.g.,
+        #          command or option and index of the value); the
+        #          start- and end-event of a phase share this object
+        ...
+
+    trace.register(hook)
+    ```
+
+Events are only generated while at least one hook is registered.
+
+If the environment sets `_BEFEHL_TRACE`, all events are recorded and
+written as Chrome trace-file (Trace Event Format, compatible with
+Perfetto) to the path given by that variable on exit.
+"""
+
+from typing import Callable, Any
+from collections.abc import Awaitable
+from time import perf_counter_ns
+import os
+import sys
+import atexit
+import threading
+
+
+HOOKS: list[Callable[[str, str, int, dict[str, Any]], None]] = []
+
+
+def register(hook: Callable[[str, str, int, dict[str, Any]], None]) -> None:
+    """Registers `hook`."""
+    HOOKS.append(hook)
+
+
+def unregister(hook: Callable[[str, str, int, dict[str, Any]], None]) -> None:
+    """Unregisters `hook`."""
+    HOOKS.remove(hook)
+
+
+def emit(event: str, phase: str, details: dict[str, Any]) -> None:
+    """Passes event to all registered hooks."""
+    timestamp = perf_counter_ns()
+    for hook in tuple(HOOKS):
+        hook(event, phase, timestamp, details)
+
+
+def call(phase: str, function: Callable, *args, **details) -> Any:
+    """
+    Returns result of `function(*args)` and emits start- and end-events
+    for `phase` if any hook is registered.
+    """
+    if not HOOKS:
+        return function(*args)
+    emit("start", phase, details)
+    try:
+        return function(*args)
+    finally:
+        emit("end", phase, details)
+
+
+async def acall(phase: str, function: Callable, *args, **details) -> Any:
+    """
+    Coroutine-version of `call`; the result of `function(*args)` is
+    awaited if necessary.
+    """
+    if not HOOKS:
+        result = function(*args)
+        return await result if isinstance(result, Awaitable) else result
+    emit("start", phase, details)
+    try:
+        result = function(*args)
+        return await result if isinstance(result, Awaitable) else result
+    finally:
+        emit("end", phase, details)
+
+
+class ChromeTrace:
+    """
+    Hook that records events in Chrome's Trace Event Format.
+
+    Every pair of start- and end-event is recorded as a single complete
+    event (with duration) such that concurrent phases (e.g., of
+    coroutine-parsers) do not need to be nested.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        # start-timestamps and threads of running phases (by `details`,
+        # which are shared by the start- and end-event of a phase)
+        self.__running: dict[int, tuple[int, int]] = {}
+
+    def __call__(
+        self, event: str, phase: str, timestamp: int, details: dict[str, Any]
+    ) -> None:
+        if event == "start":
+            self.__running[id(details)] = (timestamp, threading.get_ident())
+            return
+        start, thread = self.__running.pop(id(details), (timestamp, None))
+        self.events.append(
+            {
+                "name": " ".join([phase] + list(map(str, details.values()))),
+                "cat": phase,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (timestamp - start) / 1000,
+                "pid": os.getpid(),
+                "tid": thread or threading.get_ident(),
+                "args": {k: str(v) for k, v in details.items()},
+            }
+        )
+
+    def write(self, path: str) -> None:
+        """Writes recorded events to `path`."""
+        # pylint: disable=import-outside-toplevel
+        import json
+
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"traceEvents": self.events}, file)
+        except OSError as exc_info:
+            print(
+                f"Unable to write trace to '{path}': {exc_info}",
+                file=sys.stderr,
+            )
+
+
+if os.environ.get("_BEFEHL_TRACE"):
+    _chrome_trace = ChromeTrace()
+    register(_chrome_trace)
+    atexit.register(_chrome_trace.write, os.environ["_BEFEHL_TRACE"])
@@ -0,0 +1,123 @@
+"""
+Definitions for the fork-server client of `befehl`.
+
+This module is shipped as a top-level module (next to the package
+`befehl`) that only depends on the standard library, such that
+importing it does not load `befehl`.
+
+The client forwards an invocation (stdin, stdout, stderr, arguments,
+working directory, and environment) to a fork-server (see
+`befehl.server`) and exits with the exit code of that invocation. A
+minimal entry-point could look like
+    ```
+    from befehl_client import forward
+
+    def main():
+        forward("/path/to/my-cli.sock", fallback="my_cli.cli:cli")
+    ```
+"""
+
+from typing import Optional, Iterable
+from importlib import import_module
+import sys
+import os
+import json
+import signal
+import socket
+import struct
+
+
+def _recv_int(connection: socket.socket) -> Optional[int]:
+    """Returns integer read from `connection` (`None` if closed)."""
+    data = b""
+    while len(data) < 4:
+        chunk = connection.recv(4 - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return struct.unpack("!i", data)[0]
+
+
+def forward(
+    path: str,
+    *,
+    argv: Optional[Iterable[str]] = None,
+    fallback: Optional[str] = None,
+) -> None:
+    """
+    Forwards invocation to the fork-server at `path` and exits with the
+    returned exit code.
+
+    Keyword arguments:
+    path -- path of the fork-server's Unix domain socket
+    argv -- arguments (including program name) of the invocation
+            (default None; uses `sys.argv`)
+    fallback -- reference to a cli-callable in the format
+                "package.module:name" that is invoked directly if the
+                fork-server is not available
+                (default None)
+    """
+    argv = list(sys.argv if argv is None else argv)
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError as exc_info:
+        connection.close()
+        if fallback is None:
+            print(
+                f"Unable to connect to server at '{path}': {exc_info}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        module, _, name = fallback.partition(":")
+        getattr(import_module(module), name)(argv[1:])
+        return
+
+    with connection:
+        request = json.dumps(
+            {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+        ).encode("utf-8")
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        socket.send_fds(
+            connection,
+            [struct.pack("!Q", len(request))],
+            [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()],
+        )
+        connection.sendall(request)
+
+        # forward signals to the child-process
+        pid = _recv_int(connection)
+
+        def forward_signal(signum, _):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+        if pid is not None:
+            for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+                signal.signal(signum, forward_signal)
+
+        code = _recv_int(connection)
+    if code is None:
+        print("Connection to server closed unexpectedly.", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(code)
+
+
+def main() -> None:
+    """
+    Entry-point for `python -m befehl_client <socket> [args ...]`.
+    """
+    if len(sys.argv) < 2:
+        print(
+            "Usage: python -m befehl_client <socket> [args ...]",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    forward(sys.argv[1], argv=sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Benchmark suite for `befehl`.
+
+Run with
+    ```
+    python3 -m benchmarks --help
+    ```
+"""
@@ -0,0 +1,337 @@
+"""
+Benchmark runner.
+
+Measures the hot paths of `befehl` for synthetic command-trees, writes
+results as JSON, and compares them against a stored baseline.
+
+In order to compare results between machines, timings are normalized
+by reference timings that are measured in the same run (see
+`calibrate`): cold starts relative to starting a bare interpreter and
+everything else relative to a fixed pure-Python workload.
+"""
+
+from typing import Callable, Optional
+from pathlib import Path
+from timeit import Timer
+from tempfile import TemporaryDirectory
+import sys
+import os
+import json
+import shlex
+import shutil
+import platform
+import subprocess
+
+from befehl import Cli, Option, Argument, Parser
+
+from .generators import SCENARIOS
+
+
+BASELINE = Path(__file__).parent / "baseline.json"
+HELP_WIDTH = 97
+COMPLETION_REQUESTS = 1000
+
+
+def _time(
+    function: Callable[[], None], repetitions: int, autorange: bool = True
+) -> float:
+    """
+    Returns best time per call of `function` out of `repetitions`
+    (each with as many calls as needed to take at least 0.2 seconds if
+    `autorange`).
+    """
+    timer = Timer(function)
+    number = timer.autorange()[0] if autorange else 1
+    return min(timer.repeat(repeat=repetitions, number=number)) / number
+
+
+def _calibration_workload() -> None:
+    """Fixed pure-Python workload (dictionary and string operations)."""
+    table = {f"--option-{i}": i for i in range(1000)}
+    sorted(name.upper() for name in table if table[name] % 3)
+
+
+def _interpreter_start() -> None:
+    """Starts (and stops) a bare interpreter."""
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+
+def calibrate(repetitions: int) -> dict[str, float]:
+    """
+    Returns reference timings for normalizing results (see
+    `normalize`).
+    """
+    return {
+        "workload": _time(_calibration_workload, repetitions),
+        "interpreter": _time(
+            _interpreter_start, max(repetitions // 2, 1), autorange=False
+        ),
+    }
+
+
+def normalize(
+    results: dict[str, float], calibration: dict[str, float]
+) -> dict[str, float]:
+    """
+    Returns `results` relative to the reference timings in
+    `calibration` (cold starts relative to starting an interpreter and
+    everything else relative to the calibration workload).
+    """
+    return {
+        key: value
+        / calibration[
+            "interpreter" if key.endswith(".cold-start") else "workload"
+        ]
+        for key, value in results.items()
+    }
+
+
+def cold_start(scenario: str, repetitions: int) -> float:
+    """
+    Returns best wall-time for generating, building, and invoking the
+    cli of `scenario` in a new interpreter.
+    """
+    env = os.environ | {
+        "PYTHONPATH": os.pathsep.join(
+            [str(Path(__file__).parent.parent)]
+            + [
+                path
+                for path in os.environ.get("PYTHONPATH", "").split(os.pathsep)
+                # an empty entry would add the working directory
+                if path
+            ]
+        )
+    }
+    env.pop("_BEFEHL_CACHE", None)
+    code = (
+        "from benchmarks.generators import SCENARIOS\n"
+        + f"command, raw = SCENARIOS[{scenario!r}]()\n"
+        + "command.build()(raw)\n"
+    )
+    return _time(
+        lambda: subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True
+        ),
+        repetitions,
+        autorange=False,
+    )
+
+
+def bash_completion(
+    script: str, words: list[str], repetitions: int
+) -> Optional[float]:
+    """
+    Returns best time per completion request for `words` (the last one
+    being completed) with the bash-autocomplete `script` (`None` if bash
+    is not available).
+    """
+    bash = shutil.which("bash")
+    if bash is None:
+        return None
+    function = script.rsplit(" -F ", 1)[1].split()[0]
+    with TemporaryDirectory() as tmp:
+        (Path(tmp) / "completion.sh").write_text(script, encoding="utf-8")
+
+        def run(requests: int) -> float:
+            code = (
+                "source completion.sh\n"
+                + f"COMP_WORDS=({shlex.join(words)})\n"
+                + f"COMP_CWORD={len(words) - 1}\n"
+                + f"for ((n = 0; n < {requests}; n++)); do {function}; "
+                + "done\n"
+            )
+            return _time(
+                lambda: subprocess.run(
+                    [bash, "-c", code], cwd=tmp, check=True
+                ),
+                repetitions,
+                autorange=False,
+            )
+
+        # subtract time for starting bash and sourcing the script
+        return max(run(COMPLETION_REQUESTS) - run(0), 0) / COMPLETION_REQUESTS
+
+
+def run_scenario(scenario: str, repetitions: int) -> dict[str, float]:
+    """Returns results for `scenario`."""
+    command, raw = SCENARIOS[scenario]()
+    cli = None
+
+    def build():
+        nonlocal cli
+        cli = command.build(completion=True, strict=True, cache=False)
+
+    results = {"build": _time(build, repetitions)}
+    target, index = cli.resolve(raw)
+    results["parse"] = _time(lambda: target.parse(raw[index:]), repetitions)
+    results["invoke"] = _time(lambda: cli(raw), repetitions)
+    # pylint: disable=protected-access
+    results["help"] = _time(
+        lambda: target._render_help(HELP_WIDTH), repetitions
+    )
+    results["completion"] = _time(
+        lambda: cli.get_completion_table(command.name), repetitions
+    )
+    bash = bash_completion(
+        cli._render_autocomplete(),
+        [command.name] + raw[:index] + [""],
+        repetitions,
+    )
+    if bash is not None:
+        results["completion-bash"] = bash
+    # build-cache (a cache-hit must not be slower than no cache)
+    with TemporaryDirectory() as tmp:
+        for key, cache in (("", False), ("-cached", tmp)):
+            command.build(cache=cache).resolve(raw)[0].get_help(HELP_WIDTH)
+            results[f"build-invoke{key}"] = _time(
+                lambda cache=cache: command.build(cache=cache)(raw),
+                repetitions,
+            )
+            results[f"build-help{key}"] = _time(
+                lambda cache=cache: command.build(cache=cache)
+                .resolve(raw)[0]
+                .get_help(HELP_WIDTH),
+                repetitions,
+            )
+    results["cold-start"] = cold_start(scenario, max(repetitions // 2, 1))
+    return {f"{scenario}.{k}": v for k, v in results.items()}
+
+
+def compare(
+    results: dict[str, float],
+    baseline: dict,
+    tolerance: Optional[float],
+) -> list[str]:
+    """
+    Prints comparison of `results` and `baseline` and returns list of
+    regressions.
+    """
+    regressions = []
+    tolerances = baseline.get("tolerances", {})
+    print(f"{'benchmark':<28}{'result':>12}{'baseline':>12}{'ratio':>8}")
+    for key, value in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            print(f"{key:<28}{value:>12.4g}{'-':>12}{'-':>8}")
+            continue
+        limit = 1 + (
+            tolerance
+            if tolerance is not None
+            else tolerances.get(
+                key.split(".", 1)[1], tolerances.get("default", 0.5)
+            )
+        )
+        ratio = value / reference if reference else float("inf")
+        print(
+            f"{key:<28}{value:>12.4g}{reference:>12.4g}{ratio:>8.2f}"
+            + ("  REGRESSION" if ratio > limit else "")
+        )
+        if ratio > limit:
+            regressions.append(key)
+    return regressions
+
+
+class BenchmarkCli(Cli):
+    """Benchmark-runner cli."""
+
+    output = Option(
+        ("-o", "--output"),
+        helptext="write results as JSON to this file",
+        nargs=1,
+    )
+    baseline = Option(
+        ("-b", "--baseline"),
+        helptext=(
+            f"baseline for comparison (default '{BASELINE}'); created by "
+            + "--update-baseline if missing"
+        ),
+        nargs=1,
+        parser=lambda data: (True, None, Path(data)),
+    )
+    update = Option(
+        "--update-baseline",
+        helptext="write results into baseline (keeps tolerances)",
+    )
+    tolerance = Option(
+        ("-t", "--tolerance"),
+        helptext=(
+            "allowed relative slowdown compared to the baseline "
+            + "(default: as defined in baseline)"
+        ),
+        nargs=1,
+        parser=Parser.parse_as_float,
+    )
+    repetitions = Option(
+        ("-r", "--repeat"),
+        helptext="number of repetitions per benchmark (default 5)",
+        nargs=1,
+        parser=Parser.parse_as_int,
+    )
+    scenarios = Argument(
+        "scenario",
+        helptext=f"scenarios to run (default all of {', '.join(SCENARIOS)})",
+        nargs=-1,
+        parser=Parser.parse_with_values(SCENARIOS),
+    )
+
+    def run(self, args):
+        baseline_file = args.get(self.baseline, [BASELINE])[0]
+        try:
+            baseline = json.loads(baseline_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            baseline = {}
+
+        repetitions = args.get(self.repetitions, [5])[0]
+        calibration = {}
+        seconds = {}
+        results = {}
+        for scenario in args[self.scenarios] or SCENARIOS:
+            # calibrate per scenario (compensates drift during the run)
+            calibration[scenario] = calibrate(repetitions)
+            scenario_seconds = run_scenario(scenario, repetitions)
+            seconds.update(scenario_seconds)
+            results.update(normalize(scenario_seconds, calibration[scenario]))
+
+        if self.output in args:
+            Path(args[self.output][0]).write_text(
+                json.dumps(
+                    {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "calibration": calibration,
+                        "seconds": seconds,
+                        "results": results,
+                    },
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+
+        if self.update in args:
+            baseline.setdefault(
+                "tolerances", {"default": 0.5, "cold-start": 1.0}
+            )
+            baseline["results"] = baseline.get("results", {}) | results
+            baseline_file.write_text(
+                json.dumps(baseline, indent=2) + "\n", encoding="utf-8"
+            )
+            return
+
+        regressions = compare(
+            results, baseline, args.get(self.tolerance, [None])[0]
+        )
+        if regressions:
+            print(
+                f"Detected {len(regressions)} regression(s).", file=sys.stderr
+            )
+            sys.exit(1)
+
+
+cli = BenchmarkCli(
+    "benchmarks",
+    helptext="Runs benchmarks for befehl and compares against baseline.",
+).build()
+
+
+if __name__ == "__main__":
+    cli()
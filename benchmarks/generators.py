@@ -0,0 +1,127 @@
+"""Generators for synthetic command-trees."""
+
+from befehl import Command, Option, Argument, Parser
+
+
+class _Command(Command):
+    def run(self, args):
+        return
+
+
+def _command_class(name: str, attributes: dict) -> type[Command]:
+    """Returns new `Command`-class with given `attributes`."""
+    return type(name, (_Command,), attributes)
+
+
+def wide(options: int = 2000) -> tuple[Command, list[str]]:
+    """
+    Returns `Command` with many `Option`s (every fourth with a short
+    name) and matching input that uses every tenth `Option`.
+    """
+    attributes = {}
+    short = "abcdefgijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for i in range(options):
+        names = [f"--option-{i}"]
+        if i % 4 == 0 and i // 4 < len(short):
+            names.insert(0, f"-{short[i // 4]}")
+        attributes[f"option_{i}"] = Option(
+            names,
+            helptext=f"Option number {i}. " * 3,
+            nargs=0 if i % 2 else 1,
+        )
+    attributes["arg"] = Argument("arg", nargs=-1)
+    raw = []
+    for i in range(0, options, 10):
+        raw.append(f"--option-{i}")
+        if i % 2 == 0:
+            raw.append(f"value-{i}")
+    raw.extend(["--", "a", "b"])
+    return _command_class("Wide", attributes)("wide"), raw
+
+
+def deep(depth: int = 40, siblings: int = 3) -> tuple[Command, list[str]]:
+    """
+    Returns command-tree of given `depth` (with `siblings` leaves on
+    every level) and input that invokes the deepest `Command`.
+    """
+    command = _command_class(
+        f"Level{depth}",
+        {
+            "option": Option(("-o", "--option"), nargs=1),
+            "arg": Argument("arg", nargs=-1),
+        },
+    )(f"level-{depth}", helptext="Deepest command.")
+    raw = ["-o", "value", "a", "b"]
+    for level in reversed(range(depth)):
+        attributes = {"sub": command}
+        for sibling in range(siblings):
+            attributes[f"sibling_{sibling}"] = _command_class(
+                f"Sibling{level}x{sibling}",
+                {"option": Option(("-o", "--option"), nargs=1)},
+            )(f"sibling-{sibling}", helptext=f"Sibling {sibling}.")
+        attributes["option"] = Option(("-v", "--verbose"))
+        command = _command_class(f"Level{level}", attributes)(
+            f"level-{level}", helptext=f"Command on level {level}."
+        )
+        raw.insert(0, f"level-{level + 1}")
+    return command, raw
+
+
+def argv_heavy(values: int = 100_000) -> tuple[Command, list[str]]:
+    """
+    Returns `Command` with an unlimited `Argument` and input with many
+    values.
+    """
+    return (
+        _command_class(
+            "ArgvHeavy",
+            {
+                "option": Option(("-v", "--verbose")),
+                "arg": Argument(
+                    "arg", nargs=-1, parser=Parser.parse_as_int
+                ),
+            },
+        )("argv-heavy"),
+        ["-v", "--"] + list(map(str, range(values))),
+    )
+
+
+def tree(nodes: int = 1000, branching: int = 10) -> tuple[Command, list[str]]:
+    """
+    Returns command-tree with `nodes` `Command`s in total (every
+    `Command` with `branching` subcommands; filled breadth-first) and
+    input that invokes the last `Command`.
+    """
+    parents = [-1] + [(i - 1) // branching for i in range(1, nodes)]
+    attributes = [
+        {
+            "option": Option(
+                ("-o", "--option"),
+                nargs=1,
+                parser=Parser.parse_with_values(["red", "green", "blue"]),
+            ),
+            "verbose": Option(("-v", "--verbose")),
+        }
+        for _ in range(nodes)
+    ]
+    commands: list[Command] = [None] * nodes
+    for i in reversed(range(nodes)):
+        commands[i] = _command_class(f"Node{i}", attributes[i])(
+            f"node-{i}", helptext=f"Node {i}."
+        )
+        if parents[i] >= 0:
+            attributes[parents[i]][f"sub_{i}"] = commands[i]
+    raw = ["-o", "red"]
+    i = nodes - 1
+    while parents[i] >= 0:
+        raw.insert(0, commands[i].name)
+        i = parents[i]
+    return commands[0], raw
+
+
+SCENARIOS = {
+    "wide": wide,
+    "deep": deep,
+    "argv-heavy": argv_heavy,
+    "tree": tree,
+}
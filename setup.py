@@ -33,6 +33,9 @@ setup(
     packages=[
         "befehl",
     ],
+    py_modules=[
+        "befehl_client",
+    ],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
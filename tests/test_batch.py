@@ -0,0 +1,112 @@
+"""Test module for `batch.py`."""
+
+from unittest import TestCase
+from unittest.mock import patch
+from io import StringIO
+import sys
+import json
+import threading
+
+from befehl import Argument, Option, Command
+
+
+class Cli(Command):
+    """Test-cli that prints its arguments."""
+
+    opt = Option(("-o", "--option"))
+    arg = Argument("arg", nargs=-1)
+
+    def run(self, args):
+        if self.opt in args:
+            raise RuntimeError("failure")
+        print(" ".join(args[self.arg]))
+
+
+class TestBatch(TestCase):
+    """Test batch-execution."""
+
+    def test_shell_format(self):
+        """Test batch with shell-quoted invocations."""
+        results = Cli("test").build().batch(
+            StringIO("a b\n# comment\n\n'c d' e\n--unknown\n-o\nf\n")
+        )
+        self.assertListEqual(
+            [(r.argv, r.status, r.stdout) for r in results],
+            [
+                (["a", "b"], 0, "a b\n"),
+                (["c d", "e"], 0, "c d e\n"),
+                (["--unknown"], 1, ""),
+                (["-o"], 1, ""),
+                (["f"], 0, "f\n"),
+            ],
+        )
+        self.assertIn("Unknown option", results[2].stderr)
+        self.assertIn("RuntimeError", results[3].stderr)
+        self.assertTrue(all(r.duration >= 0 for r in results))
+        self.assertIsNot(sys.stdout, None)
+        self.assertNotIn("ThreadLocal", type(sys.stdout).__name__)
+
+    def test_json_format_workers(self):
+        """Test batch with JSON-invocations and multiple workers."""
+        report = StringIO()
+        invocations = [[str(i), str(i + 1)] for i in range(50)]
+        results = Cli("test").build().batch(
+            StringIO("\n".join(map(json.dumps, invocations))),
+            format_="json",
+            workers=4,
+            report=report,
+        )
+        self.assertListEqual(
+            [r.stdout for r in results],
+            [f"{i} {i + 1}\n" for i in range(50)],
+        )
+        self.assertListEqual(
+            [
+                json.loads(line)["argv"]
+                for line in report.getvalue().splitlines()
+            ],
+            invocations,
+        )
+
+    def test_malformed_lines(self):
+        """Test batch with malformed lines between valid invocations."""
+        for format_, source in (
+            ("shell", "a\n'b\nc\n"),
+            ("json", '["a"]\n["b"\n["c"]\n'),
+            ("json", '["a"]\n{"b": 1}\n["c"]\n'),
+        ):
+            with self.subTest(format_=format_, source=source):
+                results = Cli("test").build().batch(
+                    StringIO(source), format_=format_
+                )
+                self.assertListEqual(
+                    [(r.argv, r.status, r.stdout) for r in results],
+                    [(["a"], 0, "a\n"), ([], 1, ""), (["c"], 0, "c\n")],
+                )
+                self.assertIn("line 2", results[1].stderr)
+                print(results[1].stderr, end="")
+
+    def test_other_threads(self):
+        """Test output of other threads is not captured."""
+        started = threading.Event()
+        done = threading.Event()
+
+        class Blocking(Command):
+            def run(self, args):
+                started.set()
+                done.wait(5)
+                print("inside")
+
+        def write():
+            started.wait(5)
+            print("outside")
+            done.set()
+
+        stdout = StringIO()
+        thread = threading.Thread(target=write)
+        with patch("sys.stdout", stdout):
+            thread.start()
+            results = Blocking("test").build().batch([[]])
+            thread.join(5)
+        self.assertEqual(results[0].stdout, "inside\n")
+        self.assertEqual(stdout.getvalue(), "outside\n")
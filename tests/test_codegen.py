@@ -0,0 +1,247 @@
+"""Test module for `codegen.py`."""
+
+from unittest import TestCase
+from unittest.mock import patch
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from io import StringIO
+import sys
+import importlib
+
+from befehl import Command, Option, Argument, LazyCommand, CliExit
+from befehl.compiled import get_help_width
+from befehl.codegen import generate
+
+
+class TestCodegen(TestCase):
+    """Test `codegen.generate`."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.modules = ("befehl_test_codegen_cli", "befehl_test_codegen_gen")
+        (Path(self.tmp.name) / f"{self.modules[0]}.py").write_text(
+            """import asyncio
+
+from befehl import Command, Option, Argument, Parser
+
+class Subcommand(Command):
+    pair = Option(("-p", "--pair"), nargs=2, strict=True)
+    flag = Option("-f", nargs=0)
+    nums = Argument("nums", nargs=2, parser=Parser.parse_as_int)
+
+    def validate(self, args):
+        if self.flag in args and self.pair in args:
+            return False, "bad combination"
+        return True, ""
+
+    def run(self, args):
+        return "sub", args
+
+class Cli(Command):
+    sub = Subcommand("sub", helptext="subcommand")
+    verbose = Option(("-v", "--verbose"), nargs=0)
+    quiet = Option(("-q", "--quiet"), nargs=0)
+    num = Option(
+        ("-n", "--num"), nargs=1, parser=Parser.parse_as_int, workers=2
+    )
+    many = Option("--many", nargs=-1)
+    count = Option("-c", nargs=1, parser=Parser.parse_as_int)
+    arg = Argument("arg", parser=Parser.parse_with_values(("a", "b")))
+
+    def run(self, args):
+        return "cli", args
+
+loops = []
+
+def loop_factory():
+    loops.append(asyncio.new_event_loop())
+    return loops[-1]
+
+class AsyncCli(Command):
+    async def run(self, args):
+        return asyncio.get_running_loop()
+""",
+            encoding="utf-8",
+        )
+        sys.path.insert(0, self.tmp.name)
+        self.cli_module = importlib.import_module(self.modules[0])
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        for module in self.modules:
+            sys.modules.pop(module, None)
+        self.tmp.cleanup()
+
+    def _generate(self, command=None, **kwargs):
+        """Returns generated module (imported without validation)."""
+        (Path(self.tmp.name) / f"{self.modules[1]}.py").write_text(
+            generate(
+                command or self.cli_module.Cli("test", helptext="a cli"),
+                **kwargs,
+            ),
+            encoding="utf-8",
+        )
+        sys.modules.pop(self.modules[1], None)
+        with patch.object(
+            Command, "_validate_options", side_effect=RuntimeError
+        ):
+            return importlib.import_module(self.modules[1])
+
+    @staticmethod
+    def _run(function, raw):
+        """Returns result or exception-details of `function(raw)`."""
+        try:
+            command, args = function(raw)
+        except CliExit as exc_info:
+            return (
+                type(exc_info),
+                exc_info.message,
+                exc_info.command,
+                getattr(getattr(exc_info, "target", None), "name", None),
+                getattr(exc_info, "value", None),
+            )
+        if isinstance(command, Command):
+            command = type(command).__name__
+        return command, {
+            getattr(key, "name", None) or key.names: value
+            for key, value in args.items()
+        }
+
+    def test_equivalence(self):
+        """Test generated module behaves like `CompiledCommand`."""
+        generated = self._generate()
+        cli = self.cli_module.Cli("test", helptext="a cli").build()
+
+        for raw in (
+            ["a"],
+            ["-vq", "b"],
+            ["-v", "-n", "1", "--num=2", "-n", "3", "a"],
+            ["--many", "x", "y", "--", "a"],
+            ["-n", "x", "a"],
+            ["-n", "x", "-c", "y", "a"],
+            ["-"],
+            ["--many", "-", "a"],
+            ["-n"],
+            ["c"],
+            ["a", "b"],
+            ["a", "-v"],
+            ["-x"],
+            ["-vx"],
+            ["-v=1"],
+            [],
+            ["sub", "1", "2"],
+            ["sub", "1", "2", "3", "4"],
+            ["sub", "1"],
+            ["sub", "x", "2"],
+            ["sub", "-p", "1", "1", "2"],
+            ["sub", "-p", "1", "2", "-p", "3", "4", "5", "6"],
+            ["sub", "-fp", "1", "2"],
+            ["sub", "-f", "-p", "1", "2", "3", "4"],
+            ["sub", "--", "-1", "2"],
+            ["sub", "sub", "1", "2"],
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(
+                    self._run(generated.parse, raw),
+                    self._run(
+                        lambda r: (
+                            cli.resolve(r)[0].command,
+                            cli.resolve(r)[0].parse(r[cli.resolve(r)[1] :]),
+                        ),
+                        raw,
+                    ),
+                )
+                self.assertEqual(
+                    self._run(generated.invoke, raw),
+                    self._run(cli.invoke, raw),
+                )
+
+    def test_help(self):
+        """Test help and autocomplete of generated module."""
+        cli = self.cli_module.Cli("test", helptext="a cli").build(
+            completion=True
+        )
+
+        with self.subTest(case="pre-rendered"):
+            generated = self._generate(
+                completion=True, help_widths=(get_help_width(),)
+            )
+            for raw in (["-h"], ["sub", "--help"]):
+                expected = self._run(cli.invoke, raw)
+                with patch.object(
+                    Command, "build", side_effect=RuntimeError
+                ):
+                    self.assertEqual(
+                        self._run(generated.parse, raw), expected
+                    )
+
+        with self.subTest(case="fallback"):
+            generated = self._generate(completion=True)
+            for raw in (["sub", "-h"], ["--generate-autocomplete"]):
+                self.assertEqual(
+                    self._run(generated.parse, raw),
+                    self._run(cli.invoke, raw),
+                )
+
+        with self.subTest(case="main"):
+            stdout = StringIO()
+            with patch("sys.stdout", stdout):
+                with self.assertRaises(SystemExit) as exc_info:
+                    generated.main(["--help"])
+            self.assertEqual(exc_info.exception.code, 0)
+            self.assertIn("Usage", stdout.getvalue())
+
+    def test_loop_factory(self):
+        """Test generated module uses `loop_factory`."""
+        command = self.cli_module.AsyncCli("test")
+
+        with self.subTest(case="default"):
+            self.assertIsNotNone(self._generate(command).invoke([]))
+            self.assertListEqual(self.cli_module.loops, [])
+
+        with self.subTest(case="custom"):
+            generated = self._generate(
+                command, loop_factory=self.cli_module.loop_factory
+            )
+            self.assertIs(generated.invoke([]), self.cli_module.loops[0])
+
+        with self.subTest(case="not importable"):
+            with self.assertRaises(ValueError) as exc_info:
+                generate(command, loop_factory=lambda: None)
+            print(exc_info.exception)
+
+    def test_unsupported(self):
+        """Test unsupported command-trees."""
+
+        class Cli(Command):
+            sub = LazyCommand("sub", f"{self.modules[0]}:Subcommand")
+
+            def run(self, args):
+                return
+
+        class Cli2(Command):
+            opt = Option("-o")
+            opt2 = Option("-o")
+
+            def run(self, args):
+                return
+
+        class Cli3(Command):
+            arg = Argument("arg", nargs=-1, stream=True)
+
+            def run(self, args):
+                return
+
+        for command in (Cli("test"), Cli2("test"), Cli3("test")):
+            with self.subTest(command=command):
+                with self.assertRaises(ValueError) as exc_info:
+                    generate(command)
+                print(exc_info.exception)
+
+        with self.subTest(case="lazy"):
+            with self.assertRaises(ValueError) as exc_info:
+                self.cli_module.Cli.lazy = LazyCommand(
+                    "lazy", f"{self.modules[0]}:Subcommand"
+                )
+                generate(self.cli_module.Cli("test"))
+            print(exc_info.exception)
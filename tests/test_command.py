@@ -1,8 +1,37 @@
 """Test module for `command.py`."""
 
-from unittest import TestCase
-
-from befehl import Argument, Option, Command
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+import shlex
+import shutil
+import subprocess
+import asyncio
+import threading
+import tracemalloc
+from array import array
+
+from befehl import (
+    Parser,
+    Argument,
+    Option,
+    Command,
+    CompiledCommand,
+    LazyCommand,
+    CliExit,
+    ParseError,
+    ValidationError,
+    BuildError,
+    trace,
+)
+from befehl.response_file import READERS
+from befehl import cache as build_cache
 
 
 class _TestCommand(Command):
@@ -150,6 +179,32 @@ class TestCommandBuild(TestCase):
 
             _("test").build()
 
+    def test_subcommand_lazy(self):
+        """Test subcommands are validated on first use unless strict."""
+
+        class Subcommand(_TestCommand):
+            o = Option("test")
+
+        with self.subTest(case="lazy"):
+
+            class _(_TestCommand):
+                c = Subcommand("sub")
+
+            cli = _("test").build()
+            cli([])
+            with self.assertRaises(ValueError) as exc_info:
+                cli(["sub"])
+            print(exc_info.exception)
+
+        with self.subTest(case="strict"):
+
+            class _(_TestCommand):
+                c = Subcommand("sub")
+
+            with self.assertRaises(ValueError) as exc_info:
+                _("test").build(strict=True)
+            print(exc_info.exception)
+
     def test_subcommand_whitespace(self):
         """Test subcommand whitespace."""
         with self.subTest(case="space"):
@@ -284,6 +339,63 @@ class TestCommandBuild(TestCase):
 
             _("test").build()
 
+    def test_collect_errors(self):
+        """Test reporting all violations in command-tree."""
+
+        class Subcommand(_TestCommand):
+            opt0 = Option("-ab")
+            opt1 = Option("--opt=")
+            arg0 = Argument("arg0", nargs=-1)
+            arg1 = Argument("arg1")
+
+        class Cli(_TestCommand):
+            sub = Subcommand("sub")
+            lazy = LazyCommand("lazy", "befehl_missing_module:Command")
+            bad = _TestCommand("-bad")
+            opt0 = Option("--opt")
+            opt1 = Option("--opt")
+
+        with self.subTest(case="first only"):
+            with self.assertRaises(ValueError) as exc_info:
+                Cli("test").build(strict=True)
+            print(exc_info.exception)
+            self.assertNotIsInstance(exc_info.exception, BuildError)
+
+        with self.subTest(case="all"):
+            with self.assertRaises(BuildError) as exc_info:
+                Cli("test").build(collect_errors=True)
+            print(exc_info.exception)
+            self.assertEqual(len(exc_info.exception.errors), 6)
+            for part in [
+                "Ambiguous name '--opt'",
+                "Bad subcommand '-bad'",
+                "Unable to import target 'befehl_missing_module:Command'",
+                "Bad option '-ab' in command 'test sub'",
+                "Bad option '--opt=' in command 'test sub'",
+                "Bad argument 'arg0' in command 'test sub'",
+            ]:
+                self.assertIn(part, str(exc_info.exception))
+
+        with self.subTest(case="valid"):
+
+            class Valid(_TestCommand):
+                sub = _TestCommand("sub")
+                opt = Option("--opt")
+
+            Valid("test").build(collect_errors=True)
+
+        with self.subTest(case="many options"):
+            options = {
+                f"opt{i}": Option((f"--flag-{i}", f"--feature-{i}"))
+                for i in range(10000)
+            }
+            options["bad0"] = Option("--flag-0")
+            options["bad1"] = Option("-flag")
+            cli = type("Wide", (_TestCommand,), options)("test")
+            with self.assertRaises(BuildError) as exc_info:
+                cli.build(collect_errors=True)
+            self.assertEqual(len(exc_info.exception.errors), 2)
+
 
 class TestCommandRun(TestCase):
     """Test running `Command`."""
@@ -441,6 +553,19 @@ class TestCommandRun(TestCase):
             cli(["-a"])
         self.assertFalse(base_cmd.ran)
 
+    def test_option_dash(self):
+        """Test lone '-' as value."""
+
+        class Cli(self.MirrorCommand):
+            opt = Option("-o", nargs=1)
+            arg = Argument("arg", nargs=-1)
+
+        base_cmd = Cli("test")
+        cli = base_cmd.build()
+        cli(["-o", "-", "-", "a"])
+        self.assertListEqual(base_cmd.mirror[Cli.opt], ["-"])
+        self.assertListEqual(base_cmd.mirror[Cli.arg], ["-", "a"])
+
     def test_option_equal(self):
         """Test option with value containing '='."""
 
@@ -471,6 +596,76 @@ class TestCommandRun(TestCase):
             self.assertTrue(base_cmd.ran)
             self.assertDictEqual(base_cmd.mirror, {Cli.opt: ["--value"]})
 
+        with self.subTest(case="valid equal separator value"):
+            base_cmd.ran = False
+            cli(["--option=--"])
+            self.assertTrue(base_cmd.ran)
+            self.assertDictEqual(base_cmd.mirror, {Cli.opt: ["--"]})
+
+    def test_option_abbreviations(self):
+        """Test abbreviated long options."""
+
+        class Cli(self.MirrorCommand):
+            verbose = Option(("-v", "--verbose", "--verbosity"), nargs=0)
+            version = Option("--version", nargs=0)
+            output = Option("--output", nargs=1)
+            out = Option("--out", nargs=1)
+
+        base_cmd = Cli("test")
+
+        with self.subTest(case="disabled"):
+            with self.assertRaises(ParseError) as exc_info:
+                base_cmd.build().parse(["--verbo"])
+            print(exc_info.exception)
+            self.assertIn("Unknown option", exc_info.exception.message)
+
+        cli = base_cmd.build(abbreviations=True)
+
+        for raw, expected in [
+            (["--verbo"], {Cli.verbose: []}),
+            (["--verbos"], {Cli.verbose: []}),
+            (["--versi"], {Cli.version: []}),
+            (["--outp", "a"], {Cli.output: ["a"]}),
+            (["--outp=a"], {Cli.output: ["a"]}),
+            (["--out", "a"], {Cli.out: ["a"]}),
+            (["--out=a"], {Cli.out: ["a"]}),
+        ]:
+            with self.subTest(case="unique", raw=raw):
+                self.assertDictEqual(cli.parse(raw), expected)
+
+        for raw, candidates in [
+            (["--ver"], "'--verbose', '--verbosity', '--version'"),
+            (["--ou=a"], "'--out', '--output'"),
+        ]:
+            with self.subTest(case="ambiguous", raw=raw):
+                with self.assertRaises(ParseError) as exc_info:
+                    cli.parse(raw)
+                print(exc_info.exception)
+                self.assertIn(candidates, exc_info.exception.message)
+
+        for raw in (["--x"], ["--verbosely"], ["--=a"]):
+            with self.subTest(case="unknown", raw=raw):
+                with self.assertRaises(ParseError) as exc_info:
+                    cli.parse(raw)
+                print(exc_info.exception)
+                self.assertIn("Unknown option", exc_info.exception.message)
+
+        with self.subTest(case="many options"):
+
+            class Wide(self.MirrorCommand):
+                pass
+
+            for i in range(1500):
+                setattr(Wide, f"opt{i}", Option(f"--option-{i:04d}-x"))
+
+            wide = Wide("test").build(abbreviations=True)
+            self.assertDictEqual(
+                wide.parse(["--option-0123"]), {Wide.opt123: []}
+            )
+            with self.assertRaises(ParseError) as exc_info:
+                wide.parse(["--option-149"])
+            self.assertIn("'--option-1499-x'", exc_info.exception.message)
+
     def test_option_groups(self):
         """Test option groups."""
 
@@ -590,6 +785,309 @@ class TestCommandRun(TestCase):
             self.assertTrue(base_cmd.ran)
             self.assertEqual(len(base_cmd.mirror.get(Cli.arg, [])), 2)
 
+    def test_argument_infinite_order(self):
+        """Test argument infinite keeps order of values."""
+
+        class Cli(self.MirrorCommand):
+            opt = Option("-o", nargs=-1)
+            arg = Argument("arg", nargs=-1)
+
+        base_cmd = Cli("test")
+        cli = base_cmd.build()
+
+        cli(["-o", "c", "b", "--", "a", "c", "b"])
+        self.assertTrue(base_cmd.ran)
+        self.assertListEqual(base_cmd.mirror[Cli.opt], ["c", "b"])
+        self.assertListEqual(base_cmd.mirror[Cli.arg], ["a", "c", "b"])
+
+    def test_argument_workers(self):
+        """Test parsing with thread pool."""
+        threads = set()
+
+        def parser(data):
+            threads.add(threading.get_ident())
+            time.sleep(0.01 if data != "b" else 0.05)
+            return data not in ("b", "d"), f"bad value '{data}'", data.upper()
+
+        class Cli(self.MirrorCommand):
+            opt = Option("-o", nargs=-1, parser=parser, workers=4)
+            arg = Argument("arg", nargs=-1, parser=parser, workers=4)
+
+        base_cmd = Cli("test")
+        cli = base_cmd.build()
+
+        with self.subTest(case="order"):
+            values = [f"v{i}" for i in range(100)]
+            cli.invoke(["-o", "x", "y", "--"] + values)
+            self.assertListEqual(base_cmd.mirror[Cli.opt], ["X", "Y"])
+            self.assertListEqual(
+                base_cmd.mirror[Cli.arg], [v.upper() for v in values]
+            )
+            self.assertGreater(len(threads), 1)
+
+        with self.subTest(case="first error"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke(["a", "b", "c", "d"])
+            print(exc_info.exception)
+            self.assertEqual(exc_info.exception.value, "b")
+
+        with self.subTest(case="first error across options"):
+
+            class Cli2(self.MirrorCommand):
+                n = Option(
+                    "-n", nargs=-1, parser=Parser.parse_as_int, workers=2
+                )
+                a = Option("-a", nargs=-1, parser=Parser.parse_as_array("q"))
+                m = Option("-m", nargs=1, parser=Parser.parse_as_int)
+
+            cli2 = Cli2("test").build()
+            for raw, expected in (
+                (["-n", "x", "-m", "y"], "x"),
+                (["-a", "x", "-m", "y"], "x"),
+                (["-m", "y", "-n", "x"], "y"),
+                (["-m", "1", "-a", "1", "-n", "x", "-a", "y"], "x"),
+            ):
+                with self.assertRaises(ParseError) as exc_info:
+                    cli2.parse(raw)
+                self.assertEqual(exc_info.exception.value, expected, raw)
+
+        with self.subTest(case="parsed once on error"):
+            calls = []
+
+            def counting_parser(data):
+                calls.append(data)
+                return parser(data)
+
+            class Cli3(self.MirrorCommand):
+                opt = Option(
+                    "-o", nargs=-1, parser=counting_parser, workers=4
+                )
+                m = Option("-m", nargs=1, parser=Parser.parse_as_int)
+
+            cli3 = Cli3("test").build()
+            with self.assertRaises(ParseError) as exc_info:
+                cli3.parse(["-o", "a", "b", "c", "-m", "x"])
+            self.assertEqual(exc_info.exception.value, "b")
+            self.assertEqual(exc_info.exception.index, 1)
+            self.assertListEqual(sorted(calls), ["a", "b", "c"])
+
+        with self.subTest(case="bulk-version of path-parser"):
+            checking = set()
+            barrier = threading.Barrier(2, timeout=5)
+            stat = os.stat
+
+            def stat_in_thread(*args, **kwargs):
+                if threading.get_ident() not in checking:
+                    checking.add(threading.get_ident())
+                    try:
+                        # wait for another thread to check as well
+                        barrier.wait()
+                    except threading.BrokenBarrierError:
+                        pass
+                return stat(*args, **kwargs)
+
+            class Cli4(self.MirrorCommand):
+                arg = Argument(
+                    "arg", nargs=-1, parser=Parser.parse_as_file, workers=4
+                )
+
+            base_cmd4 = Cli4("test")
+            cli4 = base_cmd4.build()
+            with TemporaryDirectory() as tmp:
+                values = []
+                for i in range(4):
+                    (Path(tmp) / str(i)).mkdir()
+                    values.append(str(Path(tmp) / str(i) / "file"))
+                    Path(values[-1]).touch()
+                with patch("befehl.paths.os.stat", stat_in_thread):
+                    cli4.invoke(values)
+            self.assertListEqual(
+                list(map(str, base_cmd4.mirror[Cli4.arg])), values
+            )
+            self.assertGreater(len(checking), 1)
+
+        with self.subTest(case="bad workers"):
+            with self.assertRaises(ValueError) as exc_info:
+                Argument("arg", workers=0)
+            print(exc_info.exception)
+
+    def test_argument_bulk(self):
+        """Test parsing with bulk-version of parser."""
+        calls = []
+
+        def parser(data):
+            return True, None, data
+
+        def bulk(data):
+            calls.append(list(data))
+            return [(v != "b", f"bad value '{v}'", v.upper()) for v in data]
+
+        parser.bulk = bulk
+
+        class Cli(self.MirrorCommand):
+            arg = Argument("arg", nargs=-1, parser=parser)
+
+        base_cmd = Cli("test")
+        cli = base_cmd.build()
+
+        cli.invoke(["a", "c"])
+        self.assertListEqual(base_cmd.mirror[Cli.arg], ["A", "C"])
+        self.assertListEqual(calls, [["a", "c"]])
+
+        with self.assertRaises(ParseError) as exc_info:
+            cli.invoke(["a", "b", "c"])
+        self.assertEqual(exc_info.exception.value, "b")
+
+    def test_array(self):
+        """Test parsing many numeric values into an array."""
+
+        class Cli(self.MirrorCommand):
+            opt = Option(
+                ("-o", "--option"),
+                nargs=-1,
+                parser=Parser.parse_as_array("q"),
+            )
+            arg = Argument(
+                "arg", nargs=-1, parser=Parser.parse_as_array("d")
+            )
+
+        base_cmd = Cli("test")
+        cli = base_cmd.build()
+
+        with self.subTest(case="valid"):
+            cli.invoke(["-o", "1", "2", "--", "1.5", "2", "-3e2"])
+            self.assertEqual(base_cmd.mirror[Cli.opt], array("q", [1, 2]))
+            self.assertEqual(
+                base_cmd.mirror[Cli.arg], array("d", [1.5, 2, -300])
+            )
+            cli.invoke(["-o", "1", "--"])
+            self.assertEqual(base_cmd.mirror[Cli.arg], array("d"))
+
+        with self.subTest(case="first bad value"):
+            for raw, target, value in (
+                (["1", "a", "b"], Cli.arg, "a"),
+                (["-o", "1", "x", "y"], Cli.opt, "x"),
+                (["-o", str(2**63)], Cli.opt, str(2**63)),
+            ):
+                with self.assertRaises(ParseError) as exc_info:
+                    cli.invoke(raw)
+                print(exc_info.exception)
+                self.assertIs(exc_info.exception.target, target)
+                self.assertEqual(exc_info.exception.value, value)
+
+        with self.subTest(case="memory"):
+            values = [str(i / 3) for i in range(100_000)]
+            tracemalloc.start()
+            try:
+                cli.invoke(values)
+                size, _ = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            # about 8 B per value (list of floats: 32 B)
+            self.assertEqual(len(base_cmd.mirror[Cli.arg]), len(values))
+            self.assertLess(size, 10 * len(values))
+
+    def test_argument_stream(self):
+        """Test streaming argument."""
+        parsed = []
+
+        def parser(data):
+            parsed.append(data)
+            return data != "bad", f"bad value '{data}'", data.upper()
+
+        class Cli(Command):
+            arg = Argument("arg", nargs=-1, parser=parser, stream=True)
+
+            def run(self, args):
+                values = args[self.arg]
+                first = next(values)
+                # values are only parsed on demand
+                if len(parsed) != 1:
+                    raise AssertionError(f"Parsed too early: {parsed}")
+                return [first] + list(values)
+
+        cli = Cli("test").build()
+
+        with TemporaryDirectory() as tmp:
+            (Path(tmp) / "lines").write_text("d\ne\n", encoding="utf-8")
+            (Path(tmp) / "nul").write_text("f\ng\0h", encoding="utf-8")
+
+            with self.subTest(case="sources"):
+                with patch("sys.stdin", StringIO("b\nc\n")):
+                    self.assertListEqual(
+                        cli.invoke(
+                            [
+                                "--files-from",
+                                str(Path(tmp) / "lines"),
+                                "--",
+                                "a",
+                                "-",
+                            ]
+                        ),
+                        ["A", "B", "C", "D", "E"],
+                    )
+
+            with self.subTest(case="stdin without separator"):
+                parsed.clear()
+                with patch("sys.stdin", StringIO("b\nc\n")):
+                    self.assertListEqual(
+                        cli.invoke(["a", "-"]), ["A", "B", "C"]
+                    )
+
+            with self.subTest(case="nul"):
+                parsed.clear()
+                self.assertListEqual(
+                    cli.invoke(["-0", "--files-from", str(Path(tmp) / "nul")]),
+                    ["F\nG", "H"],
+                )
+
+            with self.subTest(case="repeated files-from"):
+                with self.assertRaises(ParseError) as exc_info:
+                    cli.invoke(
+                        ["--files-from", str(Path(tmp) / "lines")] * 2
+                    )
+                print(exc_info.exception)
+                self.assertEqual(
+                    exc_info.exception.target.names, ("--files-from",)
+                )
+
+        with self.subTest(case="error"):
+            parsed.clear()
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke(["a", "bad"])
+            self.assertEqual(exc_info.exception.value, "bad")
+
+        with self.subTest(case="bad nargs"):
+            with self.assertRaises(ValueError) as exc_info:
+                Argument("arg", stream=True)
+            print(exc_info.exception)
+
+        with self.subTest(case="options only for streaming arguments"):
+
+            class Plain(Command):
+                files_from = Option("--files-from", nargs=1)
+                arg = Argument("arg", nargs=-1)
+
+                def run(self, args):
+                    return args[self.files_from], args[self.arg]
+
+            plain = Plain("test").build()
+            self.assertEqual(
+                plain.invoke(["--files-from", "x", "y"]), (["x"], ["y"])
+            )
+            with self.assertRaises(ParseError):
+                plain.invoke(["-0"])
+
+        with self.subTest(case="clash with generated options"):
+
+            class Clash(Command):
+                null = Option("--null")
+                arg = Argument("arg", nargs=-1, stream=True)
+
+            with self.assertRaises(ValueError) as exc_info:
+                Clash("test").build()
+            print(exc_info.exception)
+
     def test_argument_unexpected_option(self):
         """Test argument unexpected option."""
 
@@ -659,3 +1157,842 @@ class TestCommandRun(TestCase):
         with self.subTest(case="autocomplete"):
             with self.assertRaises(SystemExit):
                 cli(["--generate-autocomplete"])
+
+    def test_autocomplete_values(self):
+        """Test autocomplete for values of options and arguments."""
+
+        class Cli(self.MirrorCommand):
+            opt = Option(
+                ("-l", "--level"),
+                nargs=1,
+                parser=Parser.parse_with_values(["debug", "info", "a b"]),
+            )
+            flag = Option("--flag", nargs=0)
+            arg = Argument(
+                "mode", parser=Parser.parse_with_values(["start", "stop"])
+            )
+
+        cli = Cli("test").build(completion=True)
+        with self.assertRaises(CliExit) as exc_info:
+            cli.invoke(["--generate-autocomplete"])
+        script = exc_info.exception.message
+        print(script)
+
+        self.assertEqual(Cli.opt.values, ("debug", "info", "a b"))
+        self.assertIsNone(Cli.flag.values)
+        words, values = cli.get_completion_table("test")
+        self.assertIn("start stop", words["test"])
+        self.assertDictEqual(
+            values,
+            {"test -l": "debug info", "test --level": "debug info"},
+        )
+        self.assertIn("['test --level']='debug info'", script)
+
+    @skipIf(shutil.which("bash") is None, "requires bash")
+    def test_autocomplete_bash(self):
+        """Test autocomplete-script in bash."""
+
+        class Subcommand(self.MirrorCommand):
+            opt = Option(
+                ("-f", "--format"),
+                nargs=1,
+                parser=Parser.parse_with_values(["json", "yaml"]),
+            )
+
+        class Cli(self.MirrorCommand):
+            sub = Subcommand("sub")
+            lazy = LazyCommand("lazy", "not.imported:Command")
+            flag = Option("--flag", nargs=0)
+
+        cli = Cli("my-cli").build(completion=True)
+        with self.assertRaises(CliExit) as exc_info:
+            cli.invoke(["--generate-autocomplete"])
+        script = exc_info.exception.message
+
+        with TemporaryDirectory() as tmp:
+            for words, expected in [
+                (["my-cli", ""], ["--flag", "--help", "-h", "lazy", "sub"]),
+                (["my-cli", "--f"], ["--flag"]),
+                (["my-cli", "sub", ""], ["--format", "--help", "-f", "-h"]),
+                (["my-cli", "sub", "-f", ""], ["json", "yaml"]),
+                (["my-cli", "sub", "--format", "j"], ["json"]),
+                (["my-cli", "lazy", ""], []),
+                (
+                    ["my-cli", "other", "sub", "-f", ""],
+                    ["--flag", "--help", "-h", "lazy", "sub"],
+                ),
+            ]:
+                with self.subTest(words=words):
+                    result = subprocess.run(
+                        [
+                            "bash",
+                            "-c",
+                            script
+                            + f"COMP_WORDS=({shlex.join(words)})\n"
+                            + f"COMP_CWORD={len(words) - 1}\n"
+                            + "_MY-CLI-completion\n"
+                            + 'printf "%s\\n" "${COMPREPLY[@]}"',
+                        ],
+                        cwd=tmp,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    )
+                    self.assertListEqual(
+                        sorted(result.stdout.split()), expected
+                    )
+
+
+class TestCompiledCommand(TestCase):
+    """Test `CompiledCommand`."""
+
+    class EchoCommand(Command):
+        """Stub for `Command` that returns input on run."""
+
+        opt = Option(("-o", "--option"), nargs=1, parser=Parser.parse_as_int)
+        arg = Argument("arg", nargs=-1)
+
+        def validate(self, args):
+            if args[self.arg] == ["invalid"]:
+                return False, "Not valid"
+            return True, None
+
+        def run(self, args):
+            return args.get(self.opt), args[self.arg]
+
+    def get_cli_class(self) -> type[Command]:
+        """Returns `Command`-class with subcommand 'sub'."""
+
+        class Cli(self.EchoCommand):
+            sub = self.EchoCommand("sub")
+            opt = self.EchoCommand.opt
+            arg = self.EchoCommand.arg
+
+        return Cli
+
+    def test_rebuild(self):
+        """Test building the same `Command` repeatedly."""
+
+        base_cmd = self.get_cli_class()("test")
+        cli0 = base_cmd.build()
+        cli1 = base_cmd.build(strict=True)
+        for cli in (cli0, cli1):
+            self.assertEqual(cli.invoke(["a", "b"]), (None, ["a", "b"]))
+            self.assertEqual(cli.invoke(["sub", "c"]), (None, ["c"]))
+
+    def test_exceptions(self):
+        """Test exceptions raised by `invoke`."""
+
+        cli = self.get_cli_class()("test").build()
+
+        with self.subTest(case="parser"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke(["sub", "-o", "a"])
+            print(exc_info.exception)
+            self.assertIs(exc_info.exception.target, self.EchoCommand.opt)
+            self.assertEqual(exc_info.exception.value, "a")
+            self.assertEqual(exc_info.exception.command, "test sub")
+            self.assertEqual(exc_info.exception.exit_code, 1)
+
+        with self.subTest(case="syntax"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke(["--unknown"])
+            print(exc_info.exception)
+            self.assertEqual(exc_info.exception.value, "--unknown")
+            self.assertEqual(exc_info.exception.command, "test")
+
+        with self.subTest(case="validation"):
+            with self.assertRaises(ValidationError) as exc_info:
+                cli.invoke(["invalid"])
+            self.assertEqual(exc_info.exception.message, "Not valid")
+
+        with self.subTest(case="help"):
+            with self.assertRaises(CliExit) as exc_info:
+                cli.invoke(["sub", "--help"])
+            self.assertNotIsInstance(exc_info.exception, ParseError)
+            self.assertEqual(exc_info.exception.exit_code, 0)
+            self.assertIn("Usage", exc_info.exception.message)
+
+        with self.subTest(case="entry-point"):
+            with self.assertRaises(SystemExit) as exc_info:
+                cli(["-o", "a"])
+            self.assertEqual(exc_info.exception.code, 1)
+
+    def test_concurrent(self):
+        """Test invoking from multiple threads at once."""
+
+        cli = self.get_cli_class()("test").build()
+        inputs = [
+            (["sub"] if i % 2 else []) + ["-o", str(i), "a", str(i)]
+            for i in range(1000)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(cli.invoke, inputs))
+        self.assertListEqual(
+            results, [([i], ["a", str(i)]) for i in range(1000)]
+        )
+
+    def test_help(self):
+        """Test rendering and caching help."""
+
+        cli = self.get_cli_class()("test", helptext="word " * 5000).build()
+
+        with self.subTest(case="wrapping"):
+            text = cli.get_help(40)
+            self.assertTrue(all(len(line) < 40 for line in text.split("\n")))
+            self.assertEqual(text.count("word"), 5000)
+
+        with self.subTest(case="cached per width"):
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                self.assertIs(cli.get_help(40), text)
+                with self.assertRaises(RuntimeError):
+                    cli.get_help(41)
+
+        with self.subTest(case="prerender"):
+            cli = self.get_cli_class()("test").build(help_widths=(40, 80))
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                for width in (40, 80):
+                    cli.get_help(width)
+                    cli.resolve(["sub"])[0].get_help(width)
+            self.assertEqual(cli.prerender_help((40, 80, 100)), 2)
+
+
+class TestAsync(TestCase):
+    """Test coroutine support in `CompiledCommand`."""
+
+    def test_run_validate(self):
+        """Test coroutine `run` and `validate`."""
+
+        class Cli(Command):
+            arg = Argument("arg")
+
+            async def validate(self, args):
+                await asyncio.sleep(0)
+                return args[self.arg] == ["ok"], "Not valid"
+
+            async def run(self, args):
+                await asyncio.sleep(0)
+                return args[self.arg]
+
+        cli = Cli("test").build()
+        self.assertEqual(cli.invoke(["ok"]), ["ok"])
+        with self.assertRaises(ValidationError):
+            cli.invoke(["not-ok"])
+        self.assertEqual(asyncio.run(cli.ainvoke(["ok"])), ["ok"])
+
+    def test_parser(self):
+        """Test concurrent coroutine parsers in a single event loop."""
+        loops = set()
+        active = [0, 0]  # current and maximum number of active parsers
+
+        async def parser(data):
+            loops.add(asyncio.get_running_loop())
+            active[0] += 1
+            active[1] = max(active)
+            await asyncio.sleep(0.05 if data != "b" else 0.1)
+            active[0] -= 1
+            return data not in ("b", "d"), f"bad value '{data}'", data.upper()
+
+        class Cli(Command):
+            opt = Option("-o", nargs=-1, parser=parser)
+            arg = Argument("arg", nargs=-1, parser=parser)
+
+            def run(self, args):
+                loops.add(asyncio.get_running_loop())
+                return args[self.opt], args[self.arg]
+
+        factory_calls = []
+
+        def loop_factory():
+            factory_calls.append(None)
+            return asyncio.new_event_loop()
+
+        cli = Cli("test").build(loop_factory=loop_factory)
+
+        with self.subTest(case="concurrent"):
+            values = [f"v{i}" for i in range(500)]
+            result = cli.invoke(["-o", "x", "y", "--"] + values)
+            # all values are awaited at the same time
+            self.assertEqual(active[1], len(values) + 2)
+            self.assertEqual(
+                result, (["X", "Y"], [v.upper() for v in values])
+            )
+            self.assertEqual(len(loops), 1)
+            self.assertEqual(len(factory_calls), 1)
+
+        with self.subTest(case="first error"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke(["a", "b", "c", "d"])
+            print(exc_info.exception)
+            self.assertEqual(exc_info.exception.value, "b")
+            self.assertIs(exc_info.exception.target, Cli.arg)
+
+        with self.subTest(case="parse"):
+            self.assertEqual(cli.parse(["-o", "x"])[Cli.opt], ["X"])
+
+
+class TestResponseFile(TestCase):
+    """Test response-file expansion."""
+
+    class EchoCommand(Command):
+        """Stub for `Command` that returns input on run."""
+
+        opt = Option(("-o", "--option"), nargs=1)
+        arg = Argument("arg", nargs=-1)
+
+        def run(self, args):
+            return args.get(self.opt), args[self.arg]
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_modes(self):
+        """Test response-file formats."""
+
+        class Cli(self.EchoCommand):
+            sub = self.EchoCommand("sub")
+            opt = self.EchoCommand.opt
+            arg = self.EchoCommand.arg
+
+        for mode, content, value in (
+            ("shell", "sub -o 'a b' # x\n\"c\nd\" e\\ f\n", "c\nd"),
+            ("newline", "sub\n-o\na b\n\nc d\ne f\n", "c d"),
+            ("nul", "sub\0-o\0a b\0c\nd\0e f", "c\nd"),
+        ):
+            with self.subTest(mode=mode):
+                (self.path / mode).write_text(content, encoding="utf-8")
+                cli = Cli("test").build(response_files=mode)
+                self.assertEqual(
+                    cli.invoke([f"@{self.path / mode}", "g"]),
+                    (["a b"], [value, "e f", "g"]),
+                )
+
+    def test_nested(self):
+        """Test nested response-files."""
+        (self.path / "a").write_text(
+            f"-o a @{self.path / 'b'} c", encoding="utf-8"
+        )
+        (self.path / "b").write_text("b", encoding="utf-8")
+        (self.path / "c").write_text(f"@{self.path / 'd'}", encoding="utf-8")
+        (self.path / "d").write_text(f"@{self.path / 'c'}", encoding="utf-8")
+        cli = self.EchoCommand("test").build(response_files="shell")
+
+        with self.subTest(case="nested"):
+            self.assertEqual(
+                cli.invoke([f"@{self.path / 'a'}"]), (["a"], ["b", "c"])
+            )
+
+        with self.subTest(case="recursive"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke([f"@{self.path / 'c'}"])
+            print(exc_info.exception)
+
+        with self.subTest(case="missing"):
+            with self.assertRaises(ParseError) as exc_info:
+                cli.invoke([f"@{self.path / 'missing'}"])
+            print(exc_info.exception)
+
+        with self.subTest(case="disabled"):
+            cli = self.EchoCommand("test").build()
+            self.assertEqual(cli.invoke(["@a"]), (None, ["@a"]))
+
+        with self.subTest(case="bad format"):
+            with self.assertRaises(ValueError) as exc_info:
+                self.EchoCommand("test").build(response_files="unknown")
+            print(exc_info.exception)
+
+    def test_shell_incremental(self):
+        """Test shell-format is read incrementally."""
+
+        class Stream(StringIO):
+            """Stream that fails when reading past `limit`."""
+
+            limit = 0
+
+            def read(self, size=-1):
+                if self.tell() >= self.limit:
+                    raise AssertionError("read too far")
+                return super().read(size)
+
+        block = "\n".join(f"line {i}" for i in range(10000))
+        content = f"a '{block}' b"
+
+        with self.subTest(case="multi-line token"):
+            self.assertListEqual(
+                list(READERS["shell"](StringIO(content))), ["a", block, "b"]
+            )
+
+        with self.subTest(case="incremental"):
+            stream = Stream(content)
+            stream.limit = 3
+            self.assertEqual(next(READERS["shell"](stream)), "a")
+
+
+class TestLazyCommand(TestCase):
+    """Test `LazyCommand`."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.module = "befehl_test_lazy_module"
+        (Path(self.tmp.name) / f"{self.module}.py").write_text(
+            """from befehl import Command, Option
+
+class Subcommand(Command):
+    opt = Option("-o")
+    ran = False
+
+    def run(self, args):
+        Subcommand.ran = self.opt in args
+""",
+            encoding="utf-8",
+        )
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop(self.module, None)
+        self.tmp.cleanup()
+
+    def test_bad_target(self):
+        """Test bad target format."""
+        with self.assertRaises(ValueError) as exc_info:
+            LazyCommand("sub", "module.Class")
+        print(exc_info.exception)
+
+    def test_import_on_dispatch(self):
+        """Test target is only imported when invoked."""
+
+        class Cli(_TestCommand):
+            sub = LazyCommand(
+                "sub", f"{self.module}:Subcommand", helptext="lazy"
+            )
+
+        cli = Cli("test").build(completion=True)
+
+        with self.subTest(case="help and autocomplete"):
+            with self.assertRaises(SystemExit):
+                cli(["--help"])
+            with self.assertRaises(SystemExit):
+                cli(["--generate-autocomplete"])
+            self.assertNotIn(self.module, sys.modules)
+
+        with self.subTest(case="dispatch"):
+            cli(["sub", "-o"])
+            self.assertIn(self.module, sys.modules)
+            self.assertTrue(sys.modules[self.module].Subcommand.ran)
+
+    def test_strict(self):
+        """Test target is imported in strict mode."""
+
+        class Cli(_TestCommand):
+            sub = LazyCommand("sub", f"{self.module}:Subcommand")
+
+        Cli("test").build(strict=True)
+        self.assertIn(self.module, sys.modules)
+
+        with self.subTest(case="not a command"):
+
+            class Cli2(_TestCommand):
+                sub = LazyCommand("sub", f"{self.module}:Option")
+
+            with self.assertRaises(ValueError) as exc_info:
+                Cli2("test").build(strict=True)
+            print(exc_info.exception)
+
+
+class TestBuildCache(TestCase):
+    """Test build-cache of `Command.build`."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.module = Path(self.tmp.name) / "befehl_test_cache_module.py"
+        self.module.write_text(
+            """import os
+
+from befehl import Command, Option, Argument, Parser
+
+class Subcommand(Command):
+    arg = Argument("arg", nargs=-1)
+
+    def run(self, args):
+        Cli.result = args[self.arg]
+
+class Cli(Command):
+    sub = Subcommand("sub", helptext="subcommand")
+    opt = Option(
+        ("-o", "--option"),
+        helptext=os.environ.get("BEFEHL_TEST_HELP"),
+        nargs=1,
+    )
+    flag = Option(os.environ.get("BEFEHL_TEST_NAME", "--alpha"), nargs=0)
+    value = Option(
+        "--value",
+        nargs=1,
+        parser=Parser.parse_with_values(
+            os.environ.get("BEFEHL_TEST_VALUES", "x").split()
+        ),
+    )
+    result = None
+
+    def run(self, args):
+        Cli.result = args.get(self.opt)
+""",
+            encoding="utf-8",
+        )
+        sys.path.insert(0, self.tmp.name)
+        # pylint: disable=import-outside-toplevel, import-error
+        import befehl_test_cache_module
+
+        self.cli_class = befehl_test_cache_module.Cli
+        self.cache_dir = Path(self.tmp.name) / "cache"
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop("befehl_test_cache_module", None)
+        self.tmp.cleanup()
+
+    def test_cache(self):
+        """Test writing, using, and invalidating the build-cache."""
+
+        def count():
+            return len(list(self.cache_dir.glob("*/*.json")))
+
+        with self.subTest(case="write cache"):
+            cli = self.cli_class("test").build(cache=self.cache_dir)
+            self.assertEqual(count(), 0)
+            cli(["-o", "a"])
+            self.assertEqual(self.cli_class.result, ["a"])
+            cli(["sub", "b"])
+            self.assertEqual(self.cli_class.result, ["b"])
+            self.assertEqual(count(), 0)
+            # one file per command and width (when rendered)
+            cli.get_help(40)
+            self.assertEqual(count(), 1)
+            cli.resolve(["sub"])[0].get_help(40)
+            cli.resolve(["sub"])[0].get_help(60)
+            self.assertEqual(count(), 3)
+
+        with self.subTest(case="use cache"):
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                cli = self.cli_class("test").build(cache=self.cache_dir)
+                self.assertIn("Usage", cli.get_help(40))
+                self.assertIn("Usage", cli.resolve(["sub"])[0].get_help(60))
+                with self.assertRaises(RuntimeError):
+                    cli.get_help(60)
+
+        with self.subTest(case="load lazily"):
+            loaded = []
+            load = build_cache.load
+
+            def load_and_record(cache_file):
+                loaded.append(cache_file)
+                return load(cache_file)
+
+            with patch.object(build_cache, "load", load_and_record):
+                cli = self.cli_class("test").build(cache=self.cache_dir)
+                cli.invoke(["-o", "a"])
+                cli.invoke(["sub", "a"])
+                self.assertEqual(loaded, [])
+                cli.get_help(40)
+                self.assertEqual(len(loaded), 1)
+
+        with self.subTest(case="validate"):
+            with patch.object(
+                Command, "_validate_options", side_effect=RuntimeError
+            ):
+                with self.assertRaises(RuntimeError):
+                    self.cli_class("test").build(cache=self.cache_dir)
+
+        with self.subTest(case="prerendered help"):
+            self.cli_class("test").build(
+                cache=self.cache_dir, help_widths=(50,)
+            )
+            self.assertEqual(count(), 5)
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                cli = self.cli_class("test").build(cache=self.cache_dir)
+                self.assertIn("Usage", cli.resolve(["sub"])[0].get_help(50))
+
+        with self.subTest(case="invalidate cache"):
+            self.module.write_text(
+                self.module.read_text(encoding="utf-8") + "\n",
+                encoding="utf-8",
+            )
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                cli = self.cli_class("test").build(cache=self.cache_dir)
+                with self.assertRaises(RuntimeError):
+                    cli.get_help(40)
+            self.cli_class("test").build(cache=self.cache_dir).get_help(40)
+            with patch.object(
+                CompiledCommand, "_render_help", side_effect=RuntimeError
+            ):
+                cli = self.cli_class("test").build(cache=self.cache_dir)
+                self.assertIn("Usage", cli.get_help(40))
+
+    def test_changed_declarations(self):
+        """Test cached help is discarded if declarations changed."""
+
+        def build(name, helptext="text", values=("x",)):
+            sys.modules.pop("befehl_test_cache_module", None)
+            with patch.dict(
+                "os.environ",
+                {
+                    "BEFEHL_TEST_NAME": name,
+                    "BEFEHL_TEST_HELP": helptext,
+                    "BEFEHL_TEST_VALUES": " ".join(values),
+                },
+            ):
+                # pylint: disable=import-outside-toplevel, import-error
+                import befehl_test_cache_module
+            return befehl_test_cache_module.Cli("test").build(
+                cache=self.cache_dir, help_widths=(40,)
+            )
+
+        build("--alpha")
+
+        with self.subTest(case="valid"):
+            cli = build("--beta")
+            self.assertIn("--beta", str(cli.parse(["--beta"])))
+            self.assertIn("--beta", cli.get_help(40))
+            with self.assertRaises(CliExit):
+                cli.parse(["--alpha"])
+
+        with self.subTest(case="invalid"):
+            with self.assertRaises(ValueError) as exc_info:
+                build("beta")
+            print(exc_info.exception)
+
+        with self.subTest(case="helptext"):
+            build("--alpha", helptext="first")
+            cli = build("--alpha", helptext="second")
+            self.assertIn("second", cli.get_help(40))
+            self.assertNotIn("first", cli.get_help(40))
+
+        with self.subTest(case="values"):
+            build("--alpha", values=("x", "y"))
+            with patch.object(
+                CompiledCommand,
+                "_render_help",
+                autospec=True,
+                side_effect=CompiledCommand._render_help,
+            ) as render_help:
+                build("--alpha", values=("x", "y"))
+                render_help.assert_not_called()
+                cli = build("--alpha", values=("x", "z"))
+                render_help.assert_called_once()
+            cli.parse(["--value", "z"])
+
+
+class TestFootprint(TestCase):
+    """Test memory footprint of declarations."""
+
+    def test_slots(self):
+        """Test `Option`, `Argument`, and `Command` use `__slots__`."""
+
+        for obj in [
+            Option(("-o", "--option"), helptext="text"),
+            Argument("arg", helptext="text"),
+            Command("command", helptext="text"),
+            LazyCommand("lazy", "module:Command"),
+        ]:
+            with self.subTest(type=type(obj).__name__):
+                self.assertIn("__slots__", vars(type(obj)))
+                self.assertFalse(hasattr(obj, "__dict__"))
+
+        with self.subTest(type="subclass"):
+            self.assertTrue(hasattr(_TestCommand("command"), "__dict__"))
+
+            class Cli(Command):
+                __slots__ = ()
+
+            self.assertFalse(hasattr(Cli("command"), "__dict__"))
+
+    def test_import(self):
+        """Test optional modules are not loaded by importing `befehl`."""
+
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "from befehl import *"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imported = {
+            line.rsplit("|", 1)[-1].strip()
+            for line in result.stderr.splitlines()
+        }
+        self.assertIn("befehl.compiled", imported)
+        for module in (
+            "asyncio",
+            "concurrent.futures",
+            "json",
+            "hashlib",
+            "shlex",
+            "inspect",
+        ):
+            with self.subTest(module=module):
+                self.assertNotIn(module, imported)
+
+    def test_commands(self):
+        """Test memory allocated per `Command`."""
+
+        class Baseline:
+            """Equivalent object with `__dict__`."""
+
+            def __init__(self, name, *, helptext=None):
+                self.name = name
+                self.helptext = helptext
+
+        def measure(factory):
+            names = [f"command-{i}" for i in range(1000)]
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                objects = [factory(name) for name in names]
+                after = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            return (after - before) / len(objects)
+
+        self.assertLess(measure(Command), measure(Baseline))
+
+    def test_options_and_arguments(self):
+        """Test memory used per `Option` and `Argument`."""
+
+        class Baseline:
+            """Equivalent object with `__dict__`."""
+
+        for obj in [
+            Option(("-o", "--option"), helptext="text", nargs=2),
+            Argument("arg", helptext="text", nargs=-1),
+        ]:
+            with self.subTest(type=type(obj).__name__):
+                baseline = Baseline()
+                for cls in type(obj).__mro__:
+                    for slot in vars(cls).get("__slots__", ()):
+                        name = f"_{cls.__name__}{slot}"
+                        setattr(baseline, name, getattr(obj, name))
+                self.assertEqual(
+                    len(vars(baseline)),
+                    sum(
+                        len(vars(cls).get("__slots__", ()))
+                        for cls in type(obj).__mro__
+                    ),
+                )
+                self.assertFalse(hasattr(obj, "__dict__"))
+                self.assertLess(
+                    sys.getsizeof(obj),
+                    sys.getsizeof(baseline) + sys.getsizeof(vars(baseline)),
+                )
+
+    def test_shared_options(self):
+        """Test generated options are shared between commands."""
+
+        class Cli(_TestCommand):
+            arg = Argument("arg", nargs=-1, stream=True)
+
+        targets = []
+        for name in ("a", "b"):
+            cli = Cli(name).build()
+            with self.assertRaises(ParseError) as exc_info:
+                cli.parse(["-0", "--files-from"])
+            targets.append(exc_info.exception.target)
+            targets.extend(cli.parse(["-0", "--", "x"]))
+
+        self.assertIs(targets[0], targets[3])
+        self.assertIs(targets[1], targets[4])
+
+
+class TestTrace(TestCase):
+    """Test phase-timing hooks."""
+
+    def test_hook(self):
+        """Test events are passed to registered hook."""
+
+        class Subcommand(_TestCommand):
+            arg = Argument("arg", nargs=-1, parser=lambda s: (True, None, s))
+
+        class Cli(_TestCommand):
+            sub = Subcommand("sub")
+
+        events = []
+
+        def hook(event, phase, timestamp, details):
+            events.append((event, phase, timestamp, details))
+
+        trace.register(hook)
+        try:
+            Cli("test").build()(["sub", "a", "b"])
+        finally:
+            trace.unregister(hook)
+
+        self.assertListEqual(
+            [(e[0], e[1]) for e in events if e[3].get("command") != "test"],
+            [
+                ("start", "build"),
+                ("end", "build"),
+                ("start", "parse"),
+                ("start", "parse-tokens"),
+                ("end", "parse-tokens"),
+                ("start", "parse-options"),
+                ("end", "parse-options"),
+                ("start", "parse-arguments"),
+                ("start", "parser"),
+                ("end", "parser"),
+                ("start", "parser"),
+                ("end", "parser"),
+                ("end", "parse-arguments"),
+                ("end", "parse"),
+                ("start", "validate"),
+                ("end", "validate"),
+                ("start", "run"),
+                ("end", "run"),
+            ],
+        )
+        self.assertListEqual(
+            [e[2] for e in events], sorted(e[2] for e in events)
+        )
+
+    def test_chrome_trace(self):
+        """Test Chrome trace-file for concurrent coroutine-parsers."""
+
+        async def parser(data):
+            await asyncio.sleep(0.01)
+            return True, None, data
+
+        class Cli(_TestCommand):
+            arg = Argument("a", nargs=-1, parser=parser)
+
+        cli = Cli("test").build()
+        chrome_trace = trace.ChromeTrace()
+        trace.register(chrome_trace)
+        try:
+            cli.invoke(["x", "y", "z"])
+        finally:
+            trace.unregister(chrome_trace)
+
+        self.assertTrue(all(e["ph"] == "X" for e in chrome_trace.events))
+        parsers = [e for e in chrome_trace.events if e["cat"] == "parser"]
+        self.assertListEqual(
+            sorted(e["args"]["index"] for e in parsers), ["0", "1", "2"]
+        )
+        self.assertEqual(len({e["name"] for e in parsers}), 3)
+        for event in parsers:
+            self.assertGreaterEqual(event["dur"], 0)
+        # spans overlap
+        self.assertLess(
+            max(e["ts"] for e in parsers),
+            min(e["ts"] + e["dur"] for e in parsers),
+        )
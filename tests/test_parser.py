@@ -1,6 +1,11 @@
 """Test module for `parser.py`."""
 
 from pathlib import Path
+from array import array
+from unittest.mock import patch
+from tempfile import TemporaryDirectory
+import os
+import asyncio
 from unittest import TestCase
 
 from befehl import Parser
@@ -45,6 +50,47 @@ class TestParser(TestCase):
             self.assertTrue(ok)
             self.assertEqual(data, 1.5)
 
+    def test_array(self):
+        """Test `parse_as_array`."""
+        with self.subTest(case="invalid"):
+            for parser, value in (
+                (Parser.parse_as_array(), "a"),
+                (Parser.parse_as_array("q"), "1.5"),
+                (Parser.parse_as_array("b"), "128"),
+            ):
+                ok, msg, data = parser(value)
+                self.assertFalse(ok)
+                print(msg)
+
+        with self.subTest(case="valid"):
+            ok, msg, data = Parser.parse_as_array()("1.5")
+            self.assertTrue(ok)
+            self.assertEqual(data, 1.5)
+            ok, msg, data = Parser.parse_as_array("q")("-2")
+            self.assertTrue(ok)
+            self.assertEqual(data, -2)
+
+        with self.subTest(case="array"):
+            data = Parser.parse_as_array().array(["1", "2.5", "-1e3"])
+            self.assertEqual(data, array("d", [1, 2.5, -1e3]))
+            with self.assertRaises(ValueError):
+                Parser.parse_as_array("i").array(["1", "a"])
+
+        with self.subTest(case="numpy"):
+            try:
+                import numpy  # pylint: disable=import-outside-toplevel
+            except ImportError:
+                self.skipTest("numpy is not installed")
+            data = Parser.parse_as_array("q", numpy=True).array(["1", "2"])
+            self.assertIsInstance(data, numpy.ndarray)
+            self.assertEqual(data.dtype, numpy.int64)
+            self.assertEqual(data.tolist(), [1, 2])
+
+        with self.subTest(case="bad typecode"):
+            with self.assertRaises(ValueError) as exc_info:
+                Parser.parse_as_array("u")
+            print(exc_info.exception)
+
     def test_path(self):
         """Test `parse_as_path`."""
         with self.subTest(case="invalid"):
@@ -91,6 +137,102 @@ class TestParser(TestCase):
             self.assertTrue(ok)
             self.assertEqual(data, Path("tests/test_parser.py"))
 
+    def test_path_stat_once(self):
+        """Test path-parsers use a single `os.stat`."""
+        for parser in (
+            Parser.parse_as_path,
+            Parser.parse_as_file,
+            Parser.parse_as_dir,
+        ):
+            with self.subTest(parser=parser.__name__):
+                with patch("befehl.paths.os.stat", wraps=os.stat) as stat:
+                    ok, msg, data = parser("tests/test_parser.py")
+                self.assertEqual(stat.call_count, 1)
+                if ok:
+                    self.assertEqual(
+                        data.stat_result.st_size,
+                        os.stat("tests/test_parser.py").st_size,
+                    )
+
+    def test_path_bulk(self):
+        """Test bulk-versions of path-parsers."""
+        with TemporaryDirectory() as tmp:
+            (Path(tmp) / "dir").mkdir()
+            (Path(tmp) / "dir" / "file").touch()
+            for i in range(10):
+                (Path(tmp) / f"file{i}").touch()
+            (Path(tmp) / "broken").symlink_to(Path(tmp) / "missing")
+            (Path(tmp) / "link").symlink_to(Path(tmp) / "file0")
+            values = [
+                str(Path(tmp) / name)
+                for name in [f"file{i}" for i in range(10)]
+                + ["dir", "dir/", "dir/file", "dir/missing", "file0/x"]
+                + ["broken", "link", "missing", "."]
+            ]
+            for parser in (
+                Parser.parse_as_path,
+                Parser.parse_as_file,
+                Parser.parse_as_dir,
+            ):
+                with self.subTest(parser=parser.__name__):
+                    with patch(
+                        "befehl.paths.os.scandir", wraps=os.scandir
+                    ) as scandir:
+                        responses = parser.bulk(values)
+                    # only the directory with many values is listed
+                    self.assertEqual(scandir.call_count, 1)
+                    for value, response in zip(values, responses):
+                        expected = parser(value)
+                        self.assertEqual(response[:2], expected[:2])
+                        self.assertEqual(response[2], expected[2])
+                        if response[0]:
+                            self.assertIsNotNone(response[2].stat_result)
+
+    def test_path_bulk_huge_directory(self):
+        """Test bulk-versions of path-parsers for a huge directory."""
+        with TemporaryDirectory() as tmp:
+            for i in range(1000):
+                (Path(tmp) / f"file{i}").touch()
+
+            with self.subTest(case="few values"):
+                values = [str(Path(tmp) / "file1"), str(Path(tmp) / "file2")]
+                with patch(
+                    "befehl.paths.os.scandir", wraps=os.scandir
+                ) as scandir, patch(
+                    "befehl.paths.os.stat", wraps=os.stat
+                ) as stat:
+                    responses = Parser.parse_as_file.bulk(values)
+                scandir.assert_not_called()
+                self.assertEqual(stat.call_count, 2)
+                self.assertTrue(all(response[0] for response in responses))
+
+            with self.subTest(case="many values"):
+                listed = []
+                scandir_ = os.scandir
+
+                def scandir(path):
+                    entries = scandir_(path)
+
+                    class Entries:
+                        def __enter__(self):
+                            return self
+
+                        def __exit__(self, *args):
+                            entries.close()
+
+                        def __iter__(self):
+                            for entry in entries:
+                                listed.append(entry.name)
+                                yield entry
+
+                    return Entries()
+
+                values = [str(Path(tmp) / f"file{i}") for i in range(10)]
+                with patch("befehl.paths.os.scandir", side_effect=scandir):
+                    responses = Parser.parse_as_file.bulk(values)
+                self.assertLessEqual(len(listed), 40)
+                self.assertTrue(all(response[0] for response in responses))
+
     def test_values(self):
         """Test `parse_with_values`."""
         with self.subTest(case="invalid"):
@@ -103,6 +245,86 @@ class TestParser(TestCase):
             self.assertTrue(ok)
             self.assertEqual(data, "a")
 
+        with self.subTest(case="generator and attribute values"):
+            parser = Parser.parse_with_values(v for v in "ab")
+            self.assertTrue(parser("b")[0])
+            self.assertTrue(parser("b")[0])
+            self.assertEqual(parser.values, ("a", "b"))
+            self.assertEqual(Parser.cached(parser).values, ("a", "b"))
+
+        with self.subTest(case="case-insensitive"):
+            parser = Parser.parse_with_values(
+                ["Alpha", "beta"], case_sensitive=False
+            )
+            self.assertEqual(parser("ALPHA"), (True, None, "Alpha"))
+            self.assertEqual(parser("Beta"), (True, None, "beta"))
+            self.assertFalse(parser("gamma")[0])
+            self.assertFalse(Parser.parse_with_values(["Alpha"])("alpha")[0])
+
+        with self.subTest(case="many values"):
+            values = [f"host-{i}" for i in range(100_000)]
+            parser = Parser.parse_with_values(values)
+            self.assertTrue(parser("host-99999")[0])
+            ok, msg, data = parser("host")
+            self.assertFalse(ok)
+            print(msg)
+            self.assertIn("'host-9', ... (99990 more)", msg)
+            self.assertLess(len(msg), 200)
+
+    def test_values_file(self):
+        """Test `parse_with_values_file`."""
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "values.txt"
+            values = [f"SKU-{i:06d}" for i in range(10_000)] + ["ZÜRICH"]
+            path.write_text("\n".join(values) + "\n", encoding="utf-8")
+
+            for mmap in (False, True):
+                with self.subTest(mmap=mmap, case="lazy"):
+                    with patch("builtins.open", side_effect=OSError):
+                        parser = Parser.parse_with_values_file(
+                            path, mmap=mmap
+                        )
+                    self.assertEqual(
+                        parser(values[0]), (True, None, values[0])
+                    )
+
+                with self.subTest(mmap=mmap, case="valid"):
+                    for value in values[::997] + values[-2:]:
+                        self.assertEqual(parser(value), (True, None, value))
+
+                with self.subTest(mmap=mmap, case="invalid"):
+                    for value in ("", "SKU", "SKU-1", "SKU-010000", "a\nb"):
+                        ok, msg, data = parser(value)
+                        self.assertFalse(ok)
+                    print(msg)
+
+                with self.subTest(mmap=mmap, case="case-insensitive"):
+                    parser = Parser.parse_with_values_file(
+                        path, mmap=mmap, case_sensitive=False
+                    )
+                    self.assertEqual(
+                        parser("sku-000042"), (True, None, "SKU-000042")
+                    )
+                    self.assertEqual(
+                        parser("zürich"), (True, None, "ZÜRICH")
+                    )
+                    self.assertFalse(parser("sku-x")[0])
+
+            with self.subTest(case="line separators"):
+                path.write_bytes("a\vb\r\nc\u2028d\x1ce\n".encode("utf-8"))
+                for mmap in (False, True):
+                    parser = Parser.parse_with_values_file(path, mmap=mmap)
+                    for value in ("a\vb", "c\u2028d\x1ce"):
+                        self.assertTrue(parser(value)[0], msg=mmap)
+                    for value in ("a", "b", "a\vb\r", "c", "e"):
+                        self.assertFalse(parser(value)[0], msg=mmap)
+
+            with self.subTest(case="empty file"):
+                path.write_text("", encoding="utf-8")
+                for mmap in (False, True):
+                    parser = Parser.parse_with_values_file(path, mmap=mmap)
+                    self.assertFalse(parser("a")[0])
+
     def test_glob(self):
         """Test `parse_with_glob`."""
         with self.subTest(case="invalid"):
@@ -115,6 +337,87 @@ class TestParser(TestCase):
             self.assertTrue(ok)
             self.assertEqual(data, Path("c/d"))
 
+        with self.subTest(case="like Path.match"):
+            # (platform-independent) values and the expected matches
+            values = ["", "/"] + (
+                "c/d a/c/d c/d/e /c/d ./c/d c//d c/d/ c/.d c . a/b.py "
+                + "/x/a/b.py axb ayb a/b [ [] ] z ^/d &/d |/d ~/d"
+            ).split()
+            cd = "c/d a/c/d /c/d ./c/d c//d c/d/"
+            for pattern, expected in (
+                ("c/*", f"{cd} c/.d"),
+                (
+                    "*",
+                    f"{cd} c/d/e c/.d c a/b.py /x/a/b.py axb ayb a/b [ [] ] "
+                    + "z ^/d &/d |/d ~/d",
+                ),
+                ("*.py", "a/b.py /x/a/b.py"),
+                ("a/*.py", "a/b.py /x/a/b.py"),
+                ("/c/*", "/c/d"),
+                ("?/d", f"{cd} ^/d &/d |/d ~/d"),
+                ("[a-c]/d", cd),
+                ("[!a]/d", f"{cd} ^/d &/d |/d ~/d"),
+                ("/*/*", "/c/d"),
+                ("/*", ""),
+                ("c/d", cd),
+                ("a[!x]b", "ayb"),
+                ("[z-a]", ""),
+                ("[[]", "["),
+                ("[!]]", f"{cd} c/d/e c a/b [ z ^/d &/d |/d ~/d"),
+                ("[]]", "]"),
+                ("[^a]/d", "^/d"),
+                ("[&&c]/d", f"{cd} &/d"),
+                ("[|~]/d", "|/d ~/d"),
+                ("[!~~]/d", f"{cd} ^/d &/d |/d"),
+                ("[\\-]", ""),
+                ("[a-c-z]", "c a/b z"),
+                ("[z-a-c]", "c"),
+                ("[/d", ""),
+                (".*", "c/.d"),
+            ):
+                parser = Parser.parse_with_glob(pattern)
+                self.assertEqual(
+                    [value for value in values if parser(value)[0]],
+                    [value for value in values if value in expected.split()],
+                    msg=f"{pattern=}",
+                )
+
+        with self.subTest(case="'*' requires non-empty component"):
+            for pattern, value in (
+                ("/*", "/"),
+                ("*", "/"),
+                ("/*/*", "/c"),
+                ("c/*", "c/"),
+                ("**/*", "/"),
+            ):
+                self.assertFalse(
+                    Parser.parse_with_glob(pattern)(value)[0],
+                    msg=f"{pattern=}, {value=}",
+                )
+
+        with self.subTest(case="multiple patterns and '**'"):
+            parser = Parser.parse_with_glob("src/**/*.py", "/*.toml")
+            for value, expected in (
+                ("src/a.py", True),
+                ("src/b/c/a.py", True),
+                ("x/src/b/a.py", True),
+                ("src/a.txt", False),
+                ("/pyproject.toml", True),
+                ("a/pyproject.toml", False),
+            ):
+                self.assertEqual(parser(value)[0], expected, msg=value)
+
+        with self.subTest(case="bulk"):
+            values = ["a/b.py", "b.txt", "c.py", "d/e/f.py"]
+            parser = Parser.parse_with_glob("*.py")
+            self.assertEqual(parser.bulk(values), list(map(parser, values)))
+
+        with self.subTest(case="bad pattern"):
+            for patterns in ((), ("",)):
+                with self.assertRaises(ValueError) as exc_info:
+                    Parser.parse_with_glob(*patterns)
+                print(exc_info.exception)
+
     def test_regex(self):
         """Test `parse_with_regex`."""
         with self.subTest(case="invalid"):
@@ -182,3 +485,81 @@ class TestParser(TestCase):
             )("1")
             self.assertTrue(ok)
             self.assertEqual(data, 1)
+
+    def test_cached(self):
+        """Test `cached`."""
+        calls = []
+
+        def parser(data):
+            calls.append(data)
+            return Parser.parse_as_int(data)
+
+        cached = Parser.cached(parser, maxsize=2)
+
+        with self.subTest(case="hits and misses"):
+            self.assertEqual(cached("1"), (True, None, 1))
+            self.assertEqual(cached("1"), (True, None, 1))
+            self.assertFalse(cached("a")[0])
+            self.assertFalse(cached("a")[0])
+            self.assertListEqual(calls, ["1", "a"])
+            self.assertEqual(cached.cache_info(), (2, 2, 2, 2))
+
+        with self.subTest(case="lru"):
+            cached("1")
+            cached("2")
+            cached("1")
+            self.assertListEqual(calls, ["1", "a", "2"])
+            cached("a")
+            self.assertListEqual(calls, ["1", "a", "2", "a"])
+            self.assertEqual(cached.cache_info().currsize, 2)
+
+        with self.subTest(case="clear"):
+            cached.cache_clear()
+            self.assertEqual(cached.cache_info(), (0, 0, 2, 0))
+
+        with self.subTest(case="ttl"):
+            cached = Parser.cached(parser, ttl=10)
+            with patch("befehl.parser.monotonic", return_value=0):
+                cached("3")
+                cached("3")
+            with patch("befehl.parser.monotonic", return_value=20):
+                cached("3")
+            self.assertEqual(calls[-2:], ["3", "3"])
+            self.assertEqual(cached.cache_info().misses, 2)
+
+        with self.subTest(case="coroutine"):
+
+            async def async_parser(data):
+                calls.append(data)
+                return Parser.parse_as_int(data)
+
+            cached = Parser.cached(async_parser)
+            self.assertEqual(asyncio.run(cached("4")), (True, None, 4))
+            self.assertEqual(asyncio.run(cached("4")), (True, None, 4))
+            self.assertEqual(cached.cache_info().hits, 1)
+
+        with self.subTest(case="attributes"):
+            cached = Parser.cached(Parser.parse_with_values(("a", "b")))
+            self.assertEqual(cached.values, ("a", "b"))
+            cached = Parser.cached(Parser.parse_as_array("q"))
+            self.assertEqual(cached.array(["1", "2"]), array("q", [1, 2]))
+
+        with self.subTest(case="bulk"):
+            with TemporaryDirectory() as tmp:
+                values = [str(Path(tmp) / f"file{i}") for i in range(10)]
+                for value in values[:-1]:
+                    Path(value).touch()
+                cached = Parser.cached(Parser.parse_as_file, maxsize=None)
+                cached(values[0])
+                with patch.object(
+                    Parser.parse_as_file,
+                    "bulk",
+                    wraps=Parser.parse_as_file.bulk,
+                ) as bulk:
+                    responses = cached.bulk(values)
+                bulk.assert_called_once_with(values[1:])
+                self.assertListEqual(
+                    [response[0] for response in responses],
+                    [True] * 9 + [False],
+                )
+                self.assertEqual(cached.cache_info().currsize, 10)
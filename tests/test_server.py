@@ -0,0 +1,114 @@
+"""Test module for `server.py` and `befehl_client.py`."""
+
+from unittest import TestCase, skipUnless
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import os
+import sys
+import time
+import signal
+import socket
+import subprocess
+
+
+SERVER = """
+import os
+import sys
+
+from befehl import Command, Argument
+from befehl.server import serve
+
+
+class Cli(Command):
+    arg = Argument("arg", nargs=-1)
+
+    def run(self, args):
+        print(
+            " ".join(args[self.arg]),
+            os.getcwd(),
+            os.environ.get("BEFEHL_TEST_VALUE"),
+        )
+        sys.exit(len(args[self.arg]))
+
+
+serve(Cli("test").build(), sys.argv[1])
+"""
+
+
+@skipUnless(
+    hasattr(os, "fork") and hasattr(socket, "AF_UNIX"),
+    "requires fork and Unix domain sockets",
+)
+class TestServer(TestCase):
+    """Test fork-server."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.socket = Path(self.tmp.name) / "test.sock"
+        self.env = os.environ | {
+            "PYTHONPATH": str(Path(__file__).parent.parent)
+        }
+        # pylint: disable=consider-using-with
+        self.server = subprocess.Popen(
+            [sys.executable, "-c", SERVER, str(self.socket)], env=self.env
+        )
+        for _ in range(100):
+            if self.socket.exists():
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.send_signal(signal.SIGINT)
+        self.server.wait(5)
+        self.tmp.cleanup()
+
+    def test_forward(self):
+        """Test forwarding invocation to server."""
+        result = subprocess.run(
+            [sys.executable, "-m", "befehl_client", str(self.socket)]
+            + ["a", "b"],
+            cwd=self.tmp.name,
+            env=self.env | {"BEFEHL_TEST_VALUE": "value"},
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        self.assertEqual(result.returncode, 2)
+        self.assertEqual(
+            result.stdout.strip(),
+            f"a b {os.path.realpath(self.tmp.name)} value",
+        )
+
+    def test_forward_error(self):
+        """Test forwarding invocation with error to server."""
+        result = subprocess.run(
+            [sys.executable, "-m", "befehl_client", str(self.socket)]
+            + ["--unknown"],
+            env=self.env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Unknown option", result.stderr)
+
+
+class TestClient(TestCase):
+    """Test client."""
+
+    def test_import(self):
+        """Test client is imported without the rest of `befehl`."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, befehl_client; print(*sorted(m for m in "
+                + "sys.modules if m.startswith('befehl')))",
+            ],
+            env=os.environ
+            | {"PYTHONPATH": str(Path(__file__).parent.parent)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.split(), ["befehl_client"])